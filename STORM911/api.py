@@ -4,37 +4,116 @@ Handles interactions with the ReadyMode API service.
 """
 
 import os
+import re
 import json
+import time
 import logging
+import threading
 import requests
-from typing import Dict, List, Optional, Union
-from urllib.parse import urljoin
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
 
 from config import API_SETTINGS
+from cache import ResponseCache
+from singleflight import SingleFlight
+from resilience import CircuitBreaker, RetryPolicy
+from transport import create_session, get_adapter
+from metrics import endpoint_label, get_registry
+from ratelimit import BACKGROUND, RateLimitTimeout, current_priority, exempt, get_rate_limiter, priority
+from hedging import Hedger
+from phone import national_number
 
 logger = logging.getLogger(__name__)
 
+# Lead payload fields that carry a phone number used as a cache key
+_LEAD_PHONE_FIELDS = ("phone", "cell")
+# Lead payload fields that may carry the ReadyMode lead id
+_LEAD_ID_FIELDS = ("id", "lead_id", "leadId")
+# Endpoints metered against ReadyMode's separate creation quota
+_CREATE_PREFIX = "/create/"
+
+# Matches credential query parameters so they never reach the logs
+_CREDENTIAL_PARAMS = re.compile(r"(API_user|API_pass)=[^&\s]*")
+
+def _redact(text: str) -> str:
+    """Mask ReadyMode credentials embedded in URLs or error messages."""
+    return _CREDENTIAL_PARAMS.sub(r"\1=***", text)
+
+def endpoint_url(base_url: str, endpoint: str) -> str:
+    """Append an endpoint path to the base URL, keeping the base's own path (e.g. /TPI)."""
+    return base_url.rstrip("/") + "/" + endpoint.lstrip("/")
+
+def normalize_phone(phone: str) -> str:
+    """Reduce a phone number to its national digits for use as a cache key and in URLs."""
+    return national_number(phone)
+
 class APIError(Exception):
     """Base exception for API errors."""
-    pass
+
+    def __init__(self, message: str = "", status_code: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
 
 class AuthenticationError(APIError):
     """Raised when API authentication fails."""
     pass
 
+class CircuitOpenError(APIError):
+    """Raised without contacting the API while its circuit breaker is open."""
+    pass
+
+class BulkLookupResult(NamedTuple):
+    """Outcome of one phone number in a bulk lead lookup."""
+    index: int
+    phone: str
+    response: Optional[Dict]
+    error: Optional[Exception]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 class ReadyModeAPI:
     """Client for interacting with the ReadyMode API."""
     
-    def __init__(self, username: str, password: str):
-        """Initialize API client with credentials."""
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        base_url: Optional[str] = None,
+        lead_cache: Optional[ResponseCache] = None
+    ):
+        """Initialize API client with credentials, optionally against another server and cache."""
         self.username = username
         self.password = password
-        self.base_url = "https://roofingappointments.readymode.com/TPI"
-        self.session = requests.Session()
+        self.base_url = base_url or API_SETTINGS["base_url"]
+        self.session = create_session()
         self.session.headers.update({
             "Accept": "application/json",
             "Content-Type": "application/json"
         })
+        
+        # Lead search cache keyed by normalized phone number
+        self.lead_cache = lead_cache if lead_cache is not None else ResponseCache("lead_search")
+        # Local LeadReplica consulted before the cache; attached by start_replica_sync
+        self.replica = None
+        # lead id -> normalized phone, so updates can invalidate the cache
+        self._lead_cache_keys: Dict[str, str] = {}
+        self._lead_cache_lock = threading.Lock()
+        
+        # Concurrent identical reads share a single HTTP request
+        self.inflight = SingleFlight()
+        
+        # Retries for transient failures, fail-fast while the API is down
+        self.retry_policy = RetryPolicy()
+        self.circuit_breaker = CircuitBreaker("readymode")
+        
+        self.metrics = get_registry()
+        self.rate_limiter = get_rate_limiter()
+        
+        # Optional duplicate GETs to cut tail latency (HEDGE_CONFIG)
+        self.hedger = Hedger("readymode")
 
     def _make_request(
         self, 
@@ -42,69 +121,345 @@ class ReadyModeAPI:
         endpoint: str, 
         params: Optional[Dict] = None, 
         data: Optional[Dict] = None,
-        timeout: int = 30
+        timeout: int = 30,
+        idempotency_key: Optional[str] = None
     ) -> Dict:
-        """Make an HTTP request to the API."""
-        url = urljoin(self.base_url, endpoint)
+        """
+        Make an HTTP request to the API.
+
+        GET requests are coalesced: a call that matches one already in
+        flight (same method, endpoint and params) waits for and shares its
+        result instead of sending a duplicate request. Transient failures
+        are retried according to the retry policy; POSTs are only retried
+        when an idempotency key is supplied.
+        """
+        if method.upper() != "GET":
+            return self._send_with_retry(method, endpoint, params, data, timeout, idempotency_key)
+
+        key = (
+            method.upper(),
+            endpoint,
+            tuple(sorted((params or {}).items()))
+        )
+        return self.inflight.do(
+            key, self._send_with_retry, method, endpoint, params, data, timeout, idempotency_key
+        )
+
+    def _send_with_retry(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict],
+        data: Optional[Dict],
+        timeout: int,
+        idempotency_key: Optional[str]
+    ) -> Dict:
+        """Send a request, retrying transient failures behind the circuit breaker."""
+        attempts = self.retry_policy.attempts_for(method, endpoint, idempotency_key)
+        delay = None
+
+        for attempt in range(1, attempts + 1):
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(
+                    f"ReadyMode API unavailable; retrying in "
+                    f"{self.circuit_breaker.retry_after():.0f}s"
+                )
+            self.rate_limiter.acquire(create=endpoint.startswith(_CREATE_PREFIX))
+            try:
+                result = self._send_attempt(method, endpoint, params, data, timeout, idempotency_key)
+            except APIError as e:
+                if e.retryable:
+                    self.circuit_breaker.record_failure()
+                else:
+                    # The API answered, so it is up even if the request was bad
+                    self.circuit_breaker.record_success()
+                if not e.retryable or attempt == attempts:
+                    raise
+                delay = self.retry_policy.next_delay(delay)
+                self.metrics.record_retry("readymode", method, endpoint)
+                logger.warning(
+                    f"{method} {endpoint} failed (attempt {attempt}/{attempts}); "
+                    f"retrying in {delay:.2f}s"
+                )
+                time.sleep(delay)
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
+    def _send_attempt(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict],
+        data: Optional[Dict],
+        timeout: int,
+        idempotency_key: Optional[str]
+    ) -> Dict:
+        """Send one attempt, hedging it if it is an eligible slow GET."""
+        if not self.hedger.applies_to(method, endpoint):
+            return self._send_request(method, endpoint, params, data, timeout, idempotency_key)
+
+        delay = self.hedger.delay_for(
+            self.metrics.percentile("readymode", method, endpoint, self.hedger.percentile),
+            self.metrics.sample_count("readymode", method, endpoint)
+        )
+        priority_class = current_priority()
+
+        def may_hedge() -> bool:
+            # A hedge must never wait for rate-limit capacity
+            try:
+                self.rate_limiter.acquire(priority_class, timeout=0)
+                return True
+            except RateLimitTimeout:
+                return False
+
+        return self.hedger.call(
+            lambda: self._send_request(method, endpoint, params, data, timeout, idempotency_key),
+            delay,
+            may_hedge
+        )
+
+    def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        timeout: int = 30,
+        idempotency_key: Optional[str] = None
+    ) -> Dict:
+        """Send a single HTTP request to the API."""
+        url = endpoint_url(self.base_url, endpoint)
         
         # Add authentication parameters
-        if params is None:
-            params = {}
+        params = dict(params or {})
         params.update({
             "API_user": self.username,
             "API_pass": self.password
         })
         
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+        route = endpoint_label(endpoint)
+        started = time.perf_counter()
+        
         try:
             response = self.session.request(
                 method=method,
                 url=url,
                 params=params,
                 json=data,
+                headers=headers,
                 timeout=timeout
             )
+            elapsed = time.perf_counter() - started
             
-            logger.debug(f"API request: {method} {url}")
-            logger.debug(f"Params: {params}")
-            logger.debug(f"Data: {data}")
-            logger.debug(f"Response status: {response.status_code}")
+            self.metrics.record_request(
+                "readymode",
+                method,
+                endpoint,
+                response.status_code,
+                elapsed,
+                bytes_sent=len(response.request.body or b""),
+                bytes_received=len(response.content)
+            )
+            logger.debug(f"API request: {method} {route} -> {response.status_code} in {elapsed * 1000:.0f}ms")
             
             # Handle common error responses
             if response.status_code == 401:
-                raise AuthenticationError("Invalid API credentials")
+                self.metrics.record_error("readymode", method, endpoint, "auth")
+                raise AuthenticationError("Invalid API credentials", status_code=401)
             
             response.raise_for_status()
             
             return response.json()
             
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code
+            self.metrics.record_error("readymode", method, endpoint, f"http_{status}")
+            message = _redact(f"API request failed: {str(e)}")
+            logger.error(message)
+            raise APIError(
+                message,
+                status_code=status,
+                retryable=self.retry_policy.is_retryable_status(status)
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            kind = "timeout" if isinstance(e, requests.exceptions.Timeout) else "connection"
+            self.metrics.record_request("readymode", method, endpoint, kind, time.perf_counter() - started)
+            self.metrics.record_error("readymode", method, endpoint, kind)
+            message = _redact(f"API request failed: {str(e)}")
+            logger.error(message)
+            raise APIError(message, retryable=True)
         except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {str(e)}")
-            raise APIError(f"API request failed: {str(e)}")
+            self.metrics.record_error("readymode", method, endpoint, type(e).__name__)
+            message = _redact(f"API request failed: {str(e)}")
+            logger.error(message)
+            raise APIError(message)
+
+    def search_lead(self, phone: str, use_cache: bool = True, force_refresh: bool = False) -> List[Dict]:
+        """
+        Search for a lead by phone number.
+
+        Answers from the local replica (while fresh) or the cache when
+        possible; force_refresh always asks the API and refreshes both.
+        """
+        cache_key = normalize_phone(phone)
+        if cache_key and not force_refresh:
+            if self.replica is not None:
+                lead = self.replica.find_by_phone(cache_key)
+                if lead is not None:
+                    return {"status": "success", "lead": lead}
+            if use_cache:
+                cached = self.lead_cache.get(cache_key)
+                if cached is not None:
+                    return cached
 
-    def search_lead(self, phone: str) -> List[Dict]:
-        """Search for a lead by phone number."""
         try:
             response = self._make_request(
                 method="GET",
-                endpoint=f"/search/Lead/{phone}"
+                endpoint=f"/search/Lead/{cache_key or phone}"
             )
-            return response
         except Exception as e:
             logger.error(f"Lead search failed: {str(e)}")
             raise
 
-    def create_lead(self, lead_data: Dict) -> Dict:
-        """Create a new lead."""
+        # Only positive answers are cached so a new lead is never hidden
+        if cache_key and isinstance(response, dict) and response.get("status") == "success":
+            self.lead_cache.set(cache_key, response)
+            lead_id = self._lead_id_of(response.get("lead"))
+            if lead_id:
+                with self._lead_cache_lock:
+                    self._lead_cache_keys[lead_id] = cache_key
+            self._store_in_replica(response)
+        return response
+
+    def list_leads(self, updated_since: int = 0, limit: int = 500, after_id: str = "") -> Dict:
+        """
+        List leads changed after a sync cursor, ordered by (updated_at, id).
+
+        Args:
+            updated_since: updated_at of the cursor
+            after_id: id of the cursor; leads with updated_at equal to
+                updated_since are returned only if their id sorts after it
+            limit: Maximum number of leads per page
+
+        Returns:
+            Dict: Response with a "leads" list
+        """
+        try:
+            return self._make_request(
+                method="GET",
+                endpoint="/list/Lead",
+                params={"updated_since": updated_since, "after_id": after_id, "limit": limit}
+            )
+        except Exception as e:
+            logger.error(f"Lead listing failed: {str(e)}")
+            raise
+
+    def search_leads_bulk(
+        self,
+        phones: Iterable[str],
+        max_concurrency: int = 8,
+        ordered: bool = True,
+        use_cache: bool = True,
+        rate_limited: bool = True
+    ) -> Iterator[BulkLookupResult]:
+        """
+        Look up many phone numbers concurrently, streaming results as they finish.
+
+        Input is consumed lazily and at most 2 * max_concurrency lookups are
+        pending or buffered at once, so arbitrarily long dial lists run in
+        constant memory. A failed lookup yields a result carrying the error
+        instead of aborting the batch. Lookups run at background priority so
+        they never delay interactive searches, and are held to the background
+        share of ReadyMode's hourly search quota unless rate_limited is False.
+
+        Args:
+            phones: Phone numbers to look up
+            max_concurrency: Maximum number of requests in flight
+            ordered: Yield results in input order instead of completion order
+            use_cache: Answer from the lead cache where possible
+            rate_limited: False skips the client-side limiter, for accounts
+                with a raised quota; ReadyMode may then throttle the batch
+
+        Returns:
+            Iterator[BulkLookupResult]: One result per input phone
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self._check_pool_size(max_concurrency)
+        window = max_concurrency * 2
+        phone_iter = enumerate(phones)
+        pending = {}
+        buffered: Dict[int, BulkLookupResult] = {}
+        next_index = 0
+        exhausted = False
+
+        def lookup(index: int, phone: str) -> BulkLookupResult:
+            try:
+                if not normalize_phone(phone):
+                    raise ValueError(f"Invalid phone number: {phone!r}")
+                with priority(BACKGROUND), exempt(not rate_limited):
+                    response = self.search_lead(phone, use_cache=use_cache)
+                return BulkLookupResult(index, phone, response, None)
+            except Exception as e:
+                return BulkLookupResult(index, phone, None, e)
+
+        pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="storm911-bulk")
+        try:
+            while True:
+                while not exhausted and len(pending) + len(buffered) < window:
+                    try:
+                        index, phone = next(phone_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[pool.submit(lookup, index, phone)] = index
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    result = future.result()
+                    if ordered:
+                        buffered[result.index] = result
+                    else:
+                        yield result
+
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+        finally:
+            # Stop outstanding lookups if the caller abandons the generator
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _check_pool_size(self, size: int):
+        """Warn when size workers would open more connections than the shared pools keep."""
+        pool_maxsize = get_adapter().pool_maxsize
+        if size > pool_maxsize:
+            logger.warning(
+                f"{size} concurrent requests exceed the HTTP pool size of {pool_maxsize}; "
+                f"extra connections will be closed after use (raise HTTP_POOL_CONFIG pool_maxsize)"
+            )
+
+    def create_lead(self, lead_data: Dict, idempotency_key: Optional[str] = None) -> Dict:
+        """Create a new lead; pass an idempotency key to make it safe to retry."""
         try:
             response = self._make_request(
                 method="POST",
                 endpoint="/create/Lead",
-                data=lead_data
+                data=lead_data,
+                idempotency_key=idempotency_key
             )
-            return response
         except Exception as e:
             logger.error(f"Lead creation failed: {str(e)}")
             raise
+        self._invalidate_lead_cache(lead_data=lead_data)
+        self._store_in_replica(response)
+        return response
 
     def update_lead(self, lead_id: str, lead_data: Dict) -> Dict:
         """Update an existing lead."""
@@ -114,10 +469,47 @@ class ReadyModeAPI:
                 endpoint=f"/update/Lead/{lead_id}",
                 data=lead_data
             )
-            return response
         except Exception as e:
             logger.error(f"Lead update failed: {str(e)}")
             raise
+        self._invalidate_lead_cache(lead_id=lead_id, lead_data=lead_data)
+        if not self._store_in_replica(response) and self.replica is not None:
+            self.replica.discard(lead_id)
+        return response
+
+    def _store_in_replica(self, response: Dict) -> bool:
+        """Write the lead carried by an API response through to the replica."""
+        lead = response.get("lead") if isinstance(response, dict) else None
+        if self.replica is None or not self._lead_id_of(lead):
+            return False
+        self.replica.upsert_many([lead])
+        return True
+
+    @staticmethod
+    def _lead_id_of(lead: Optional[Dict]) -> Optional[str]:
+        """Return the lead id from a lead payload, whichever field carries it."""
+        if not isinstance(lead, dict):
+            return None
+        for field in _LEAD_ID_FIELDS:
+            if lead.get(field):
+                return str(lead[field])
+        return None
+
+    def _invalidate_lead_cache(self, lead_id: Optional[str] = None, lead_data: Optional[Dict] = None):
+        """Drop cached searches that a lead mutation may have made stale."""
+        keys = set()
+        if lead_id is not None:
+            with self._lead_cache_lock:
+                key = self._lead_cache_keys.pop(str(lead_id), None)
+            if key:
+                keys.add(key)
+        for field in _LEAD_PHONE_FIELDS:
+            value = (lead_data or {}).get(field)
+            if value:
+                keys.add(normalize_phone(str(value)))
+        for key in keys:
+            if key:
+                self.lead_cache.invalidate(key)
 
     def get_lead_status(self, lead_id: str) -> Dict:
         """Get the current status of a lead."""
@@ -131,13 +523,14 @@ class ReadyModeAPI:
             logger.error(f"Lead status check failed: {str(e)}")
             raise
 
-    def create_appointment(self, appointment_data: Dict) -> Dict:
-        """Create a new appointment."""
+    def create_appointment(self, appointment_data: Dict, idempotency_key: Optional[str] = None) -> Dict:
+        """Create a new appointment; pass an idempotency key to make it safe to retry."""
         try:
             response = self._make_request(
                 method="POST",
                 endpoint="/create/Appointment",
-                data=appointment_data
+                data=appointment_data,
+                idempotency_key=idempotency_key
             )
             return response
         except Exception as e:
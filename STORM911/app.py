@@ -5,6 +5,7 @@ Handles application initialization, GUI setup, and core functionality.
 
 import os
 import sys
+import time
 import logging
 import logging.config
 import tkinter as tk
@@ -16,13 +17,51 @@ from config import (
     MIN_WINDOW_SIZE, 
     LOGGING_CONFIG, 
     APP_SETTINGS,
-    ASSETS_DIR
+    ASSETS_DIR,
+    API_TIMEOUT,
+    OUTBOX_CONFIG,
+    WEBHOOK_CONFIG
 )
+from executor import BackgroundExecutor
+from api import get_api_client, AuthenticationError
+from outbox import get_outbox, start_outbox_worker, stop_outbox_worker
+from replica import get_replica, start_replica_sync, stop_replica_sync
+from calendly import CalendlyAPI
+from calendly_auth import TokenManager
+from availability import AvailabilityEngine, TeamAvailability, start_availability_refresh, stop_availability_refresh
+from webhooks import WebhookProcessor, start_webhook_receiver, stop_webhook_receiver
+from phone import PhoneIndex, format_display, is_valid, national_number
+from models import FORM_FIELDS, CallRecord, LeadRecord
+from metrics import get_registry
+from script_compiler import get_compiled_script, html_to_text
 
 # Configure logging
 logging.config.dictConfig(LOGGING_CONFIG)
 logger = logging.getLogger(__name__)
 
+# Sample values shown for fields a loaded lead doesn't carry
+_LEAD_PLACEHOLDERS = {
+    "first_name": "John",
+    "last_name": "Doe",
+    "address": "123 Example St",
+    "city": "SampleCity",
+    "state": "TX",
+    "zip": "99999",
+    "phone": "0000000000",
+    "email": "test@example.com"
+}
+_CALL_PLACEHOLDERS = {
+    "roof_stories": "1 Story",
+    "roof_age": "5-9 Years",
+    "roof_type": "Shingles",
+    "has_insurance": "Yes",
+    "insurance_company": "Allstate",
+    "is_homeowner": "Yes",
+    "has_contractor": "No",
+    "appointment_date": "01/01/2025",
+    "appointment_time": "10:00 AM"
+}
+
 class Storm911App(ctk.CTk):
     """Main application window for Storm911."""
     
@@ -37,6 +76,23 @@ class Storm911App(ctk.CTk):
         ctk.set_appearance_mode("light")
         ctk.set_default_color_theme("blue")
         
+        # Worker pool for network, PDF and SMTP calls
+        self.executor = BackgroundExecutor(self)
+        self._search_task = None
+        
+        # Known numbers for search-as-you-type in the caller data panel
+        self.phone_index = PhoneIndex()
+        self._suggest_job = None
+        
+        # Lead and call details currently loaded into the caller data panel
+        self.current_call = None
+        
+        # AvailabilityEngine for the appointment scheduler, once Calendly is connected
+        self.availability = None
+        self.calendly_tokens = None
+        # TeamAvailability for organizations that book across several inspectors
+        self.team_availability = None
+        
         # Initialize UI components
         self.setup_ui()
         
@@ -102,6 +158,14 @@ class Storm911App(ctk.CTk):
             anchor=tk.W
         )
         self.status_bar.pack(fill=tk.X, pady=(10, 0))
+        
+        # Pending ReadyMode writes not yet delivered
+        self.outbox_label = ctk.CTkLabel(
+            self.main_container,
+            text="",
+            anchor=tk.W
+        )
+        self.outbox_label.pack(fill=tk.X)
 
     def setup_bindings(self):
         """Set up event bindings."""
@@ -196,8 +260,76 @@ class Storm911App(ctk.CTk):
 
     def initialize_api(self):
         """Initialize API connection."""
-        # Initialize API client here
-        pass
+        credentials = getattr(self, "credentials", None)
+        if not credentials:
+            return
+        client = get_api_client(credentials["username"], credentials["password"])
+        
+        # Deliver queued lead/appointment writes in the background
+        start_outbox_worker(client)
+        self.refresh_outbox_status()
+        
+        # Keep the local lead replica current so searches stay local
+        sync = start_replica_sync(client)
+        if sync is not None:
+            sync.add_listener(self.phone_index.add_leads)
+            self.executor.submit(self._load_phone_index, name="phone_index")
+        
+        # Warm the appointment calendar while the agent gets started
+        self.executor.submit(self._start_availability_prefetch, name="availability")
+
+    def _load_phone_index(self):
+        """Index the numbers already in the lead replica; executes on a worker thread."""
+        self.phone_index.add_leads(get_replica().iter_leads())
+        logger.info(f"Phone index loaded with {len(self.phone_index)} numbers")
+
+    def _start_availability_prefetch(self):
+        """Build the availability engine and start keeping it loaded; executes on a worker thread."""
+        calendly_settings = self.settings.setdefault("calendly", {})
+        calendly_api = CalendlyAPI()
+        # Reuse the persisted token; settings.json tokens are migrated on first run
+        self.calendly_tokens = TokenManager(
+            calendly_api,
+            client_id=calendly_settings.get("client_id"),
+            client_secret=calendly_settings.get("client_secret")
+        )
+        if not self.calendly_tokens.load(fallback={
+            "access_token": calendly_settings.pop("access_token", None),
+            "refresh_token": calendly_settings.pop("refresh_token", None)
+        }):
+            logger.info("Calendly not connected; scheduler will offer business hours")
+            return
+        self.calendly_tokens.start()
+        
+        user_uri = calendly_settings.get("user_uri")
+        if not user_uri:
+            user_uri = calendly_api.get_user()["resource"]["uri"]
+            calendly_settings["user_uri"] = user_uri
+        self.availability = AvailabilityEngine(calendly_api, user_uri)
+        if calendly_settings.get("organization_uri"):
+            self.team_availability = TeamAvailability(calendly_api, calendly_settings["organization_uri"])
+        refresher = start_availability_refresh(self.availability)
+        
+        # Apply bookings pushed by Calendly between refreshes
+        start_webhook_receiver(WebhookProcessor(
+            calendly_settings.get("webhook_signing_key") or WEBHOOK_CONFIG["signing_key"],
+            availability=self.availability,
+            refresher=refresher,
+            team=self.team_availability
+        ))
+
+    def refresh_outbox_status(self):
+        """Show queued write counts and reschedule the next refresh."""
+        counts = get_outbox().counts()
+        waiting = counts["pending"] + counts["in_flight"]
+        if counts["failed"]:
+            text = f"Sync: {waiting} pending, {counts['failed']} failed"
+        elif waiting:
+            text = f"Sync: {waiting} pending"
+        else:
+            text = "Sync: up to date"
+        self.outbox_label.configure(text=text)
+        self.after(OUTBOX_CONFIG["status_refresh_ms"], self.refresh_outbox_status)
 
     def load_user_data(self):
         """Load user data if available."""
@@ -213,6 +345,15 @@ class Storm911App(ctk.CTk):
             except Exception as e:
                 logger.error(f"Error saving settings: {str(e)}")
             
+            self.executor.shutdown()
+            stop_outbox_worker()
+            stop_replica_sync()
+            stop_webhook_receiver()
+            if self.team_availability is not None:
+                self.team_availability.close()
+            stop_availability_refresh()
+            if self.calendly_tokens is not None:
+                self.calendly_tokens.stop()
             logger.info("Application closing")
             self.quit()
 
@@ -318,11 +459,30 @@ if __name__ == "__main__":
         ctk.CTkLabel(search_frame, text="Phone:", font=DEFAULT_FONT).pack(side="left", padx=5)
         phone_ent = ctk.CTkEntry(search_frame, textvariable=self.phone_search_var, width=120)
         phone_ent.pack(side="left", padx=5)
-        btn = ctk.CTkButton(search_frame, text="SEARCH / LOAD", command=self.handle_lead_search)
-        btn.pack(side="left", padx=5)
+        phone_ent.bind("<KeyRelease>", self.on_phone_typed)
+        phone_ent.bind("<Down>", lambda e: self.focus_suggestions())
+        self.search_btn = ctk.CTkButton(search_frame, text="SEARCH / LOAD", command=self.handle_lead_search)
+        self.search_btn.pack(side="left", padx=5)
+
+        # Matches from the local phone index, shown while typing
+        self.search_frame = search_frame
+        self.suggestion_list = tk.Listbox(self.left_panel, height=6, font=DEFAULT_FONT, activestyle="none")
+        self.suggestion_list.bind("<Double-Button-1>", self.pick_suggestion)
+        self.suggestion_list.bind("<Return>", self.pick_suggestion)
+        self.suggestion_list.bind("<Escape>", lambda e: self.hide_suggestions())
+        self._suggestions = []
+
+        self.search_status_var = ctk.StringVar(value="")
+        ctk.CTkLabel(
+            self.left_panel,
+            textvariable=self.search_status_var,
+            font=DEFAULT_FONT,
+            text_color=COLORS["neutral_grey"]
+        ).pack(anchor="w", padx=10)
 
         data_frame = ctk.CTkFrame(self.left_panel, fg_color=COLORS["white"])
         data_frame.pack(expand=True, fill="both", padx=5, pady=5)
+        self.caller_data_frame = data_frame
 
         ctk.CTkLabel(
             data_frame,
@@ -427,52 +587,155 @@ if __name__ == "__main__":
             self.insurance_company_var.set("")
             self.insurance_entry.configure(state="disabled")
 
+    def on_phone_typed(self, event=None):
+        """Refresh suggestions shortly after the agent stops typing."""
+        if event is not None and event.keysym in ("Down", "Up", "Return", "Escape"):
+            if event.keysym == "Return":
+                self.hide_suggestions()
+                self.handle_lead_search()
+            elif event.keysym == "Escape":
+                self.hide_suggestions()
+            return
+        if self._suggest_job is not None:
+            self.after_cancel(self._suggest_job)
+        self._suggest_job = self.after(120, self.show_suggestions)
+
+    def show_suggestions(self):
+        """List indexed numbers matching the typed prefix; no network call is made."""
+        self._suggest_job = None
+        typed = self.phone_search_var.get()
+        if len(national_number(typed)) < 3:
+            self.hide_suggestions()
+            return
+        self._suggestions = self.phone_index.suggest(typed, limit=8)
+        if not self._suggestions:
+            self.hide_suggestions()
+            return
+        self.suggestion_list.delete(0, tk.END)
+        for number, label in self._suggestions:
+            self.suggestion_list.insert(tk.END, f"{format_display(number)}  {label}".rstrip())
+        self.suggestion_list.configure(height=len(self._suggestions))
+        if not self.suggestion_list.winfo_ismapped():
+            self.suggestion_list.pack(after=self.search_frame, fill="x", padx=10)
+
+    def hide_suggestions(self):
+        self._suggestions = []
+        if self.suggestion_list.winfo_ismapped():
+            self.suggestion_list.pack_forget()
+
+    def focus_suggestions(self):
+        if self._suggestions:
+            self.suggestion_list.focus_set()
+            self.suggestion_list.selection_clear(0, tk.END)
+            self.suggestion_list.selection_set(0)
+            self.suggestion_list.activate(0)
+
+    def pick_suggestion(self, event=None):
+        """Load the selected suggestion into the search box and search it."""
+        selection = self.suggestion_list.curselection()
+        if not selection:
+            return
+        number, _ = self._suggestions[selection[0]]
+        self.phone_search_var.set(format_display(number))
+        self.hide_suggestions()
+        self.handle_lead_search()
+
     def handle_lead_search(self):
         phone = self.phone_search_var.get().strip()
         if not phone:
             tkmsg.showwarning("Error", "Enter phone number to search.")
             return
+        if not is_valid(phone):
+            tkmsg.showwarning("Error", "Enter a complete phone number to search.")
+            return
+        phone = format_display(phone)
+        self.phone_search_var.set(phone)
+
+        # A new search supersedes any lookup still in flight
+        self.cancel_lead_search()
+
+        self.search_status_var.set(f"Searching {phone}\u2026")
+        self._search_task = self.executor.submit(
+            self._fetch_lead,
+            phone,
+            name="lead_search",
+            on_success=self._on_lead_search_done,
+            on_error=self._on_lead_search_error,
+            on_progress=self.search_status_var.set
+        )
 
-        url = f"{READYMODE_API_BASE}/search/Lead/{phone}"
-        params = {
-            "API_user": self.credentials["username"],
-            "API_pass": self.credentials["password"]
-        }
+    def cancel_lead_search(self):
+        """Cancel the lead lookup in flight, if any."""
+        if self._search_task is not None and not self._search_task.done():
+            self._search_task.cancel()
+        self._search_task = None
+        self.search_status_var.set("")
+
+    def _fetch_lead(self, phone, task):
+        """Run the ReadyMode lead search; executes on a worker thread."""
+        client = get_api_client(self.credentials["username"], self.credentials["password"])
         try:
-            r = requests.get(url, params=params)
-            if r.status_code == 200:
-                data = r.json()
-                if data.get("status") == "success":
-                    ans = tkmsg.askyesno("Lead Found", "Populate data from lead?")
-                    if ans:
-                        self.populate_lead_data(data)
-                else:
-                    tkmsg.showinfo("No Lead", "No lead found.")
-            else:
-                tkmsg.showwarning("Error", "Error searching lead. Invalid credentials or phone?")
-        except Exception as e:
-            logger.error(f"Search error: {e}")
-            tkmsg.showwarning("Error", "Connection error searching lead.")
+            data = client.search_lead(phone)
+        except AuthenticationError:
+            return None
+        task.check_cancelled()
+        task.report_progress("Reading lead data\u2026")
+        return data
+
+    def _on_lead_search_done(self, data):
+        self._search_task = None
+        self.search_status_var.set("")
+        if data is None:
+            tkmsg.showwarning("Error", "Error searching lead. Invalid credentials or phone?")
+        elif data.get("status") == "success":
+            lead = data.get("lead") or {}
+            name = f"{lead.get('firstName', '')} {lead.get('lastName', '')}".strip()
+            self.phone_index.add_call(self.phone_search_var.get(), name)
+            ans = tkmsg.askyesno("Lead Found", "Populate data from lead?")
+            if ans:
+                self.populate_lead_data(data)
+        else:
+            tkmsg.showinfo("No Lead", "No lead found.")
+
+    def _on_lead_search_error(self, error):
+        self._search_task = None
+        self.search_status_var.set("")
+        logger.error(f"Search error: {error}")
+        tkmsg.showwarning("Error", "Connection error searching lead.")
 
     def populate_lead_data(self, lead_json):
-        lead = lead_json.get("lead", {})
-        self.customer_name_var.set(lead.get("firstName","John")+" "+lead.get("lastName","Doe"))
-        self.address_var.set(lead.get("address","123 Example St"))
-        self.city_var.set(lead.get("city","SampleCity"))
-        self.state_var.set(lead.get("state","TX"))
-        self.zip_var.set(lead.get("zip","99999"))
-        self.phone_var.set(lead.get("phone","0000000000"))
-        self.cell_var.set("")
-        self.email_var.set(lead.get("email","test@example.com"))
-        self.roof_stories_var.set("1 Story")
-        self.roof_age_var.set("5-9 Years")
-        self.roof_type_var.set("Shingles")
-        self.has_insurance_var.set("Yes")
-        self.insurance_company_var.set("Allstate")
-        self.is_homeowner_var.set("Yes")
-        self.has_contractor_var.set("No")
-        self.appointment_date_var.set("01/01/2025")
-        self.appointment_time_var.set("10:00 AM")
+        lead = LeadRecord(lead_json.get("lead"), defaults=_LEAD_PLACEHOLDERS)
+        self.current_call = CallRecord(lead, **_CALL_PLACEHOLDERS)
+        self.populate_form(self.current_call)
+
+    def populate_form(self, record):
+        """
+        Apply a whole CallRecord, or a dict keyed by FORM_FIELDS, to the caller data panel.
+
+        Unchanged fields are skipped, so their variable traces and entry
+        redraws don't fire. Tk already coalesces the remaining redraws into
+        one idle pass; the time until it has run is recorded as the
+        ui.populate_form timer.
+        """
+        started = time.perf_counter()
+        values = record.form_values() if isinstance(record, CallRecord) else record
+        for field, value in values.items():
+            var = getattr(self, f"{field}_var")
+            if var.get() != value:
+                var.set(value)
+        if "has_insurance" in values:
+            self.insurance_entry.configure(state="normal" if values["has_insurance"] == "Yes" else "disabled")
+        # Idle callbacks run in order, so this fires after the pending redraw
+        self.after_idle(self._record_populate_time, started)
+
+    def _record_populate_time(self, started):
+        elapsed = time.perf_counter() - started
+        get_registry().observe("ui.populate_form", elapsed)
+        logger.debug(f"Caller data panel populated in {elapsed * 1000:.1f} ms")
+
+    def read_form(self):
+        """Return the caller data panel values keyed by FORM_FIELDS."""
+        return {field: getattr(self, f"{field}_var").get() for field in FORM_FIELDS}
 
     # ---------------------------------------------------------------------
     # CENTER PANEL - SCRIPT / TRANSCRIPT
@@ -514,20 +777,16 @@ if __name__ == "__main__":
         )
         self.reset_btn.pack(side="left", padx=5)
 
+        # Script pages as ready-to-insert text, converted once
+        self.script_pages = get_compiled_script()
+        self.total_pages = len(self.script_pages)
         self.display_script_page(0)
 
     def display_script_page(self, idx):
         self.current_page_index = idx
-        page = FULL_SCRIPT_PAGES[idx]
 
         self.script_box.delete("1.0", "end")
-
-        if page["title"]:
-            self.script_box.insert("end", page["title"] + "\n\n")
-
-        content_txt = page["content_html"].replace("<br>", "\n").replace("<li>", " - ").replace("</li>", "\n")
-        content_txt = re.sub(r"<[^>]+>", "", content_txt)
-        self.script_box.insert("end", content_txt)
+        self.script_box.insert("end", self.script_pages[idx])
 
         if idx == 0:
             self.prev_btn.configure(state="disabled")
@@ -565,6 +824,8 @@ if __name__ == "__main__":
 
     def reset_all(self):
         """Reset all form fields and variables to their default state."""
+        self.cancel_lead_search()
+        self.hide_suggestions()
         self.phone_search_var.set("")
         self.customer_name_var.set("")
         self.address_var.set("")
@@ -617,27 +878,27 @@ if __name__ == "__main__":
             tkmsg.showwarning("Error", f"No definition for {oid}")
 
     def collectDataForPDF(self):
+        record = CallRecord.from_form(self.read_form())
+        lead = record.lead
         data_map = {
             "Lead.campaign": "Storm911",
-            "Profile.First Name": self.customer_name_var.get().split(" ")[0]
-                                 if self.customer_name_var.get() else "",
-            "Profile.Last Name": " ".join(self.customer_name_var.get().split(" ")[1:])
-                                 if len(self.customer_name_var.get().split(" ")) > 1 else "",
-            "Profile.Address": self.address_var.get(),
-            "Profile.City": self.city_var.get(),
-            "Profile.State": self.state_var.get(),
-            "Profile.Zip Code": self.zip_var.get(),
-            "Profile.Phone Number": self.phone_var.get(),
-            "Profile.Cell Phone": self.cell_var.get(),
-            "Profile.Has Insurance": self.has_insurance_var.get(),
-            "Profile. Insurance Co. Name": self.insurance_company_var.get(),
-            "Profile.Email": self.email_var.get(),
-            "Profile.Roof Type": self.roof_type_var.get(),
-            "Profile.Roof Age": self.roof_age_var.get(),
-            "Profile.How Many Stories is House": self.roof_stories_var.get(),
-            "Profile.Call Notes": "",
-            "Profile.Appointment Time.Date": self.appointment_date_var.get(),
-            "Profile.Appointment Time.Time": self.appointment_time_var.get(),
+            "Profile.First Name": lead.first_name,
+            "Profile.Last Name": lead.last_name,
+            "Profile.Address": lead.address,
+            "Profile.City": lead.city,
+            "Profile.State": lead.state,
+            "Profile.Zip Code": lead.zip,
+            "Profile.Phone Number": lead.phone,
+            "Profile.Cell Phone": lead.cell,
+            "Profile.Has Insurance": record.has_insurance,
+            "Profile. Insurance Co. Name": record.insurance_company,
+            "Profile.Email": lead.email,
+            "Profile.Roof Type": record.roof_type,
+            "Profile.Roof Age": record.roof_age,
+            "Profile.How Many Stories is House": record.roof_stories,
+            "Profile.Call Notes": record.notes,
+            "Profile.Appointment Time.Date": record.appointment_date,
+            "Profile.Appointment Time.Time": record.appointment_time,
             "Profile.Appointment Confirmed": "Yes"
         }
         return data_map
@@ -768,7 +1029,13 @@ class CallDispositionPopup(ctk.CTkToplevel):
     
     def open_scheduler(self):
         """Open appointment scheduler window."""
-        AppointmentWindow(self, callback=self.on_appointment_set)
+        AppointmentWindow(
+            self,
+            callback=self.on_appointment_set,
+            availability=self.main_gui.availability,
+            team=self.main_gui.team_availability,
+            executor=self.main_gui.executor
+        )
     
     def on_appointment_set(self, appointment: Dict):
         """Handle appointment being set."""
@@ -847,13 +1114,13 @@ class PDFExportPopup(ctk.CTkToplevel):
         btn_frame = ctk.CTkFrame(self)
         btn_frame.pack(pady=10)
 
-        export_btn = ctk.CTkButton(
+        self.export_btn = ctk.CTkButton(
             btn_frame,
             text="EXPORT",
             fg_color=COLORS["success_green"],
             command=self.export_pdf
         )
-        export_btn.pack(side="left", padx=5)
+        self.export_btn.pack(side="left", padx=5)
 
         close_btn = ctk.CTkButton(
             btn_frame,
@@ -885,16 +1152,38 @@ class PDFExportPopup(ctk.CTkToplevel):
         filename = chosen_name.replace(" ", "_") + ".pdf"
         filepath = os.path.join(EXPORTS_DIR, filename)
 
+        self.export_btn.configure(state="disabled", text="EXPORTING\u2026")
+        self.main_gui.executor.submit(
+            self.build_pdf,
+            filepath,
+            replaced_text,
+            name="pdf_export",
+            on_success=self._on_export_done,
+            on_error=self._on_export_error
+        )
+
+    @staticmethod
+    def build_pdf(filepath, text):
+        """Render the PDF to disk; executes on a worker thread."""
         doc = SimpleDocTemplate(filepath, pagesize=letter)
         styles = getSampleStyleSheet()
         story = []
-        for line in replaced_text.split("\n"):
+        for line in text.split("\n"):
             story.append(Paragraph(line, styles["Normal"]))
             story.append(Spacer(1, 12))
         doc.build(story)
+        return filepath
 
+    def _on_export_done(self, filepath):
         tkmsg.showinfo("PDF Export", f"PDF exported to {filepath}")
-        self.destroy()
+        if self.winfo_exists():
+            self.destroy()
+
+    def _on_export_error(self, error):
+        logger.error(f"PDF export error: {error}")
+        tkmsg.showwarning("Error", "Failed to export PDF.")
+        if self.winfo_exists():
+            self.export_btn.configure(state="normal", text="EXPORT")
 
     def replace_placeholders(self, text, data_map):
         for k, v in data_map.items():
@@ -945,13 +1234,13 @@ class EmailSendPopup(ctk.CTkToplevel):
         btn_frame = ctk.CTkFrame(self)
         btn_frame.pack(pady=10)
 
-        send_btn = ctk.CTkButton(
+        self.send_btn = ctk.CTkButton(
             btn_frame,
             text="SEND",
             fg_color=COLORS["success_green"],
             command=self.send_email
         )
-        send_btn.pack(side="left", padx=5)
+        self.send_btn.pack(side="left", padx=5)
 
         close_btn = ctk.CTkButton(
             btn_frame,
@@ -982,24 +1271,46 @@ class EmailSendPopup(ctk.CTkToplevel):
             tkmsg.showwarning("Error", "Subject or body is empty.")
             return
         recipient = SMTP_SETTINGS["default_recipient"]
-        try:
-            msg = MIMEMultipart()
-            msg["From"] = SMTP_SETTINGS["username"]
-            msg["To"] = recipient
-            msg["Subject"] = subject
-            msg.attach(MIMEText(body, "plain"))
+        msg = MIMEMultipart()
+        msg["From"] = SMTP_SETTINGS["username"]
+        msg["To"] = recipient
+        msg["Subject"] = subject
+        msg.attach(MIMEText(body, "plain"))
+
+        self.send_btn.configure(state="disabled")
+        self.main_gui.executor.submit(
+            self.deliver,
+            msg,
+            name="email_send",
+            on_success=lambda _: self._on_send_done(recipient),
+            on_error=self._on_send_error,
+            on_progress=lambda stage: self.send_btn.configure(text=stage)
+        )
 
-            server = smtplib.SMTP(SMTP_SETTINGS["server"], SMTP_SETTINGS["port"])
+    @staticmethod
+    def deliver(msg, task):
+        """Send the message over SMTP; executes on a worker thread."""
+        task.report_progress("CONNECTING\u2026")
+        server = smtplib.SMTP(SMTP_SETTINGS["server"], SMTP_SETTINGS["port"], timeout=API_TIMEOUT)
+        try:
             server.starttls()
             server.login(SMTP_SETTINGS["username"], SMTP_SETTINGS["password"])
+            task.check_cancelled()
+            task.report_progress("SENDING\u2026")
             server.send_message(msg)
+        finally:
             server.quit()
 
-            tkmsg.showinfo("Email Sent", f"Email sent to {recipient}")
+    def _on_send_done(self, recipient):
+        tkmsg.showinfo("Email Sent", f"Email sent to {recipient}")
+        if self.winfo_exists():
             self.destroy()
-        except Exception as e:
-            logger.error(f"Email send error: {e}")
-            tkmsg.showwarning("Error", "Failed to send email.")
+
+    def _on_send_error(self, error):
+        logger.error(f"Email send error: {error}")
+        tkmsg.showwarning("Error", "Failed to send email.")
+        if self.winfo_exists():
+            self.send_btn.configure(state="normal", text="SEND")
 
     def replace_placeholders(self, text, data_map):
         for k, v in data_map.items():
@@ -1041,9 +1352,7 @@ class ObjectionPopup(ctk.CTkToplevel):
             tb = ctk.CTkTextbox(self, wrap="word")
             tb.pack(expand=True, fill="both", padx=10, pady=10)
 
-            content_txt = obj_def["content_html"].replace("<br>", "\n").replace("<li>", " - ").replace("</li>", "\n")
-            content_txt = re.sub(r"<[^>]+>", "", content_txt)
-            tb.insert("1.0", content_txt)
+            tb.insert("1.0", html_to_text(obj_def["content_html"]))
             tb.configure(state="disabled")
 
             btn_frame = ctk.CTkFrame(self)
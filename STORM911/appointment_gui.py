@@ -7,17 +7,67 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import customtkinter as ctk
 from datetime import datetime, timedelta
+import time
 import calendar
-from typing import Dict, Callable, Optional
+from typing import Dict, Callable, List, Optional, Tuple
+
+from config import COLORS, TITLE_FONT, HEADER_FONT, NORMAL_FONT, SMALL_FONT, APP_SETTINGS, AVAILABILITY_CONFIG
+from metrics import get_registry
+
+# Day cells in the calendar: six weeks always fit a month
+_CALENDAR_CELLS = 42
+_SUNDAY_FIRST = calendar.Calendar(firstweekday=calendar.SUNDAY)
+
+
+class _PooledButton:
+    """
+    A reusable button that remembers its last configuration.
+
+    show() only calls configure() when the text, colour or state actually
+    changed, since every CTkButton configure redraws its canvas.
+    """
+
+    __slots__ = ("widget", "pack", "_config", "_visible")
+
+    def __init__(self, widget, pack: Optional[Dict] = None):
+        self.widget = widget
+        # pack() options, or None for a widget placed with grid()
+        self.pack = pack
+        self._config = None
+        self._visible = False
+
+    def show(self, **config):
+        if config != self._config:
+            self.widget.configure(**config)
+            self._config = config
+        if not self._visible:
+            if self.pack is None:
+                self.widget.grid()
+            else:
+                self.widget.pack(**self.pack)
+            self._visible = True
+
+    def hide(self):
+        if self._visible:
+            if self.pack is None:
+                self.widget.grid_remove()
+            else:
+                self.widget.pack_forget()
+            self._visible = False
 
-from config import COLORS, TITLE_FONT, HEADER_FONT, NORMAL_FONT, APP_SETTINGS
 
 class AppointmentWindow(ctk.CTkToplevel):
     """Appointment scheduling window."""
     
-    def __init__(self, parent, callback: Optional[Callable] = None):
+    def __init__(self, parent, callback: Optional[Callable] = None, availability=None, team=None, executor=None):
         super().__init__(parent)
         self.callback = callback
+        # AvailabilityEngine with busy times loaded; None shows every slot as open
+        self.availability = availability
+        # TeamAvailability adding free-inspector counts to each slot, if set up
+        self.team = team
+        # BackgroundExecutor that fetches uncached team views off the Tk thread
+        self.executor = executor
         
         self.title("Schedule Appointment")
         self.geometry("800x600")
@@ -32,6 +82,8 @@ class AppointmentWindow(ctk.CTkToplevel):
         # Initialize variables
         self.selected_date = datetime.now()
         self.selected_time = None
+        # Pending show_cache_age refresh, cancelled in destroy
+        self._cache_age_job = None
         
         # Build UI
         self.create_ui()
@@ -142,12 +194,7 @@ class AppointmentWindow(ctk.CTkToplevel):
         self.create_calendar_grid()
 
     def create_calendar_grid(self):
-        """Create the calendar day grid."""
-        # Clear existing calendar
-        for widget in self.calendar_frame.winfo_children():
-            widget.destroy()
-        
-        # Add day headers
+        """Create the day headers and the pool of 42 day buttons, once."""
         days = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
         for i, day in enumerate(days):
             lbl = ctk.CTkLabel(
@@ -157,47 +204,51 @@ class AppointmentWindow(ctk.CTkToplevel):
             )
             lbl.grid(row=0, column=i, padx=2, pady=2)
         
-        # Get calendar for current month
-        cal = calendar.monthcalendar(
-            self.selected_date.year,
-            self.selected_date.month
-        )
+        # Six weeks covers every month; cells are reconfigured, never rebuilt
+        self.day_buttons = []
+        self.day_dates = [None] * _CALENDAR_CELLS
+        for cell in range(_CALENDAR_CELLS):
+            btn = ctk.CTkButton(
+                self.calendar_frame,
+                text="",
+                width=30,
+                height=30,
+                command=lambda c=cell: self.select_date(self.day_dates[c])
+            )
+            btn.grid(row=cell // 7 + 1, column=cell % 7, padx=2, pady=2)
+            btn.grid_remove()
+            self.day_buttons.append(_PooledButton(btn))
         
-        # Add day buttons
+        self.refresh_calendar_grid()
+
+    def refresh_calendar_grid(self):
+        """Show the selected month in the day button pool."""
+        weeks = _SUNDAY_FIRST.monthdatescalendar(self.selected_date.year, self.selected_date.month)
         today = datetime.now().date()
-        current_month = self.selected_date.replace(day=1)
-        
-        for week_num, week in enumerate(cal):
-            for day_num, day in enumerate(week):
-                if day != 0:
-                    date = current_month.replace(day=day).date()
-                    
-                    # Determine button style
-                    if date < today:
-                        state = "disabled"
-                        color = COLORS["neutral_grey"]
-                    else:
-                        state = "normal"
-                        color = COLORS["primary_blue"]
-                    
-                    if date == self.selected_date.date():
-                        color = COLORS["success_green"]
-                    
-                    btn = ctk.CTkButton(
-                        self.calendar_frame,
-                        text=str(day),
-                        width=30,
-                        height=30,
-                        fg_color=color,
-                        state=state,
-                        command=lambda d=date: self.select_date(d)
-                    )
-                    btn.grid(
-                        row=week_num + 1,
-                        column=day_num,
-                        padx=2,
-                        pady=2
-                    )
+        selected = self.selected_date.date()
+        month = self.selected_date.month
+        
+        cells = [day for week in weeks for day in week]
+        for cell, button in enumerate(self.day_buttons):
+            date = cells[cell] if cell < len(cells) else None
+            if date is None or date.month != month:
+                self.day_dates[cell] = None
+                button.hide()
+                continue
+            self.day_dates[cell] = date
+            
+            # Determine button style
+            if date < today:
+                state = "disabled"
+                color = COLORS["neutral_grey"]
+            else:
+                state = "normal"
+                color = COLORS["primary_blue"]
+            
+            if date == selected:
+                color = COLORS["success_green"]
+            
+            button.show(text=str(date.day), fg_color=color, state=state)
 
     def create_time_slots(self, parent):
         """Create the time slots panel."""
@@ -213,56 +264,162 @@ class AppointmentWindow(ctk.CTkToplevel):
         self.time_frame = ctk.CTkFrame(parent)
         self.time_frame.pack(expand=True, fill="both", padx=5, pady=5)
         
-        # Will be populated by load_availability()
+        # Slot buttons, created on first use and reconfigured by load_availability()
+        self.slot_buttons = []
+        self.slot_times = []
+        
+        # Soonest open slots from the selected date on
+        self.next_free_label = ctk.CTkLabel(
+            parent,
+            text="",
+            font=NORMAL_FONT,
+            justify="left"
+        )
+        self.next_free_label.pack(fill="x", padx=5, pady=5)
+        
+        # How old the busy times behind the slots are
+        self.cache_age_label = ctk.CTkLabel(
+            parent,
+            text="",
+            font=SMALL_FONT,
+            text_color=COLORS["neutral_grey"]
+        )
+        self.cache_age_label.pack(fill="x", padx=5, pady=(0, 5))
+        self.show_cache_age()
 
     def load_availability(self):
         """Load available time slots for selected date."""
-        # Clear existing time slots
-        for widget in self.time_frame.winfo_children():
-            widget.destroy()
-        
-        # Example time slots (9 AM to 5 PM)
-        start_hour = 9
-        end_hour = 17
-        
-        for hour in range(start_hour, end_hour):
-            for minute in [0, 30]:
-                time_str = f"{hour:02d}:{minute:02d}"
-                
-                # Example: Randomly make some slots unavailable
-                import random
-                available = random.choice([True, True, True, False])
-                
-                if available:
-                    color = COLORS["primary_blue"]
-                    state = "normal"
-                else:
-                    color = COLORS["neutral_grey"]
-                    state = "disabled"
-                
-                # If this is the selected time, highlight it
-                if self.selected_time == time_str:
-                    color = COLORS["success_green"]
-                
-                btn = ctk.CTkButton(
-                    self.time_frame,
-                    text=time_str,
-                    fg_color=color,
-                    state=state,
-                    command=lambda t=time_str: self.select_time(t)
-                )
-                btn.pack(fill="x", padx=5, pady=2)
+        capacity = self.get_team_capacity()
+        slots = self.get_slots()
+        self.slot_times = [slot.strftime("%H:%M") for slot, _ in slots]
+        for index, (slot, available) in enumerate(slots):
+            time_str = slot.strftime("%H:%M")
+            label = time_str
+            if capacity is not None:
+                free = capacity.get(slot, 0)
+                available = available and free > 0
+                label = f"{time_str}  ({free} free)"
+            
+            if available:
+                color = COLORS["primary_blue"]
+                state = "normal"
+            else:
+                color = COLORS["neutral_grey"]
+                state = "disabled"
+            
+            # If this is the selected time, highlight it
+            if self.selected_time == time_str:
+                color = COLORS["success_green"]
+            
+            self._slot_button(index).show(text=label, fg_color=color, state=state)
+        
+        for button in self.slot_buttons[len(slots):]:
+            button.hide()
+        
+        self.show_next_free()
+
+    def _slot_button(self, index: int) -> "_PooledButton":
+        """Return the index-th slot button, creating buttons up to it on first use."""
+        while len(self.slot_buttons) <= index:
+            btn = ctk.CTkButton(
+                self.time_frame,
+                text="",
+                command=lambda i=len(self.slot_buttons): self.select_time(self.slot_times[i])
+            )
+            self.slot_buttons.append(_PooledButton(btn, pack={"fill": "x", "padx": 5, "pady": 2}))
+        return self.slot_buttons[index]
+
+    def get_slots(self) -> List[Tuple[datetime, bool]]:
+        """Return (slot start, is free) for the selected date, answered locally."""
+        day = self.selected_date.date()
+        now = datetime.now()
+        if self.availability is not None and self.availability.covers(day):
+            slots = self.availability.slots_for_day(day)
+        else:
+            # Busy times not loaded for this date; offer business hours
+            first = datetime.combine(day, datetime.min.time()).replace(hour=AVAILABILITY_CONFIG["day_start_hour"])
+            count = (AVAILABILITY_CONFIG["day_end_hour"] - AVAILABILITY_CONFIG["day_start_hour"]) * 60
+            count //= AVAILABILITY_CONFIG["slot_minutes"]
+            slots = [
+                (first + timedelta(minutes=AVAILABILITY_CONFIG["slot_minutes"] * i), True)
+                for i in range(count)
+            ]
+        return [(slot, free and slot > now) for slot, free in slots]
+
+    def get_team_capacity(self) -> Optional[Dict[datetime, int]]:
+        """
+        Return free inspectors per slot on the selected date.
+
+        Returns None without a team view, or while an uncached day is
+        fetched in the background; the slots are redrawn once it arrives.
+        """
+        if self.team is None or self.executor is None:
+            return None
+        day = self.selected_date.date()
+        capacity = self.team.cached_capacity(day)
+        if capacity is None:
+            self.executor.submit(
+                self.team.capacity_for_day,
+                day,
+                name="team_availability",
+                on_success=lambda _, day=day: self._on_team_capacity(day)
+            )
+            return None
+        return {slot: len(free) for slot, free in capacity}
+
+    def _on_team_capacity(self, day):
+        """Redraw the slots if the fetched day is still selected and now cached."""
+        # Redrawing an uncached day would only submit the same fetch again
+        if self.team.cached_capacity(day) is None:
+            return
+        if self.winfo_exists() and self.selected_date.date() == day:
+            self.load_availability()
+
+    def show_next_free(self):
+        """List the next few free slots from the selected date."""
+        if self.availability is None:
+            self.next_free_label.configure(text="Calendar availability not loaded")
+            return
+        after = max(self.selected_date, datetime.now())
+        slots = self.availability.next_free_slots(after, count=3)
+        if slots:
+            text = "Next available:\n" + "\n".join(slot.strftime("%a %b %d, %I:%M %p") for slot in slots)
+        else:
+            text = "No open slots in the loaded calendar window"
+        self.next_free_label.configure(text=text)
+
+    def show_cache_age(self):
+        """Show how long ago availability was refreshed, updating every 30 seconds."""
+        age = self.availability.age() if self.availability is not None else None
+        if age is None:
+            text = "Availability not loaded yet"
+        elif age < 60:
+            text = "Availability updated just now"
+        else:
+            text = f"Availability updated {int(age // 60)} min ago"
+        self.cache_age_label.configure(text=text)
+        self._cache_age_job = self.after(30000, self.show_cache_age)
+
+    def destroy(self):
+        """Cancel the cache age refresh, then close the window."""
+        if self._cache_age_job is not None:
+            self.after_cancel(self._cache_age_job)
+            self._cache_age_job = None
+        super().destroy()
 
     def previous_month(self):
         """Go to previous month."""
+        started = time.perf_counter()
         self.selected_date = self.selected_date.replace(day=1) - timedelta(days=1)
         self.month_label.configure(
             text=self.selected_date.strftime("%B %Y")
         )
-        self.create_calendar_grid()
+        self.refresh_calendar_grid()
+        self._record_paint_time("ui.scheduler_month", started)
 
     def next_month(self):
         """Go to next month."""
+        started = time.perf_counter()
         self.selected_date = (
             self.selected_date.replace(day=1) + 
             timedelta(days=32)
@@ -270,18 +427,27 @@ class AppointmentWindow(ctk.CTkToplevel):
         self.month_label.configure(
             text=self.selected_date.strftime("%B %Y")
         )
-        self.create_calendar_grid()
+        self.refresh_calendar_grid()
+        self._record_paint_time("ui.scheduler_month", started)
 
     def select_date(self, date):
         """Handle date selection."""
+        started = time.perf_counter()
         self.selected_date = datetime.combine(date, datetime.min.time())
-        self.create_calendar_grid()
+        self.refresh_calendar_grid()
         self.load_availability()
+        self._record_paint_time("ui.scheduler_date", started)
 
     def select_time(self, time_str):
         """Handle time slot selection."""
+        started = time.perf_counter()
         self.selected_time = time_str
         self.load_availability()
+        self._record_paint_time("ui.scheduler_time", started)
+
+    def _record_paint_time(self, name: str, started: float):
+        """Record the time from a click until Tk has painted its result."""
+        self.after_idle(lambda: get_registry().observe(name, time.perf_counter() - started))
 
     def schedule_appointment(self):
         """Handle appointment scheduling."""
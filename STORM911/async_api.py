@@ -0,0 +1,336 @@
+"""
+Asyncio API client module for Storm911.
+Async counterpart of ReadyModeAPI for batch jobs and multi-lead views,
+plus a bridge that lets the Tk GUI consume its results without blocking.
+"""
+
+import json
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, only needed for async batch work
+    aiohttp = None
+
+from config import API_SETTINGS, HTTP_POOL_CONFIG, ASYNC_API_CONFIG
+from api import APIError, AuthenticationError, CircuitOpenError, _CREATE_PREFIX, _redact, endpoint_url, normalize_phone
+from metrics import endpoint_label, get_registry
+from resilience import CircuitBreaker, RetryPolicy
+from ratelimit import BACKGROUND, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncReadyModeAPI:
+    """
+    Asyncio client for the ReadyMode API.
+
+    Mirrors the ReadyModeAPI surface and error types. All requests share one
+    aiohttp connection pool, and at most max_concurrency requests are in
+    flight at once. Use it as an async context manager, or call close().
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        """Initialize API client with credentials, optionally against another server."""
+        if aiohttp is None:
+            raise RuntimeError("AsyncReadyModeAPI requires aiohttp; install it with 'pip install aiohttp'")
+
+        self.username = username
+        self.password = password
+        self.base_url = base_url or API_SETTINGS["base_url"]
+        self.max_concurrency = max_concurrency or ASYNC_API_CONFIG["max_concurrency"]
+        self.retry_policy = RetryPolicy()
+        self.circuit_breaker = CircuitBreaker("readymode-async")
+        self.metrics = get_registry()
+        self.rate_limiter = get_rate_limiter()
+
+        # Created lazily: both must belong to the loop that uses them
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncReadyModeAPI":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """Close the shared connection pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._semaphore = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=max(self.max_concurrency, HTTP_POOL_CONFIG["pool_maxsize"]),
+                keepalive_timeout=HTTP_POOL_CONFIG["keepalive_idle"]
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    "Accept": "application/json",
+                    "Content-Type": "application/json"
+                }
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        timeout: int = 30,
+        idempotency_key: Optional[str] = None
+    ) -> Dict:
+        """Make an HTTP request to the API, retrying transient failures."""
+        attempts = self.retry_policy.attempts_for(method, endpoint, idempotency_key)
+        delay = None
+
+        for attempt in range(1, attempts + 1):
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(
+                    f"ReadyMode API unavailable; retrying in "
+                    f"{self.circuit_breaker.retry_after():.0f}s"
+                )
+            # Async work is batch work; wait for a background token on the loop
+            await self.rate_limiter.acquire_async(BACKGROUND, create=endpoint.startswith(_CREATE_PREFIX))
+            try:
+                result = await self._send_request(method, endpoint, params, data, timeout, idempotency_key)
+            except APIError as e:
+                if e.retryable:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+                if not e.retryable or attempt == attempts:
+                    raise
+                delay = self.retry_policy.next_delay(delay)
+                self.metrics.record_retry("readymode", method, endpoint)
+                logger.warning(
+                    f"{method} {endpoint} failed (attempt {attempt}/{attempts}); "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
+    async def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict],
+        data: Optional[Dict],
+        timeout: int,
+        idempotency_key: Optional[str]
+    ) -> Dict:
+        """Send a single HTTP request to the API."""
+        url = endpoint_url(self.base_url, endpoint)
+        params = dict(params or {})
+        params.update({
+            "API_user": self.username,
+            "API_pass": self.password
+        })
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+
+        session = self._get_session()
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                async with session.request(
+                    method,
+                    url,
+                    params=params,
+                    json=data,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=timeout)
+                ) as response:
+                    body = await response.read()
+                    status = response.status
+            except asyncio.TimeoutError as e:
+                self.metrics.record_request("readymode", method, endpoint, "timeout", time.perf_counter() - started)
+                self.metrics.record_error("readymode", method, endpoint, "timeout")
+                raise APIError(f"API request timed out: {method} {endpoint_label(endpoint)}", retryable=True) from e
+            except aiohttp.ClientError as e:
+                self.metrics.record_request("readymode", method, endpoint, "connection", time.perf_counter() - started)
+                self.metrics.record_error("readymode", method, endpoint, "connection")
+                message = _redact(f"API request failed: {str(e)}")
+                logger.error(message)
+                raise APIError(message, retryable=True) from e
+
+        self.metrics.record_request(
+            "readymode",
+            method,
+            endpoint,
+            status,
+            time.perf_counter() - started,
+            bytes_received=len(body)
+        )
+
+        if status == 401:
+            self.metrics.record_error("readymode", method, endpoint, "auth")
+            raise AuthenticationError("Invalid API credentials", status_code=401)
+        if status >= 400:
+            self.metrics.record_error("readymode", method, endpoint, f"http_{status}")
+            message = f"API request failed: {status} for {method} {endpoint_label(endpoint)}"
+            logger.error(message)
+            raise APIError(message, status_code=status, retryable=self.retry_policy.is_retryable_status(status))
+
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise APIError(f"API returned invalid JSON: {str(e)}") from e
+
+    async def search_lead(self, phone: str) -> List[Dict]:
+        """Search for a lead by phone number."""
+        try:
+            return await self._make_request(method="GET", endpoint=f"/search/Lead/{normalize_phone(phone) or phone}")
+        except Exception as e:
+            logger.error(f"Lead search failed: {str(e)}")
+            raise
+
+    async def create_lead(self, lead_data: Dict, idempotency_key: Optional[str] = None) -> Dict:
+        """Create a new lead; pass an idempotency key to make it safe to retry."""
+        try:
+            return await self._make_request(
+                method="POST",
+                endpoint="/create/Lead",
+                data=lead_data,
+                idempotency_key=idempotency_key
+            )
+        except Exception as e:
+            logger.error(f"Lead creation failed: {str(e)}")
+            raise
+
+    async def update_lead(self, lead_id: str, lead_data: Dict) -> Dict:
+        """Update an existing lead."""
+        try:
+            return await self._make_request(method="PUT", endpoint=f"/update/Lead/{lead_id}", data=lead_data)
+        except Exception as e:
+            logger.error(f"Lead update failed: {str(e)}")
+            raise
+
+    async def get_lead_status(self, lead_id: str) -> Dict:
+        """Get the current status of a lead."""
+        try:
+            return await self._make_request(method="GET", endpoint=f"/status/Lead/{lead_id}")
+        except Exception as e:
+            logger.error(f"Lead status check failed: {str(e)}")
+            raise
+
+    async def create_appointment(self, appointment_data: Dict, idempotency_key: Optional[str] = None) -> Dict:
+        """Create a new appointment; pass an idempotency key to make it safe to retry."""
+        try:
+            return await self._make_request(
+                method="POST",
+                endpoint="/create/Appointment",
+                data=appointment_data,
+                idempotency_key=idempotency_key
+            )
+        except Exception as e:
+            logger.error(f"Appointment creation failed: {str(e)}")
+            raise
+
+    async def update_appointment(self, appointment_id: str, appointment_data: Dict) -> Dict:
+        """Update an existing appointment."""
+        try:
+            return await self._make_request(
+                method="PUT",
+                endpoint=f"/update/Appointment/{appointment_id}",
+                data=appointment_data
+            )
+        except Exception as e:
+            logger.error(f"Appointment update failed: {str(e)}")
+            raise
+
+    async def get_appointment_status(self, appointment_id: str) -> Dict:
+        """Get the current status of an appointment."""
+        try:
+            return await self._make_request(method="GET", endpoint=f"/status/Appointment/{appointment_id}")
+        except Exception as e:
+            logger.error(f"Appointment status check failed: {str(e)}")
+            raise
+
+    async def validate_credentials(self) -> bool:
+        """Validate API credentials."""
+        try:
+            await self._make_request(method="GET", endpoint="/test", timeout=5)
+            return True
+        except AuthenticationError:
+            return False
+        except Exception as e:
+            logger.error(f"Credential validation failed: {str(e)}")
+            return False
+
+
+class AsyncBridge:
+    """
+    Runs an asyncio event loop on a daemon thread for the Tk GUI.
+
+    Coroutines are scheduled on the loop from the Tk thread; their results
+    come back through the BackgroundExecutor queue, so callbacks run on the
+    Tk thread and the mainloop never blocks.
+    """
+
+    def __init__(self, executor=None):
+        """
+        Initialize the bridge and start its event loop.
+
+        Args:
+            executor: BackgroundExecutor used to deliver results to Tk
+        """
+        self.executor = executor
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="storm911-asyncio", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro: Awaitable) -> Future:
+        """
+        Schedule a coroutine on the bridge loop from any thread.
+
+        Returns:
+            Future: Thread-safe future; cancelling it cancels the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def submit(
+        self,
+        coro: Awaitable,
+        name: str = "async_task",
+        on_success: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None
+    ):
+        """
+        Schedule a coroutine and deliver its outcome on the Tk thread.
+
+        Returns:
+            BackgroundTask: Handle that can be used to cancel the coroutine
+        """
+        if self.executor is None:
+            raise RuntimeError("AsyncBridge.submit requires a BackgroundExecutor")
+        return self.executor.watch(self.run(coro), name=name, on_success=on_success, on_error=on_error)
+
+    def close(self, timeout: float = 5.0):
+        """Stop the event loop and wait for its thread to exit."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        if not self.loop.is_running():
+            self.loop.close()
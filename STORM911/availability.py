@@ -0,0 +1,542 @@
+"""
+Availability module for Storm911.
+Indexes Calendly busy periods for a window of days so the scheduler can
+answer slot questions for any date locally, without a call per click,
+and keeps the index current in the background.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import AVAILABILITY_CONFIG, TEAM_AVAILABILITY_CONFIG
+from ratelimit import PriorityRateLimiter, background_priority, current_priority, priority
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Calendly rejects busy-time ranges longer than a week
+_MAX_BUSY_RANGE = timedelta(days=7)
+
+
+def parse_timestamp(value: str) -> float:
+    """Convert a Calendly ISO 8601 timestamp to epoch seconds."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def to_calendly_time(moment: datetime) -> str:
+    """Format a local or aware datetime as a Calendly UTC timestamp."""
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def business_slots(day: date, slot_minutes: int, day_start_hour: int, day_end_hour: int, workdays: Iterable[int]) -> List[datetime]:
+    """Start times of every bookable slot on day in local time, free or not."""
+    if day.weekday() not in workdays:
+        return []
+    first = datetime.combine(day, datetime.min.time()).replace(hour=day_start_hour)
+    last = first.replace(hour=day_end_hour)
+    step = timedelta(minutes=slot_minutes)
+    slots = []
+    moment = first
+    while moment + step <= last:
+        slots.append(moment)
+        moment += step
+    return slots
+
+
+class BusyIndex:
+    """
+    Sorted, non-overlapping busy intervals in epoch seconds.
+
+    Overlapping or touching intervals are merged on insert, so the start
+    and end lists are both sorted and any point lies in at most one
+    interval; every query is a binary search.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[float, float]] = ()):
+        self._starts: List[float] = []
+        self._ends: List[float] = []
+        self.add_many(intervals)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def add(self, start: float, end: float):
+        """Mark [start, end) busy."""
+        if end <= start:
+            return
+        # Intervals that overlap or touch [start, end) are absorbed
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def add_many(self, intervals: Iterable[Tuple[float, float]]):
+        """Mark several intervals busy."""
+        for start, end in intervals:
+            self.add(start, end)
+
+    def is_free(self, start: float, end: float) -> bool:
+        """Whether [start, end) overlaps no busy interval."""
+        # First interval that ends after start; free unless it begins before end
+        index = bisect_right(self._ends, start)
+        return index == len(self._starts) or self._starts[index] >= end
+
+    def clear_range(self, start: float, end: float):
+        """Mark [start, end) free, trimming intervals that straddle its edges."""
+        lo = bisect_right(self._ends, start)
+        hi = bisect_left(self._starts, end)
+        if lo >= hi:
+            return
+        kept_starts, kept_ends = [], []
+        if self._starts[lo] < start:
+            kept_starts.append(self._starts[lo])
+            kept_ends.append(start)
+        if self._ends[hi - 1] > end:
+            kept_starts.append(end)
+            kept_ends.append(self._ends[hi - 1])
+        self._starts[lo:hi] = kept_starts
+        self._ends[lo:hi] = kept_ends
+
+    def intervals(self) -> List[Tuple[float, float]]:
+        """Return the merged busy intervals in order."""
+        return list(zip(self._starts, self._ends))
+
+
+class AvailabilityEngine:
+    """
+    Answers scheduling questions from busy periods fetched once per window.
+
+    load() pulls Calendly busy times for the configured number of days
+    into a BusyIndex and refresh() re-fetches part of it; is_slot_free,
+    slots_for_day and next_free_slots then run locally. Slots are slot_minutes long and fall within business
+    hours in local time.
+    """
+
+    def __init__(self, calendly_api, user_uri: str, config: Optional[Dict] = None):
+        """
+        Initialize the engine.
+
+        Args:
+            calendly_api: CalendlyAPI with a valid access token
+            user_uri: Calendly URI of the user whose calendar is booked
+            config: Overrides for AVAILABILITY_CONFIG
+        """
+        config = dict(AVAILABILITY_CONFIG, **(config or {}))
+        self.calendly_api = calendly_api
+        self.user_uri = user_uri
+        self.days = config["days"]
+        self.refresh_days = config["refresh_days"]
+        self.slot_minutes = config["slot_minutes"]
+        self.day_start_hour = config["day_start_hour"]
+        self.day_end_hour = config["day_end_hour"]
+        self.workdays = tuple(config["workdays"])
+
+        self._lock = threading.Lock()
+        self.index = BusyIndex()
+        self.window_start: Optional[datetime] = None
+        self.window_end: Optional[datetime] = None
+        self.loaded_at: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def load(self, start: Optional[datetime] = None) -> int:
+        """
+        Fetch busy periods for the window starting at start (default: now).
+
+        The whole window is fetched before the index is swapped in, so
+        readers never see a partially loaded calendar.
+
+        Returns:
+            int: Number of busy periods fetched
+        """
+        start = (start or datetime.now()).replace(second=0, microsecond=0)
+        end = start + timedelta(days=self.days)
+        intervals = self._fetch(start, end)
+        index = BusyIndex(intervals)
+
+        with self._lock:
+            self.index = index
+            self.window_start = start
+            self.window_end = end
+            self.loaded_at = time.time()
+        logger.info(f"Loaded {len(intervals)} busy periods from {start:%Y-%m-%d} to {end:%Y-%m-%d}")
+        return len(intervals)
+
+    def refresh(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+        """
+        Re-fetch busy periods for part of the loaded window and splice them in.
+
+        Defaults to the next refresh_days days; falls back to a full load
+        if nothing has been loaded yet.
+
+        Returns:
+            int: Number of busy periods fetched
+        """
+        with self._lock:
+            window_start, window_end = self.window_start, self.window_end
+        if window_start is None:
+            return self.load()
+
+        start = max(start or datetime.now().replace(second=0, microsecond=0), window_start)
+        end = min(end or start + timedelta(days=self.refresh_days), window_end)
+        if start >= end:
+            return 0
+        intervals = self._fetch(start, end)
+
+        with self._lock:
+            # Copy on write so readers holding the old index are unaffected
+            index = BusyIndex(self.index.intervals())
+            index.clear_range(start.timestamp(), end.timestamp())
+            index.add_many(intervals)
+            self.index = index
+            self.loaded_at = time.time()
+        logger.debug(f"Refreshed {len(intervals)} busy periods from {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}")
+        return len(intervals)
+
+    def mark_busy(self, start: float, end: float):
+        """Mark [start, end) busy right away, e.g. for a booking reported by webhook."""
+        with self._lock:
+            index = BusyIndex(self.index.intervals())
+            index.add(start, end)
+            self.index = index
+
+    def _fetch(self, start: datetime, end: datetime) -> List[Tuple[float, float]]:
+        """Fetch busy intervals for [start, end) in week-sized requests."""
+        intervals = []
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min(chunk_start + _MAX_BUSY_RANGE, end)
+            periods = self.calendly_api.get_user_busy_times(
+                self.user_uri,
+                to_calendly_time(chunk_start),
+                to_calendly_time(chunk_end)
+            )
+            intervals.extend(self._interval(period) for period in periods)
+            chunk_start = chunk_end
+        return intervals
+
+    @staticmethod
+    def _interval(period: Dict) -> Tuple[float, float]:
+        """Busy interval of a Calendly busy period, including event buffers."""
+        start = period.get("buffered_start_time") or period["start_time"]
+        end = period.get("buffered_end_time") or period["end_time"]
+        return parse_timestamp(start), parse_timestamp(end)
+
+    def covers(self, day: date) -> bool:
+        """Whether day lies inside the loaded window."""
+        with self._lock:
+            if self.window_start is None:
+                return False
+            return self.window_start.date() <= day < self.window_end.date()
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last load or refresh, or None if never loaded."""
+        return time.time() - self.loaded_at if self.loaded_at else None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def day_slots(self, day: date) -> List[datetime]:
+        """Start times of every bookable slot on day, free or not."""
+        return business_slots(day, self.slot_minutes, self.day_start_hour, self.day_end_hour, self.workdays)
+
+    def is_slot_free(self, start: datetime) -> bool:
+        """Whether the slot beginning at start (local time) is free."""
+        begin = start.timestamp()
+        with self._lock:
+            return self.index.is_free(begin, begin + self.slot_minutes * 60)
+
+    def slots_for_day(self, day: date) -> List[Tuple[datetime, bool]]:
+        """Return (slot start, is free) for every slot on day."""
+        slot_seconds = self.slot_minutes * 60
+        with self._lock:
+            index = self.index
+        return [
+            (slot, index.is_free(slot.timestamp(), slot.timestamp() + slot_seconds))
+            for slot in self.day_slots(day)
+        ]
+
+    def next_free_slots(self, after: datetime, count: int = 5) -> List[datetime]:
+        """
+        Return the next count free slots starting at or after a moment.
+
+        Each slot costs one binary search; the search stops at the end of
+        the loaded window.
+        """
+        with self._lock:
+            index = self.index
+            window_end = self.window_end
+        if window_end is None:
+            return []
+
+        slot_seconds = self.slot_minutes * 60
+        found: List[datetime] = []
+        day = after.date()
+        while len(found) < count and day < window_end.date():
+            for slot in self.day_slots(day):
+                if slot < after:
+                    continue
+                begin = slot.timestamp()
+                if index.is_free(begin, begin + slot_seconds):
+                    found.append(slot)
+                    if len(found) == count:
+                        break
+            day += timedelta(days=1)
+        return found
+
+
+class TeamAvailability:
+    """
+    Free capacity per slot across every inspector in a Calendly organization.
+
+    A day's busy times are fetched for all members concurrently, each
+    request drawing from a Calendly rate limiter, then merged into one
+    view such as "3 inspectors free at 10:00". Views are cached per day
+    for cache_ttl seconds, and concurrent requests for the same day share
+    one fan-out. A view missing members whose fetch failed is cached for
+    failure_ttl seconds instead, so the failure is retried soon but not on
+    every request.
+    """
+
+    def __init__(
+        self,
+        calendly_api,
+        organization_uri: str,
+        config: Optional[Dict] = None,
+        rate_limiter: Optional[PriorityRateLimiter] = None
+    ):
+        """
+        Initialize the team view.
+
+        Args:
+            calendly_api: CalendlyAPI with access to the organization's members
+            organization_uri: Calendly URI of the organization
+            config: Overrides for AVAILABILITY_CONFIG and TEAM_AVAILABILITY_CONFIG
+            rate_limiter: Limiter for busy-time requests (default: one per instance)
+        """
+        config = {**AVAILABILITY_CONFIG, **TEAM_AVAILABILITY_CONFIG, **(config or {})}
+        self.calendly_api = calendly_api
+        self.organization_uri = organization_uri
+        self.slot_minutes = config["slot_minutes"]
+        self.day_start_hour = config["day_start_hour"]
+        self.day_end_hour = config["day_end_hour"]
+        self.workdays = tuple(config["workdays"])
+        self.cache_ttl = config["cache_ttl"]
+        self.failure_ttl = config["failure_ttl"]
+        self.rate_limiter = rate_limiter or PriorityRateLimiter(config["rate_limit"])
+        self._executor = ThreadPoolExecutor(max_workers=config["max_workers"], thread_name_prefix="storm911-team")
+        self._inflight = SingleFlight()
+        self._lock = threading.Lock()
+        self._members: Optional[List[Dict]] = None
+        # day -> (expires_at, [(slot start, free member uris)])
+        self._days: Dict[date, Tuple[float, List[Tuple[datetime, List[str]]]]] = {}
+
+    def members(self) -> List[Dict]:
+        """Return the organization's members as {"uri", "name"} dicts, fetched once."""
+        with self._lock:
+            if self._members is not None:
+                return self._members
+        members = [
+            {"uri": membership["user"]["uri"], "name": membership["user"].get("name", "")}
+            for membership in self.calendly_api.iter_organization_memberships(
+                params={"organization": self.organization_uri}
+            )
+        ]
+        with self._lock:
+            self._members = members
+        return members
+
+    def capacity_for_day(self, day: date) -> List[Tuple[datetime, List[str]]]:
+        """
+        Return (slot start, free member uris) for every slot on day.
+
+        Served from the per-day cache while the cached view is unexpired.
+        """
+        cached = self.cached_capacity(day)
+        if cached is not None:
+            return cached
+        return self._inflight.do(day, self._load_day, day)
+
+    def cached_capacity(self, day: date) -> Optional[List[Tuple[datetime, List[str]]]]:
+        """Return day's view if a fresh one is cached, without fetching."""
+        with self._lock:
+            cached = self._days.get(day)
+        if cached is not None and time.time() < cached[0]:
+            return cached[1]
+        return None
+
+    def free_count(self, slot: datetime) -> int:
+        """Number of inspectors free for the slot beginning at slot."""
+        for start, free in self.capacity_for_day(slot.date()):
+            if start == slot:
+                return len(free)
+        return 0
+
+    def invalidate(self, day: Optional[date] = None):
+        """Drop the cached view for day, or for every day."""
+        with self._lock:
+            if day is None:
+                self._days.clear()
+            else:
+                self._days.pop(day, None)
+
+    def _load_day(self, day: date) -> List[Tuple[datetime, List[str]]]:
+        slots = business_slots(day, self.slot_minutes, self.day_start_hour, self.day_end_hour, self.workdays)
+        if not slots:
+            self._store_day(day, [], self.cache_ttl)
+            return []
+        start = slots[0]
+        end = slots[-1] + timedelta(minutes=self.slot_minutes)
+
+        members = self.members()
+        caller_priority = current_priority()
+        futures = [
+            self._executor.submit(self._member_busy, member["uri"], start, end, caller_priority)
+            for member in members
+        ]
+        indexes = {}
+        failed = 0
+        for member, future in zip(members, futures):
+            try:
+                indexes[member["uri"]] = future.result()
+            except Exception as e:
+                # Count the member as unavailable rather than failing the whole day
+                failed += 1
+                logger.error(f"Busy times for {member['uri']} failed: {str(e)}")
+
+        slot_seconds = self.slot_minutes * 60
+        capacity = [
+            (slot, [
+                uri for uri, index in indexes.items()
+                if index.is_free(slot.timestamp(), slot.timestamp() + slot_seconds)
+            ])
+            for slot in slots
+        ]
+        self._store_day(day, capacity, self.failure_ttl if failed else self.cache_ttl)
+        logger.debug(f"Team capacity for {day}: {len(indexes)} inspectors, {failed} failed")
+        return capacity
+
+    def _store_day(self, day: date, capacity: List[Tuple[datetime, List[str]]], ttl: float):
+        with self._lock:
+            self._days[day] = (time.time() + ttl, capacity)
+
+    def _member_busy(self, user_uri: str, start: datetime, end: datetime, caller_priority: str) -> BusyIndex:
+        """Fetch one member's busy times; executes on a pool thread."""
+        with priority(caller_priority):
+            self.rate_limiter.acquire()
+            periods = self.calendly_api.get_user_busy_times(
+                user_uri,
+                to_calendly_time(start),
+                to_calendly_time(end)
+            )
+        return BusyIndex(AvailabilityEngine._interval(period) for period in periods)
+
+    def close(self):
+        """Stop the fetch pool."""
+        self._executor.shutdown(wait=False)
+
+
+class AvailabilityRefresher(threading.Thread):
+    """
+    Daemon thread that prefetches an AvailabilityEngine and keeps it current.
+
+    The whole window is loaded at start and every full_refresh_interval
+    seconds (which also rolls it forward); in between, the near term is
+    re-fetched every refresh_interval seconds or on request, e.g. when a
+    Calendly webhook reports a booking.
+    """
+
+    def __init__(self, engine: AvailabilityEngine, config: Optional[Dict] = None):
+        super().__init__(name="storm911-availability", daemon=True)
+        config = dict(AVAILABILITY_CONFIG, **(config or {}))
+        self.engine = engine
+        self.refresh_interval = config["refresh_interval"]
+        self.full_refresh_interval = config["full_refresh_interval"]
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._pending: List[Tuple[datetime, datetime]] = []
+        self._pending_lock = threading.Lock()
+        self._last_full_load = 0.0
+
+    def run(self):
+        with background_priority():
+            self._run()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.refresh_once()
+            except Exception as e:
+                logger.error(f"Availability refresh failed: {str(e)}")
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+
+    def refresh_once(self):
+        """Run whichever refresh is due: full load, requested ranges, or the near term."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+
+        if time.monotonic() - self._last_full_load >= self.full_refresh_interval or self.engine.loaded_at is None:
+            self.engine.load()
+            self._last_full_load = time.monotonic()
+        elif pending:
+            for start, end in pending:
+                self.engine.refresh(start, end)
+        else:
+            self.engine.refresh()
+
+    def refresh_soon(self, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """
+        Ask for a refresh without waiting for the interval.
+
+        Args:
+            start: Start of the changed range, e.g. a booked event's start
+            end: End of the changed range; both None refreshes the near term
+        """
+        if start is not None:
+            with self._pending_lock:
+                self._pending.append((start, end or start + timedelta(hours=1)))
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the thread after the current refresh."""
+        self._stop_event.set()
+        self._wake.set()
+        self.join(timeout)
+
+
+# Create singleton instances
+_refresher: Optional[AvailabilityRefresher] = None
+
+def start_availability_refresh(engine: AvailabilityEngine) -> AvailabilityRefresher:
+    """Start prefetching and refreshing engine in the background, replacing any previous refresher."""
+    global _refresher
+
+    if _refresher is not None and _refresher.engine is not engine:
+        _refresher.stop(timeout=0)
+        _refresher = None
+    if _refresher is None or not _refresher.is_alive():
+        _refresher = AvailabilityRefresher(engine)
+        _refresher.start()
+    return _refresher
+
+def get_availability_refresher() -> Optional[AvailabilityRefresher]:
+    """Return the running refresher, if any."""
+    return _refresher
+
+def stop_availability_refresh(timeout: Optional[float] = 5.0):
+    """Stop the background refresher if it is running."""
+    global _refresher
+
+    if _refresher is not None:
+        _refresher.stop(timeout)
+        _refresher = None
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+ReadyMode client benchmark for Storm911.
+Measures search_lead throughput and tail latency against the local fake
+ReadyMode server (or any server given with --base-url).
+
+Example:
+    python bench_api.py --requests 2000 --concurrency 16 --latency-ms 20 --jitter-ms 30
+"""
+
+import time
+import random
+import logging
+import argparse
+
+from api import ReadyModeAPI
+from fake_readymode import FakeReadyModeServer, fake_phone
+from metrics import LatencyHistogram
+from transport import pool_stats
+
+
+def run_benchmark(api: ReadyModeAPI, phones, concurrency: int) -> dict:
+    """
+    Run one bulk search pass and summarize it.
+
+    Args:
+        api: Client under test
+        phones: Phone numbers to look up
+        concurrency: Number of requests in flight
+
+    Returns:
+        dict: Throughput, error count and latency percentiles
+    """
+    histogram = LatencyHistogram()
+    errors = 0
+
+    # Wrap search_lead so the per-call latency seen by callers is measured
+    original = api.search_lead
+    api.search_lead = lambda phone, use_cache=True: _timed(original, histogram, phone)
+
+    started = time.perf_counter()
+    count = 0
+    try:
+        for result in api.search_leads_bulk(phones, max_concurrency=concurrency, ordered=False, use_cache=False):
+            count += 1
+            if not result.ok:
+                errors += 1
+    finally:
+        api.search_lead = original
+    elapsed = time.perf_counter() - started
+
+    summary = histogram.summary()
+    summary.update({
+        "requests": count,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(count / elapsed, 1) if elapsed else None
+    })
+    return summary
+
+
+def _timed(search, histogram: LatencyHistogram, phone: str):
+    started = time.perf_counter()
+    try:
+        return search(phone, use_cache=False)
+    finally:
+        histogram.record(time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ReadyModeAPI.search_lead")
+    parser.add_argument("--base-url", help="benchmark an existing server instead of the built-in fake")
+    parser.add_argument("--username", default="demo")
+    parser.add_argument("--password", default="demo")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--leads", type=int, default=10000)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--tail-rate", type=float, default=0.0)
+    parser.add_argument("--tail-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rate-limit", action="store_true", help="keep the client-side rate limiter enabled")
+    parser.add_argument("--hedge", action="store_true", help="hedge slow lead searches")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = FakeReadyModeServer(
+            leads=args.leads,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            tail_rate=args.tail_rate,
+            tail_ms=args.tail_ms,
+            error_rate=args.error_rate,
+            username=args.username,
+            password=args.password,
+            seed=args.seed
+        ).start()
+        base_url = server.base_url
+
+    try:
+        api = ReadyModeAPI(args.username, args.password, base_url=base_url)
+        # Measure the client itself unless throttling is what's being studied
+        api.rate_limiter.enabled = args.rate_limit
+        api.hedger.enabled = args.hedge
+        rng = random.Random(args.seed)
+        phones = [fake_phone(rng.randrange(args.leads)) for _ in range(args.requests)]
+        summary = run_benchmark(api, phones, args.concurrency)
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(f"requests     {summary['requests']} ({summary['errors']} errors)")
+    print(f"elapsed      {summary['elapsed_s']} s")
+    print(f"throughput   {summary['throughput_rps']} req/s")
+    for key in ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"):
+        print(f"{key:<12} {summary[key]}")
+    if args.hedge:
+        print(f"hedging      {api.hedger.stats()}")
+    for host, stats in pool_stats().items():
+        print(f"pool {host}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Appointment scheduler benchmark for Storm911.
+Measures click-to-paint latency of date, time and month clicks in the
+AppointmentWindow: each click is timed until Tk has processed the
+resulting redraw. Needs a display.
+
+Compare against another revision of the window by pointing --module at
+its source, e.g.:
+    git show HEAD~1:STORM911/appointment_gui.py > /tmp/appointment_gui_old.py
+    python bench_scheduler.py --module /tmp/appointment_gui_old.py
+    python bench_scheduler.py
+"""
+
+import time
+import random
+import argparse
+import importlib.util
+from datetime import datetime, timedelta
+
+import customtkinter as ctk
+
+from metrics import LatencyHistogram
+
+
+def load_window_class(path: str = None):
+    """Return AppointmentWindow from appointment_gui, or from the module at path."""
+    if not path:
+        from appointment_gui import AppointmentWindow
+        return AppointmentWindow
+    spec = importlib.util.spec_from_file_location("appointment_gui_under_test", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.AppointmentWindow
+
+
+def _timed(window, histogram: LatencyHistogram, click):
+    started = time.perf_counter()
+    click()
+    window.update()
+    histogram.record(time.perf_counter() - started)
+
+
+def run_benchmark(window, clicks: int, seed: int = None) -> dict:
+    """
+    Click through dates, times and months and summarize the latencies.
+
+    Args:
+        window: AppointmentWindow under test
+        clicks: Clicks of each kind
+        seed: Random seed for the dates clicked
+
+    Returns:
+        dict: Latency summary per click kind
+    """
+    rng = random.Random(seed)
+    histograms = {"date": LatencyHistogram(), "time": LatencyHistogram(), "month": LatencyHistogram()}
+    today = datetime.now().date()
+    window.update()
+
+    for _ in range(clicks):
+        day = today + timedelta(days=rng.randrange(1, 28))
+        _timed(window, histograms["date"], lambda: window.select_date(day))
+        hour = rng.randrange(9, 17)
+        _timed(window, histograms["time"], lambda: window.select_time(f"{hour:02d}:00"))
+        _timed(window, histograms["month"], window.next_month)
+        _timed(window, histograms["month"], window.previous_month)
+
+    return {kind: histogram.summary() for kind, histogram in histograms.items()}
+
+
+def main():
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Scheduler click-to-paint benchmark")
+    parser.add_argument("--clicks", type=int, default=50, help="clicks of each kind")
+    parser.add_argument("--module", help="appointment_gui.py revision to benchmark instead of the current one")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    root = ctk.CTk()
+    root.withdraw()
+    window = load_window_class(args.module)(root)
+    try:
+        summary = run_benchmark(window, args.clicks, args.seed)
+    finally:
+        window.destroy()
+        root.destroy()
+
+    for kind, stats in summary.items():
+        print(f"{kind:<6} " + "  ".join(f"{key} {value}" for key, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Response cache module for Storm911.
+Two-layer (memory + disk) TTL/LRU cache used by the API clients.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Two-layer cache for JSON-serializable API responses.
+
+    The memory layer is an LRU-ordered dict; the disk layer stores one JSON
+    file per key under ``cache_dir/namespace``. Both layers are bounded by
+    ``max_size`` bytes of serialized payload and evict least recently used
+    entries first. Entries older than ``ttl`` seconds are treated as misses.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        cache_dir: Optional[str] = None,
+        enabled: Optional[bool] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            namespace: Sub-directory of cache_dir used by the disk layer
+            max_size: Byte budget per layer (defaults to CACHE_CONFIG)
+            ttl: Entry lifetime in seconds (defaults to CACHE_CONFIG)
+            cache_dir: Root directory for the disk layer (defaults to CACHE_CONFIG)
+            enabled: Disable to turn every lookup into a miss
+        """
+        self.namespace = namespace
+        self.max_size = max_size if max_size is not None else CACHE_CONFIG["max_cache_size"]
+        self.ttl = ttl if ttl is not None else CACHE_CONFIG["cache_ttl"]
+        self.enabled = enabled if enabled is not None else CACHE_CONFIG["enable_cache"]
+        self.disk_dir = os.path.join(cache_dir or CACHE_CONFIG["cache_dir"], namespace)
+
+        self._lock = threading.RLock()
+        # key -> (stored_at, size, value)
+        self._memory: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._memory_bytes = 0
+        # key -> (last_used, size) for files in disk_dir
+        self._disk: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._disk_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        if self.enabled:
+            self._load_disk_index()
+
+    # ------------------------------------------------------------------
+    # Public interface
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss or expiry."""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, _, value = entry
+                if now - stored_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._drop_memory(key)
+
+            record = self._read_disk(key)
+            if record is not None:
+                stored_at, value = record
+                if now - stored_at <= self.ttl:
+                    self._put_memory(key, value, stored_at)
+                    self.hits += 1
+                    return value
+                self._drop_disk(key)
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        """Store a JSON-serializable value under key in both layers."""
+        if not self.enabled:
+            return
+
+        stored_at = time.time()
+        with self._lock:
+            self._put_memory(key, value, stored_at)
+            self._write_disk(key, value, stored_at)
+
+    def invalidate(self, key: str):
+        """Remove key from both layers."""
+        with self._lock:
+            self._drop_memory(key)
+            self._drop_disk(key)
+
+    def clear(self):
+        """Remove every entry from both layers."""
+        with self._lock:
+            for key in list(self._disk):
+                self._drop_disk(key)
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and layer sizes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes
+            }
+
+    # ------------------------------------------------------------------
+    # Memory layer
+    # ------------------------------------------------------------------
+    def _put_memory(self, key: str, value: Any, stored_at: float):
+        size = len(json.dumps(value, separators=(",", ":")))
+        self._drop_memory(key)
+        if size > self.max_size:
+            return
+        self._memory[key] = (stored_at, size, value)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_size:
+            old_key = next(iter(self._memory))
+            self._drop_memory(old_key)
+
+    def _drop_memory(self, key: str):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[1]
+
+    # ------------------------------------------------------------------
+    # Disk layer
+    # ------------------------------------------------------------------
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.json")
+
+    def _load_disk_index(self):
+        """Rebuild the disk LRU index from the cache directory at startup."""
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.disk_dir):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    with open(path, "r") as f:
+                        key = json.load(f)["key"]
+                    st = os.stat(path)
+                except (OSError, ValueError, KeyError):
+                    # Corrupt or half-written entry
+                    self._remove_file(path)
+                    continue
+                entries.append((st.st_mtime, key, st.st_size))
+            for mtime, key, size in sorted(entries):
+                self._disk[key] = (mtime, size)
+                self._disk_bytes += size
+            self._evict_disk()
+        except OSError as e:
+            logger.error(f"Error loading cache index for {self.namespace}: {str(e)}")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Any]]:
+        if key not in self._disk:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                record = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Dropping unreadable cache entry {path}: {str(e)}")
+            self._drop_disk(key)
+            return None
+        # Record the access so the file is treated as recently used
+        size = self._disk.pop(key)[1]
+        self._disk[key] = (time.time(), size)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return record["stored_at"], record["value"]
+
+    def _write_disk(self, key: str, value: Any, stored_at: float):
+        path = self._path(key)
+        payload = json.dumps({"key": key, "stored_at": stored_at, "value": value})
+        size = len(payload)
+        self._drop_disk(key)
+        if size > self.max_size:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Error writing cache entry: {str(e)}")
+            return
+        self._disk[key] = (time.time(), size)
+        self._disk_bytes += size
+        self._evict_disk()
+
+    def _drop_disk(self, key: str):
+        entry = self._disk.pop(key, None)
+        if entry is not None:
+            self._disk_bytes -= entry[1]
+            self._remove_file(self._path(key))
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.max_size and self._disk:
+            self._drop_disk(next(iter(self._disk)))
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Error removing cache file {path}: {str(e)}")
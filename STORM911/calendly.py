@@ -6,12 +6,18 @@ Handles all API calls to Calendly service.
 import requests
 import logging
 import json
-from typing import Dict, Optional, Union, List
+import time
+from typing import Callable, Dict, Iterator, Optional, Union, List
 from datetime import datetime
 from config import LOGGING_CONFIG
+from transport import create_session
+from metrics import get_registry
 
 logger = logging.getLogger(__name__)
 
+# Calendly caps list endpoints at 100 items per page
+MAX_PAGE_SIZE = 100
+
 class CalendlyAPI:
     """
     Handles all interactions with the Calendly API service.
@@ -22,7 +28,10 @@ class CalendlyAPI:
         self.auth_url = "https://auth.calendly.com"
         self.access_token = None
         self.refresh_token = None
-        self.session = requests.Session()
+        self.session = create_session()
+        self.metrics = get_registry()
+        # TokenManager keeping access_token valid, attached by calendly_auth
+        self.token_manager = None
         
     def set_auth_token(self, access_token: str, refresh_token: Optional[str] = None):
         """Set the OAuth access token and optional refresh token."""
@@ -72,8 +81,7 @@ class CalendlyAPI:
             'grant_type': 'authorization_code'
         }
         
-        response = requests.post(f"{self.auth_url}/oauth/token", data=data)
-        response.raise_for_status()
+        response = self._post_token_request(data)
         token_data = response.json()
         
         self.set_auth_token(token_data['access_token'], token_data.get('refresh_token'))
@@ -98,24 +106,121 @@ class CalendlyAPI:
             'grant_type': 'refresh_token'
         }
         
-        response = requests.post(f"{self.auth_url}/oauth/token", data=data)
-        response.raise_for_status()
+        response = self._post_token_request(data)
         token_data = response.json()
         
         self.set_auth_token(token_data['access_token'], token_data.get('refresh_token'))
         return token_data
 
+    def _request(self, method: str, url: str, _retry_auth: bool = True, **kwargs) -> requests.Response:
+        """
+        Send a request over the pooled session, recording latency metrics.
+        
+        With a token manager attached, an expiring token is refreshed first
+        and a 401 is retried once with a refreshed token.
+        
+        Args:
+            method: HTTP method
+            url: Absolute URL or path relative to base_url
+            **kwargs: Passed through to requests.Session.request
+            
+        Returns:
+            requests.Response: Response with a successful status
+        """
+        if not url.startswith("http"):
+            url = f"{self.base_url}{url}"
+        manage_auth = self.token_manager is not None and not url.startswith(self.auth_url)
+        if manage_auth:
+            self.token_manager.ensure_fresh()
+        sent_token = self.access_token
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            kind = "timeout" if isinstance(e, requests.exceptions.Timeout) else "connection"
+            self.metrics.record_request("calendly", method, url, kind, time.perf_counter() - started)
+            self.metrics.record_error("calendly", method, url, kind)
+            raise
+        
+        self.metrics.record_request(
+            "calendly",
+            method,
+            url,
+            response.status_code,
+            time.perf_counter() - started,
+            bytes_sent=len(response.request.body or b""),
+            bytes_received=len(response.content)
+        )
+        if response.status_code >= 400:
+            self.metrics.record_error("calendly", method, url, f"http_{response.status_code}")
+        if response.status_code == 401 and manage_auth and _retry_auth:
+            if self.token_manager.refresh(stale_token=sent_token):
+                return self._request(method, url, _retry_auth=False, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def _post_token_request(self, data: Dict) -> requests.Response:
+        """POST a form-encoded OAuth token request over the pooled session."""
+        return self._request(
+            "POST",
+            f"{self.auth_url}/oauth/token",
+            data=data,
+            headers={'Content-Type': 'application/x-www-form-urlencoded'}
+        )
+
+    def _paginate(
+        self,
+        path: str,
+        params: Optional[Dict] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        stop_when: Optional[Callable[[Dict], bool]] = None
+    ) -> Iterator[Dict]:
+        """
+        Lazily yield every item of a paginated list endpoint.
+        
+        Pages are fetched one at a time by following pagination.next_page,
+        and only when the consumer asks for more items.
+        
+        Args:
+            path: List endpoint path
+            params: Query parameters for the first page
+            page_size: Items per page, at most MAX_PAGE_SIZE
+            stop_when: Stop before the first item for which this returns True,
+                without fetching further pages
+                
+        Returns:
+            Iterator[Dict]: Items across all pages
+        """
+        params = dict(params or {})
+        params['count'] = max(1, min(page_size, MAX_PAGE_SIZE))
+        url, page_params = path, params
+        while url:
+            body = self._request("GET", url, params=page_params).json()
+            for item in body.get('collection', body.get('data', [])):
+                if stop_when is not None and stop_when(item):
+                    return
+                yield item
+            # next_page is an absolute URL that already carries every parameter
+            url = (body.get('pagination') or {}).get('next_page')
+            page_params = None
+
     def get_user(self) -> Dict:
         """Get current user information."""
-        response = self.session.get(f"{self.base_url}/users/me")
-        response.raise_for_status()
+        response = self._request("GET", "/users/me")
         return response.json()
 
     def get_event_types(self) -> List[Dict]:
         """Get list of event types for the current user."""
-        response = self.session.get(f"{self.base_url}/event_types")
-        response.raise_for_status()
-        return response.json()['data']
+        return list(self.iter_event_types())
+
+    def iter_event_types(
+        self,
+        params: Optional[Dict] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        stop_when: Optional[Callable[[Dict], bool]] = None
+    ) -> Iterator[Dict]:
+        """Lazily iterate over event types, following pagination (see _paginate)."""
+        return self._paginate("/event_types", params, page_size, stop_when)
 
     def get_scheduled_events(self, params: Optional[Dict] = None) -> List[Dict]:
         """
@@ -125,11 +230,28 @@ class CalendlyAPI:
             params: Optional query parameters
             
         Returns:
-            List[Dict]: List of scheduled events
+            List[Dict]: List of scheduled events across all pages
         """
-        response = self.session.get(f"{self.base_url}/scheduled_events", params=params)
-        response.raise_for_status()
-        return response.json()['data']
+        return list(self.iter_scheduled_events(params))
+
+    def iter_scheduled_events(
+        self,
+        params: Optional[Dict] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        stop_when: Optional[Callable[[Dict], bool]] = None
+    ) -> Iterator[Dict]:
+        """
+        Lazily iterate over scheduled events, following pagination.
+        
+        Args:
+            params: Optional query parameters, e.g. organization, min_start_time, sort
+            page_size: Events per page
+            stop_when: Stop before the first event for which this returns True
+            
+        Returns:
+            Iterator[Dict]: Scheduled events
+        """
+        return self._paginate("/scheduled_events", params, page_size, stop_when)
 
     def create_webhook(self, url: str, events: List[str], scope: str) -> Dict:
         """
@@ -149,8 +271,7 @@ class CalendlyAPI:
             'scope': scope
         }
         
-        response = self.session.post(f"{self.base_url}/webhook_subscriptions", json=data)
-        response.raise_for_status()
+        response = self._request("POST", "/webhook_subscriptions", json=data)
         return response.json()['resource']
 
     def delete_webhook(self, webhook_uuid: str):
@@ -160,19 +281,24 @@ class CalendlyAPI:
         Args:
             webhook_uuid: UUID of webhook to delete
         """
-        response = self.session.delete(f"{self.base_url}/webhook_subscriptions/{webhook_uuid}")
-        response.raise_for_status()
+        response = self._request("DELETE", f"/webhook_subscriptions/{webhook_uuid}")
 
     def get_organization_memberships(self) -> List[Dict]:
         """Get list of organization memberships for the current user."""
-        response = self.session.get(f"{self.base_url}/organization_memberships")
-        response.raise_for_status()
-        return response.json()['data']
+        return list(self.iter_organization_memberships())
+
+    def iter_organization_memberships(
+        self,
+        params: Optional[Dict] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        stop_when: Optional[Callable[[Dict], bool]] = None
+    ) -> Iterator[Dict]:
+        """Lazily iterate over organization memberships, following pagination (see _paginate)."""
+        return self._paginate("/organization_memberships", params, page_size, stop_when)
 
     def get_user_availability_schedules(self) -> List[Dict]:
         """Get list of availability schedules for the current user."""
-        response = self.session.get(f"{self.base_url}/user_availability_schedules")
-        response.raise_for_status()
+        response = self._request("GET", "/user_availability_schedules")
         return response.json()['data']
 
     def get_event_invitee(self, event_uuid: str, invitee_uuid: str) -> Dict:
@@ -186,10 +312,7 @@ class CalendlyAPI:
         Returns:
             Dict: Invitee information
         """
-        response = self.session.get(
-            f"{self.base_url}/scheduled_events/{event_uuid}/invitees/{invitee_uuid}"
-        )
-        response.raise_for_status()
+        response = self._request("GET", f"/scheduled_events/{event_uuid}/invitees/{invitee_uuid}")
         return response.json()['resource']
 
     def list_event_types_by_organization(self, organization_uri: str) -> List[Dict]:
@@ -202,10 +325,16 @@ class CalendlyAPI:
         Returns:
             List[Dict]: List of event types
         """
-        params = {'organization': organization_uri}
-        response = self.session.get(f"{self.base_url}/event_types", params=params)
-        response.raise_for_status()
-        return response.json()['data']
+        return list(self.iter_event_types_by_organization(organization_uri))
+
+    def iter_event_types_by_organization(
+        self,
+        organization_uri: str,
+        page_size: int = MAX_PAGE_SIZE,
+        stop_when: Optional[Callable[[Dict], bool]] = None
+    ) -> Iterator[Dict]:
+        """Lazily iterate over an organization's event types, following pagination (see _paginate)."""
+        return self._paginate("/event_types", {'organization': organization_uri}, page_size, stop_when)
 
     def get_user_busy_times(self, user_uri: str, start_time: str, end_time: str) -> List[Dict]:
         """
@@ -224,6 +353,5 @@ class CalendlyAPI:
             'start_time': start_time,
             'end_time': end_time
         }
-        response = self.session.get(f"{self.base_url}/user_busy_times", params=params)
-        response.raise_for_status()
-        return response.json()['data']
+        body = self._request("GET", "/user_busy_times", params=params).json()
+        return body.get('collection', body.get('data', []))
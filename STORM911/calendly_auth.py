@@ -0,0 +1,224 @@
+"""
+Calendly token management for Storm911.
+Persists OAuth tokens across restarts and refreshes them ahead of expiry,
+so neither startup nor the first scheduling call waits on authentication.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+from config import CALENDLY_AUTH_CONFIG
+from ratelimit import background_priority
+
+logger = logging.getLogger(__name__)
+
+
+class TokenStore:
+    """JSON file holding the current Calendly token response, readable only by the user."""
+
+    def __init__(self, path: Optional[str] = None, legacy_path: Optional[str] = None):
+        self.path = path or CALENDLY_AUTH_CONFIG["token_file"]
+        # Older versions kept the file in the tracked assets directory
+        self.legacy_path = legacy_path if path else CALENDLY_AUTH_CONFIG["legacy_token_file"]
+
+    def load(self) -> Optional[Dict]:
+        """Return the stored token data, or None if there is none."""
+        if not os.path.exists(self.path) and self.legacy_path and os.path.exists(self.legacy_path):
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            os.replace(self.legacy_path, self.path)
+            logger.info(f"Moved Calendly tokens to {self.path}")
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading Calendly tokens: {str(e)}")
+            return None
+
+    def save(self, token_data: Dict):
+        """Write token data atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(token_data, f)
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        """Forget the stored tokens."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class TokenManager:
+    """
+    Keeps a CalendlyAPI's access token valid.
+
+    Tokens are loaded from and saved to a TokenStore. A daemon thread
+    refreshes the token refresh_margin seconds before it expires, and the
+    client calls refresh() when a request comes back 401. Refreshes are
+    serialized, and a caller whose token has already been replaced by a
+    concurrent refresh reuses the new one instead of refreshing again.
+    """
+
+    def __init__(
+        self,
+        calendly_api,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        store: Optional[TokenStore] = None,
+        refresh_margin: Optional[float] = None
+    ):
+        """
+        Initialize the manager and attach it to calendly_api.
+
+        Args:
+            calendly_api: Client whose token is managed
+            client_id: Calendly OAuth client ID
+            client_secret: Calendly OAuth client secret
+            store: Token persistence (default: CALENDLY_AUTH_CONFIG token_file)
+            refresh_margin: Seconds before expiry to refresh
+        """
+        self.api = calendly_api
+        self.client_id = client_id or CALENDLY_AUTH_CONFIG["client_id"]
+        self.client_secret = client_secret or CALENDLY_AUTH_CONFIG["client_secret"]
+        self.store = store or TokenStore()
+        self.refresh_margin = CALENDLY_AUTH_CONFIG["refresh_margin"] if refresh_margin is None else refresh_margin
+        self.token_data: Optional[Dict] = None
+        self.refresh_count = 0
+
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        calendly_api.token_manager = self
+
+    # ------------------------------------------------------------------
+    # Token state
+    # ------------------------------------------------------------------
+    def load(self, fallback: Optional[Dict] = None) -> bool:
+        """
+        Apply the persisted token to the client.
+
+        Args:
+            fallback: Token data to use and persist when nothing is stored,
+                e.g. tokens kept in settings.json by older versions
+
+        Returns:
+            bool: Whether a token is now set
+        """
+        token_data = self.store.load()
+        if not token_data and fallback and fallback.get("access_token"):
+            token_data = dict(fallback)
+            self.store.save(token_data)
+        if not token_data or not token_data.get("access_token"):
+            return False
+        self._apply(token_data)
+        return True
+
+    def exchange_code(self, code: str, redirect_uri: str) -> Dict:
+        """Complete the OAuth flow with an authorization code and persist the tokens."""
+        with self._lock:
+            token_data = self.api.get_access_token(self.client_id, self.client_secret, code, redirect_uri)
+            self._apply(token_data)
+            self.store.save(self.token_data)
+        return token_data
+
+    def _apply(self, token_data: Dict):
+        token_data = dict(token_data)
+        if "expires_at" not in token_data and token_data.get("expires_in"):
+            issued = token_data.get("created_at") or time.time()
+            token_data["expires_at"] = float(issued) + float(token_data["expires_in"])
+        self.token_data = token_data
+        self.api.set_auth_token(token_data["access_token"], token_data.get("refresh_token"))
+        self._changed.set()
+
+    def expires_in(self) -> Optional[float]:
+        """Seconds until the current token expires, or None if unknown."""
+        expires_at = (self.token_data or {}).get("expires_at")
+        return expires_at - time.time() if expires_at else None
+
+    def needs_refresh(self) -> bool:
+        """Whether the token expires within refresh_margin seconds."""
+        remaining = self.expires_in()
+        return remaining is not None and remaining <= self.refresh_margin
+
+    # ------------------------------------------------------------------
+    # Refreshing
+    # ------------------------------------------------------------------
+    def refresh(self, stale_token: Optional[str] = None) -> bool:
+        """
+        Refresh the access token, unless another caller just did.
+
+        Args:
+            stale_token: Token the caller found invalid; if the current token
+                differs, it was already replaced and no refresh is made
+
+        Returns:
+            bool: Whether the client now holds a different token than stale_token
+        """
+        with self._lock:
+            if stale_token is not None and self.api.access_token != stale_token:
+                return True
+            refresh_token = (self.token_data or {}).get("refresh_token") or self.api.refresh_token
+            if not refresh_token or not self.client_id:
+                logger.warning("Calendly token can't be refreshed: no refresh token or client id")
+                return False
+            token_data = self.api.refresh_access_token(self.client_id, self.client_secret, refresh_token)
+            if not token_data.get("refresh_token"):
+                token_data = dict(token_data, refresh_token=refresh_token)
+            self._apply(token_data)
+            self.store.save(self.token_data)
+            self.refresh_count += 1
+        logger.info("Calendly access token refreshed")
+        return True
+
+    def ensure_fresh(self):
+        """Refresh now if the token is about to expire; called before each request."""
+        if self.needs_refresh():
+            try:
+                self.refresh(stale_token=self.api.access_token)
+            except Exception as e:
+                # The old token may still have a few minutes left; a 401 retries
+                logger.error(f"Calendly token refresh failed: {str(e)}")
+
+    def start(self):
+        """Refresh ahead of expiry on a daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="storm911-calendly-auth", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Stop the refresh thread."""
+        self._stop_event.set()
+        self._changed.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        with background_priority():
+            while not self._stop_event.is_set():
+                self._changed.clear()
+                remaining = self.expires_in()
+                if remaining is None:
+                    # Unknown expiry; wait for a token we can schedule
+                    self._changed.wait()
+                    continue
+                wait = remaining - self.refresh_margin
+                if wait > 0:
+                    self._changed.wait(wait)
+                    continue
+                try:
+                    self.refresh(stale_token=self.api.access_token)
+                except Exception as e:
+                    logger.error(f"Calendly token refresh failed: {str(e)}")
+                if self.needs_refresh():
+                    # Failed, or the new token is shorter-lived than the margin
+                    self._stop_event.wait(CALENDLY_AUTH_CONFIG["retry_delay"])
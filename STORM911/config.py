@@ -41,6 +41,153 @@ MIN_WINDOW_SIZE = (800, 600)
 API_BASE_URL = "https://api.readymode.com/v1"
 API_TIMEOUT = 30  # seconds
 
+API_SETTINGS = {
+    "base_url": "https://roofingappointments.readymode.com/TPI",
+    "timeout": API_TIMEOUT
+}
+
+# HTTP Connection Pool Settings (shared by all API clients)
+HTTP_POOL_CONFIG = {
+    "pool_connections": 4,  # number of hosts with a cached pool
+    "pool_maxsize": 16,  # connections kept per host; at least the largest bulk/hedge concurrency
+    "pool_block": False,
+    "tcp_keepalive": True,
+    "keepalive_idle": 60,  # seconds idle before keep-alive probes
+    "keepalive_interval": 15  # seconds between keep-alive probes
+}
+
+# Async API Client Settings
+ASYNC_API_CONFIG = {
+    "max_concurrency": 16  # requests in flight per AsyncReadyModeAPI
+}
+
+# Client-side Rate Limits (requests per second, per priority class)
+# ReadyMode allows 2,000 lead searches/updates and 10,000 creates per hour.
+# Interactive and background share the search quota: rate * 3600 + burst
+# of both stays under 2,000 in any hour. Creates have their own bucket.
+RATE_LIMIT_CONFIG = {
+    "enabled": True,
+    "interactive": {"rate": 0.08, "burst": 20},  # GUI lookups; 308/hour at most
+    "background": {"rate": 0.42, "burst": 150},  # bulk lookups, outbox updates, async batches; 1,662/hour at most
+    "create": {"rate": 2.7, "burst": 50}  # lead and appointment creates, either class; 9,770/hour at most
+}
+
+# Request Hedging Settings (duplicate slow GETs, take the first answer)
+HEDGE_CONFIG = {
+    "enabled": False,
+    "endpoints": ["/search/Lead"],
+    "percentile": 95,  # hedge once a request is slower than this percentile
+    "min_samples": 20,  # observations needed before trusting the percentile
+    "default_delay_ms": 500,  # hedge delay until enough samples exist
+    "min_delay_ms": 20,
+    "budget_ratio": 0.1,  # at most one hedge per ten eligible requests
+    "max_workers": 16
+}
+
+# Metrics Settings
+METRICS_CONFIG = {
+    "enable_dump": True,
+    "dump_interval": 60,  # seconds between snapshots
+    "dump_file": "metrics.json"  # written under LOGS_DIR
+}
+
+# Outbox Settings (write-behind queue for lead/appointment mutations)
+OUTBOX_CONFIG = {
+    "db_path": os.path.join(TEMP_DIR, "outbox.db"),
+    "batch_size": 20,
+    "poll_interval": 5,  # seconds between flushes when idle
+    "max_attempts": 8,
+    "status_refresh_ms": 2000  # how often the GUI refreshes queue counts
+}
+
+# Lead Replica Settings (local SQLite copy of leads, delta-synced)
+REPLICA_CONFIG = {
+    "enabled": False,  # needs a /list/Lead endpoint; the live ReadyMode API doesn't offer one
+    "db_path": os.path.join(TEMP_DIR, "leads.db"),
+    "sync_interval": 60,  # seconds between delta syncs
+    "page_size": 500,  # leads per /list/Lead request
+    "max_staleness": 300  # seconds after the last sync before lookups go remote
+}
+
+# Lead Import Settings (import_leads.py)
+IMPORT_CONFIG = {
+    "chunk_size": 500,  # rows per local transaction and outbox batch
+    "progress_every": 10000  # rows between progress lines
+}
+
+# Appointment Availability Settings (Calendly busy-time index)
+AVAILABILITY_CONFIG = {
+    "days": 30,  # how far ahead busy times are prefetched
+    "refresh_interval": 300,  # seconds between incremental refreshes
+    "refresh_days": 7,  # near-term days re-fetched by each incremental refresh
+    "full_refresh_interval": 3600,  # seconds between reloads of the whole window
+    "slot_minutes": 30,
+    "day_start_hour": 9,  # local time
+    "day_end_hour": 17,
+    "workdays": [0, 1, 2, 3, 4, 5]  # Monday to Saturday
+}
+
+# Team Availability Settings (free inspectors per slot across an organization)
+TEAM_AVAILABILITY_CONFIG = {
+    "max_workers": 8,  # concurrent busy-time requests
+    "cache_ttl": 300,  # seconds a day's capacity view is reused
+    "failure_ttl": 30,  # seconds a view missing failed members is reused before retrying
+    "rate_limit": {  # Calendly requests per second, separate from ReadyMode's budget
+        "enabled": True,
+        "interactive": {"rate": 8.0, "burst": 8},
+        "background": {"rate": 2.0, "burst": 2}
+    }
+}
+
+# Calendly OAuth Settings (calendly_auth.py)
+CALENDLY_AUTH_CONFIG = {
+    "client_id": "",  # settings.json calendly.client_id wins
+    "client_secret": "",
+    "token_file": os.path.join(TEMP_DIR, "calendly_tokens.json"),  # holds a live refresh token; kept out of git
+    "legacy_token_file": os.path.join(ASSETS_DIR, "calendly_tokens.json"),  # moved to token_file on first load
+    "refresh_margin": 300,  # seconds before expiry to refresh
+    "retry_delay": 30  # seconds between attempts after a failed refresh
+}
+
+# Calendly Webhook Receiver Settings (webhooks.py)
+WEBHOOK_CONFIG = {
+    "enabled": False,  # needs a public URL forwarding to host:port
+    "host": "127.0.0.1",
+    "port": 8766,
+    "path": "/calendly/webhook",
+    "signing_key": "",  # webhook subscription signing key; settings.json calendly.webhook_signing_key wins
+    "tolerance": 180,  # seconds a signed timestamp stays valid, against replays
+    "max_body_bytes": 1024 * 1024
+}
+
+# Retry Settings (attempt budgets include the first try)
+RETRY_CONFIG = {
+    "max_attempts": 3,
+    "base_delay": 0.25,  # seconds
+    "max_delay": 8.0,  # seconds
+    "retry_statuses": [429, 502, 503, 504],
+    "endpoint_budgets": {
+        "/test": 1,
+        "/search/Lead": 3,
+        "/status/": 2,
+        "/create/": 3,
+        "/update/": 3
+    }
+}
+
+# Circuit Breaker Settings
+CIRCUIT_BREAKER_CONFIG = {
+    "failure_threshold": 5,  # consecutive failures before opening
+    "recovery_timeout": 30,  # seconds before a probe is let through
+    "half_open_max_calls": 1
+}
+
+# Background Executor Settings
+EXECUTOR_CONFIG = {
+    "max_workers": 4,
+    "poll_interval_ms": 50  # how often the Tk thread drains worker results
+}
+
 # Email Settings
 EMAIL_CONFIG = {
     "smtp_server": "smtp.gmail.com",
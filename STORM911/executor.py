@@ -0,0 +1,257 @@
+"""
+Background executor module for Storm911.
+Runs blocking I/O (network, PDF, SMTP) off the Tk thread and hands results
+back to the GUI through a queue drained with after().
+"""
+
+import queue
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from config import EXECUTOR_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Message kinds placed on the result queue
+_PROGRESS = "progress"
+_SUCCESS = "success"
+_ERROR = "error"
+
+
+class TaskCancelled(Exception):
+    """Raised inside a worker when its task has been cancelled."""
+    pass
+
+
+class BackgroundTask:
+    """Handle for a unit of work submitted to the BackgroundExecutor."""
+
+    def __init__(
+        self,
+        name: str,
+        on_success: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        on_progress: Optional[Callable[[Any], None]] = None
+    ):
+        self.name = name
+        self.on_success = on_success
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.future: Optional[Future] = None
+        self._cancelled = threading.Event()
+        self._outbox: Optional[queue.Queue] = None
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() has been called on this task."""
+        return self._cancelled.is_set()
+
+    def cancel(self) -> bool:
+        """
+        Cancel the task.
+
+        A task that has not started yet is dropped from the pool. A running
+        task cannot be interrupted, but its callbacks will not be invoked.
+
+        Returns:
+            bool: True if the task had not finished yet
+        """
+        self._cancelled.set()
+        if self.future is None:
+            return True
+        self.future.cancel()
+        return not self.future.done() or self.future.cancelled()
+
+    def check_cancelled(self):
+        """Raise TaskCancelled if the task was cancelled; for use by workers."""
+        if self.cancelled:
+            raise TaskCancelled(self.name)
+
+    def report_progress(self, value: Any):
+        """Post a progress update to the Tk thread; safe to call from workers."""
+        if self._outbox is not None and not self.cancelled:
+            self._outbox.put((self, _PROGRESS, value))
+
+    def done(self) -> bool:
+        """Whether the task has finished running."""
+        return self.future is not None and self.future.done()
+
+
+class BackgroundExecutor:
+    """
+    Thread pool whose results are delivered on the Tk thread.
+
+    Workers never touch widgets. Their results, errors and progress updates
+    are put on a queue which the Tk mainloop drains every poll interval.
+    """
+
+    def __init__(
+        self,
+        root,
+        max_workers: Optional[int] = None,
+        poll_interval_ms: Optional[int] = None
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            root: Tk widget used to schedule queue draining with after()
+            max_workers: Size of the worker pool
+            poll_interval_ms: How often the result queue is drained
+        """
+        self.root = root
+        self.poll_interval_ms = poll_interval_ms or EXECUTOR_CONFIG["poll_interval_ms"]
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or EXECUTOR_CONFIG["max_workers"],
+            thread_name_prefix="storm911-io"
+        )
+        self._results: queue.Queue = queue.Queue()
+        self._after_id = None
+        self._closed = False
+        self._schedule_drain()
+
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        name: Optional[str] = None,
+        on_success: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        on_progress: Optional[Callable[[Any], None]] = None,
+        **kwargs
+    ) -> BackgroundTask:
+        """
+        Run fn(*args, **kwargs) on a worker thread.
+
+        If on_progress is given, fn also receives the task as a ``task``
+        keyword argument so it can call task.report_progress() and
+        task.check_cancelled().
+
+        Args:
+            fn: Blocking callable to run
+            name: Label used in log messages
+            on_success: Called on the Tk thread with fn's return value
+            on_error: Called on the Tk thread with the raised exception
+            on_progress: Called on the Tk thread with each progress value
+
+        Returns:
+            BackgroundTask: Handle that can be used to cancel the work
+        """
+        if self._closed:
+            raise RuntimeError("Background executor has been shut down")
+
+        task = BackgroundTask(
+            name or getattr(fn, "__name__", "task"),
+            on_success=on_success,
+            on_error=on_error,
+            on_progress=on_progress
+        )
+        task._outbox = self._results
+        if on_progress is not None:
+            kwargs["task"] = task
+
+        task.future = self._pool.submit(self._run, task, fn, args, kwargs)
+        return task
+
+    def watch(
+        self,
+        future: Future,
+        name: str = "future",
+        on_success: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None
+    ) -> BackgroundTask:
+        """
+        Deliver the outcome of an externally created future on the Tk thread.
+
+        Args:
+            future: Future completed by some other thread or event loop
+            name: Label used in log messages
+            on_success: Called on the Tk thread with the future's result
+            on_error: Called on the Tk thread with the future's exception
+
+        Returns:
+            BackgroundTask: Handle that can be used to cancel the work
+        """
+        task = BackgroundTask(name, on_success=on_success, on_error=on_error)
+        task._outbox = self._results
+        task.future = future
+
+        def _forward(fut: Future):
+            if fut.cancelled():
+                return
+            exc = fut.exception()
+            if exc is not None:
+                self._results.put((task, _ERROR, exc))
+            else:
+                self._results.put((task, _SUCCESS, fut.result()))
+
+        future.add_done_callback(_forward)
+        return task
+
+    def _run(self, task: BackgroundTask, fn: Callable, args: tuple, kwargs: dict):
+        """Worker-side wrapper that routes the outcome onto the result queue."""
+        if task.cancelled:
+            return
+        try:
+            result = fn(*args, **kwargs)
+        except TaskCancelled:
+            logger.debug(f"Background task cancelled: {task.name}")
+            return
+        except BaseException as e:
+            self._results.put((task, _ERROR, e))
+            return
+        self._results.put((task, _SUCCESS, result))
+
+    def _schedule_drain(self):
+        """Arrange for the result queue to be drained on the Tk thread."""
+        if not self._closed:
+            self._after_id = self.root.after(self.poll_interval_ms, self._drain)
+
+    def _drain(self):
+        """Dispatch every queued result to its callback; runs on the Tk thread."""
+        try:
+            while True:
+                try:
+                    task, kind, payload = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                if task.cancelled:
+                    continue
+                self._dispatch(task, kind, payload)
+        finally:
+            self._schedule_drain()
+
+    def _dispatch(self, task: BackgroundTask, kind: str, payload: Any):
+        """Invoke the callback matching a queued result."""
+        try:
+            if kind == _PROGRESS:
+                if task.on_progress:
+                    task.on_progress(payload)
+            elif kind == _SUCCESS:
+                if task.on_success:
+                    task.on_success(payload)
+            elif kind == _ERROR:
+                if task.on_error:
+                    task.on_error(payload)
+                else:
+                    logger.error(f"Background task {task.name} failed: {str(payload)}")
+        except Exception as e:
+            logger.error(f"Callback for background task {task.name} failed: {str(e)}")
+
+    def shutdown(self, wait: bool = False):
+        """
+        Stop accepting work and release the worker threads.
+
+        Args:
+            wait: Block until running tasks have finished
+        """
+        self._closed = True
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._pool.shutdown(wait=wait, cancel_futures=True)
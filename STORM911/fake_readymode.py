@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Local ReadyMode stand-in server for Storm911.
+Implements the endpoints ReadyModeAPI uses, with configurable latency,
+error injection and dataset size, for offline development and benchmarks.
+
+Run standalone:
+    python fake_readymode.py --port 8765 --leads 10000 --latency-ms 40
+then point ReadyModeAPI(..., base_url="http://127.0.0.1:8765/TPI") at it.
+"""
+
+import re
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+_FIRST_NAMES = ["John", "Mary", "James", "Linda", "Robert", "Susan", "Michael", "Karen"]
+_LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis"]
+_CITIES = [("Dallas", "TX", "75201"), ("Tulsa", "OK", "74103"), ("Denver", "CO", "80202"),
+           ("Omaha", "NE", "68102"), ("Wichita", "KS", "67202")]
+
+# Path prefix every endpoint lives under, as in the production base URL
+_PREFIX = "/TPI/"
+
+
+def fake_phone(index: int) -> str:
+    """Phone number of the index-th generated lead."""
+    return f"555{index:07d}"
+
+
+class FakeReadyModeState:
+    """In-memory dataset and fault settings shared by all request handlers."""
+
+    def __init__(
+        self,
+        leads: int = 1000,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        tail_rate: float = 0.0,
+        tail_ms: float = 0.0,
+        error_rate: float = 0.0,
+        username: str = "demo",
+        password: str = "demo",
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the dataset.
+
+        Args:
+            leads: Number of leads to generate
+            latency_ms: Base latency added to every response
+            jitter_ms: Uniform random latency added on top of the base
+            tail_rate: Fraction of requests that are additionally slowed down
+            tail_ms: Extra latency for tail requests
+            error_rate: Fraction of requests answered with a 502/503
+            username: Accepted API_user
+            password: Accepted API_pass
+            seed: Random seed for reproducible runs
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tail_rate = tail_rate
+        self.tail_ms = tail_ms
+        self.error_rate = error_rate
+        self.username = username
+        self.password = password
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        self.leads: Dict[str, Dict] = {}
+        self.leads_by_phone: Dict[str, str] = {}
+        self.appointments: Dict[str, Dict] = {}
+        self.idempotent_responses: Dict[str, Dict] = {}
+        self.request_count = 0
+        self.clock = 0
+        for index in range(leads):
+            city, state, zip_code = _CITIES[index % len(_CITIES)]
+            self._store_lead({
+                "id": str(index + 1),
+                "firstName": _FIRST_NAMES[index % len(_FIRST_NAMES)],
+                "lastName": _LAST_NAMES[(index // len(_FIRST_NAMES)) % len(_LAST_NAMES)],
+                "address": f"{100 + index} Main St",
+                "city": city,
+                "state": state,
+                "zip": zip_code,
+                "phone": fake_phone(index),
+                "email": f"lead{index}@example.com"
+            })
+
+    def _store_lead(self, lead: Dict):
+        self.clock += 1
+        lead["updated_at"] = self.clock
+        self.leads[lead["id"]] = lead
+        if lead.get("phone"):
+            self.leads_by_phone[re.sub(r"\D", "", lead["phone"])[-10:]] = lead["id"]
+
+    def delay(self) -> float:
+        """Seconds the next response should be held back."""
+        with self.lock:
+            seconds = self.latency_ms + self.random.uniform(0, self.jitter_ms)
+            if self.tail_rate and self.random.random() < self.tail_rate:
+                seconds += self.tail_ms
+        return seconds / 1000.0
+
+    def should_fail(self) -> bool:
+        """Whether to inject a server error into the next response."""
+        with self.lock:
+            return bool(self.error_rate) and self.random.random() < self.error_rate
+
+
+class FakeReadyModeHandler(BaseHTTPRequestHandler):
+    """Routes ReadyMode TPI requests against a FakeReadyModeState."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeReadyMode/1.0"
+    # Headers and body are written separately; don't let Nagle delay the body
+    disable_nagle_algorithm = True
+
+    @property
+    def state(self) -> FakeReadyModeState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def _handle(self, method: str):
+        split = urlsplit(self.path)
+        if not split.path.startswith(_PREFIX):
+            self._read_body()
+            self._send(404, {"status": "error", "message": f"Unknown endpoint: {split.path}"})
+            return
+        path = split.path[len(_PREFIX) - 1:]
+        query = {k: v[0] for k, v in parse_qs(split.query).items()}
+        body = self._read_body()
+
+        time.sleep(self.state.delay())
+        with self.state.lock:
+            self.state.request_count += 1
+
+        if query.get("API_user") != self.state.username or query.get("API_pass") != self.state.password:
+            self._send(401, {"status": "error", "message": "Invalid credentials"})
+            return
+        if self.state.should_fail():
+            self._send(self.state.random.choice([502, 503]), {"status": "error", "message": "Injected failure"})
+            return
+
+        idempotency_key = self.headers.get("Idempotency-Key")
+        if idempotency_key:
+            with self.state.lock:
+                cached = self.state.idempotent_responses.get(idempotency_key)
+            if cached is not None:
+                self._send(200, cached)
+                return
+
+        status, payload = self._route(method, path, query, body)
+        if idempotency_key and status == 200:
+            with self.state.lock:
+                self.state.idempotent_responses[idempotency_key] = payload
+        self._send(status, payload)
+
+    def _route(self, method: str, path: str, query: Dict, body: Dict):
+        parts = [part for part in path.split("/") if part]
+        state = self.state
+
+        if method == "GET" and parts == ["test"]:
+            return 200, {"status": "success"}
+
+        if method == "GET" and parts[:2] == ["search", "Lead"] and len(parts) == 3:
+            phone = re.sub(r"\D", "", parts[2])[-10:]
+            with state.lock:
+                lead_id = state.leads_by_phone.get(phone)
+                lead = dict(state.leads[lead_id]) if lead_id else None
+            if lead is None:
+                return 200, {"status": "not_found"}
+            return 200, {"status": "success", "lead": lead}
+
+        if method == "GET" and parts == ["list", "Lead"]:
+            cursor = (int(query.get("updated_since") or 0), query.get("after_id") or "")
+            limit = int(query.get("limit") or 500)
+            with state.lock:
+                # Keyset pagination: leads sorting after the (updated_at, id) cursor
+                changed = sorted(
+                    (lead for lead in state.leads.values() if (lead["updated_at"], lead["id"]) > cursor),
+                    key=lambda lead: (lead["updated_at"], lead["id"])
+                )
+                page = [dict(lead) for lead in changed[:limit]]
+            return 200, {"status": "success", "leads": page}
+
+        if method == "POST" and parts == ["create", "Lead"]:
+            with state.lock:
+                lead = dict(body)
+                lead["id"] = str(len(state.leads) + 1)
+                state._store_lead(lead)
+            return 200, {"status": "success", "lead": lead}
+
+        if method == "PUT" and parts[:2] == ["update", "Lead"] and len(parts) == 3:
+            with state.lock:
+                lead = state.leads.get(parts[2])
+                if lead is None:
+                    return 404, {"status": "error", "message": "Lead not found"}
+                lead.update(body)
+                state._store_lead(lead)
+            return 200, {"status": "success", "lead": dict(lead)}
+
+        if method == "POST" and parts == ["create", "Appointment"]:
+            with state.lock:
+                appointment = dict(body)
+                appointment["id"] = str(len(state.appointments) + 1)
+                state.appointments[appointment["id"]] = appointment
+            return 200, {"status": "success", "appointment": appointment}
+
+        if method == "PUT" and parts[:2] == ["update", "Appointment"] and len(parts) == 3:
+            with state.lock:
+                appointment = state.appointments.get(parts[2])
+                if appointment is None:
+                    return 404, {"status": "error", "message": "Appointment not found"}
+                appointment.update(body)
+            return 200, {"status": "success", "appointment": dict(appointment)}
+
+        if method == "GET" and parts[:1] == ["status"] and len(parts) == 3:
+            store = {"Lead": state.leads, "Appointment": state.appointments}.get(parts[1])
+            if store is None or parts[2] not in store:
+                return 404, {"status": "error", "message": "Not found"}
+            return 200, {"status": "success", "id": parts[2], "state": store[parts[2]].get("status", "active")}
+
+        return 404, {"status": "error", "message": f"Unknown endpoint {method} {path}"}
+
+    def _read_body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _send(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeReadyModeServer:
+    """Threaded fake ReadyMode server that can run in the background of a test or benchmark."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **state_kwargs):
+        """
+        Initialize the server.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind; 0 picks a free port
+            **state_kwargs: Passed to FakeReadyModeState
+        """
+        self.httpd = ThreadingHTTPServer((host, port), FakeReadyModeHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = FakeReadyModeState(**state_kwargs)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def state(self) -> FakeReadyModeState:
+        return self.httpd.state
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{_PREFIX.rstrip('/')}"
+
+    def start(self) -> "FakeReadyModeServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-readymode", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """Run the fake server in the foreground."""
+    parser = argparse.ArgumentParser(description="Local ReadyMode stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--leads", type=int, default=1000, help="number of generated leads")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="fraction of slow responses")
+    parser.add_argument("--tail-ms", type=float, default=0.0, help="extra latency of slow responses")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 502/503 responses")
+    parser.add_argument("--username", default="demo")
+    parser.add_argument("--password", default="demo")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = FakeReadyModeServer(
+        args.host,
+        args.port,
+        leads=args.leads,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tail_rate=args.tail_rate,
+        tail_ms=args.tail_ms,
+        error_rate=args.error_rate,
+        username=args.username,
+        password=args.password,
+        seed=args.seed
+    )
+    logger.info(f"Fake ReadyMode listening on {server.base_url} with {args.leads} leads")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
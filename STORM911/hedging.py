@@ -0,0 +1,146 @@
+"""
+Request hedging module for Storm911.
+Sends a duplicate of a slow idempotent request and takes whichever
+answer arrives first, within a budget that caps the extra load.
+"""
+
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from config import HEDGE_CONFIG
+from metrics import get_registry
+
+logger = logging.getLogger(__name__)
+
+
+class Hedger:
+    """
+    Runs a call and, if it is still outstanding after a delay, races a
+    second identical call against it.
+
+    At most budget_ratio hedges are sent per eligible call, so hedging can
+    never add more than that fraction of extra requests.
+    """
+
+    def __init__(self, name: str, config: Optional[Dict] = None):
+        config = config or HEDGE_CONFIG
+        self.name = name
+        self.enabled = config["enabled"]
+        self.endpoints = tuple(config["endpoints"])
+        self.percentile = config["percentile"]
+        self.min_delay = config["min_delay_ms"] / 1000.0
+        self.default_delay = config["default_delay_ms"] / 1000.0
+        self.min_samples = config["min_samples"]
+        self.budget_ratio = config["budget_ratio"]
+        self._max_workers = config["max_workers"]
+
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.calls = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+        self.metrics = get_registry()
+
+    def applies_to(self, method: str, endpoint: str) -> bool:
+        """Whether a request is eligible for hedging (idempotent GETs on listed endpoints)."""
+        return self.enabled and method.upper() == "GET" and endpoint.startswith(self.endpoints)
+
+    def delay_for(self, observed_ms: Optional[float], samples: int) -> float:
+        """
+        Seconds to wait before hedging.
+
+        Args:
+            observed_ms: Observed latency percentile for the endpoint
+            samples: Number of observations behind that percentile
+
+        Returns:
+            float: The observed percentile, or the default until enough data exists
+        """
+        if observed_ms is None or samples < self.min_samples:
+            return self.default_delay
+        return max(self.min_delay, observed_ms / 1000.0)
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self.hedges_sent + 1 > self.calls * self.budget_ratio:
+                self.budget_denied += 1
+                return False
+            self.hedges_sent += 1
+        return True
+
+    def _refund_budget(self):
+        with self._lock:
+            self.hedges_sent -= 1
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix=f"storm911-hedge-{self.name}"
+                )
+            return self._pool
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        delay: float,
+        may_hedge: Optional[Callable[[], bool]] = None
+    ) -> Any:
+        """
+        Run fn, hedging with a second fn() if the first takes longer than delay.
+
+        Args:
+            fn: Zero-argument idempotent call
+            delay: Seconds to wait before sending the hedge
+            may_hedge: Extra admission check, e.g. a non-blocking rate-limit token
+
+        Returns:
+            Any: Result of whichever call succeeds first; if both fail, the
+            first failure is raised
+        """
+        with self._lock:
+            self.calls += 1
+
+        pool = self._get_pool()
+        primary = pool.submit(fn)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        if not self._take_budget():
+            return primary.result()
+        if may_hedge is not None and not may_hedge():
+            # Refused hedges don't count against the budget
+            self._refund_budget()
+            return primary.result()
+
+        hedge = pool.submit(fn)
+        self.metrics.increment(self.name, "hedges_sent")
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                        self.metrics.increment(self.name, "hedge_wins")
+                    return future.result()
+                if first_error is None:
+                    first_error = future.exception()
+        raise first_error
+
+    def stats(self) -> Dict[str, int]:
+        """Return eligible call, hedge and win counts."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedges_sent": self.hedges_sent,
+                "hedge_wins": self.hedge_wins,
+                "budget_denied": self.budget_denied
+            }
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Storm911 lead importer.
+Streams a CSV lead file into the local lead replica and queues the
+ReadyMode creates in the outbox, in fixed-size chunks so memory use does
+not grow with the file.
+
+Usage:
+    python import_leads.py leads.csv
+    python import_leads.py leads.csv --local-only --chunk-size 1000
+"""
+
+import os
+import re
+import sys
+import csv
+import time
+import logging
+import argparse
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+from config import IMPORT_CONFIG
+from phone import is_valid, national_number
+from replica import LOCAL_ID_PREFIX, LeadReplica, get_replica
+from outbox import Outbox, get_outbox
+
+logger = logging.getLogger(__name__)
+
+# Lead payload field -> accepted CSV header spellings (compared lowercase, alphanumerics only)
+_COLUMN_ALIASES = {
+    "firstName": ("firstname", "first", "fname", "givenname"),
+    "lastName": ("lastname", "last", "lname", "surname", "familyname"),
+    "address": ("address", "address1", "street", "streetaddress"),
+    "city": ("city", "town"),
+    "state": ("state", "st", "province"),
+    "zip": ("zip", "zipcode", "postalcode", "postcode"),
+    "phone": ("phone", "phonenumber", "phone1", "homephone", "primaryphone"),
+    "cell": ("cell", "cellphone", "mobile", "mobilephone", "phone2"),
+    "email": ("email", "emailaddress")
+}
+
+_HEADER_NOISE = re.compile(r"[^a-z0-9]")
+
+
+def map_columns(header: List[str]) -> Dict[str, str]:
+    """
+    Match CSV headers to lead payload fields.
+
+    Returns:
+        Dict[str, str]: Lead field -> CSV header, for the fields present
+    """
+    normalized = {_HEADER_NOISE.sub("", (name or "").lower()): name for name in header}
+    mapping = {}
+    for field, aliases in _COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                mapping[field] = normalized[alias]
+                break
+    return mapping
+
+
+def normalize_row(row: Dict[str, str], mapping: Dict[str, str]) -> Optional[Dict]:
+    """
+    Build a lead payload from a CSV row.
+
+    Returns:
+        Optional[Dict]: Lead payload, or None if the row has no valid phone number
+    """
+    lead = {field: (row.get(column) or "").strip() for field, column in mapping.items()}
+    if not is_valid(lead.get("phone", "")):
+        # Fall back to the cell number when the main phone is missing or bad
+        if not is_valid(lead.get("cell", "")):
+            return None
+        lead["phone"], lead["cell"] = lead["cell"], ""
+    lead["phone"] = national_number(lead["phone"])
+    if lead.get("cell"):
+        lead["cell"] = national_number(lead["cell"]) if is_valid(lead["cell"]) else ""
+    if lead.get("state"):
+        lead["state"] = lead["state"].upper()
+    if lead.get("zip"):
+        lead["zip"] = lead["zip"][:5]
+    return {field: value for field, value in lead.items() if value}
+
+
+def iter_chunks(reader: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    """Yield lists of up to size rows from reader."""
+    while True:
+        chunk = list(islice(reader, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _phones_of(lead: Dict) -> set:
+    """Every normalized number a lead can be found by."""
+    return {lead[field] for field in ("phone", "cell") if lead.get(field)}
+
+
+class LeadImporter:
+    """
+    Streams lead rows into the local replica and the outbox.
+
+    Each chunk is deduplicated against itself and the replica, on every
+    phone number a lead carries, then written to the replica in one
+    transaction and queued for remote creation in one outbox transaction.
+    The two are separate databases, so a re-run also requeues placeholders
+    an interrupted import stored without queueing; an interrupted import
+    can simply be re-run.
+    """
+
+    def __init__(
+        self,
+        replica: LeadReplica,
+        outbox: Optional[Outbox] = None,
+        chunk_size: Optional[int] = None,
+        progress_every: Optional[int] = None
+    ):
+        """
+        Initialize the importer.
+
+        Args:
+            replica: Local lead store to import into
+            outbox: Outbox for remote creates; None imports locally only
+            chunk_size: Rows per transaction
+            progress_every: Rows between progress reports
+        """
+        self.replica = replica
+        self.outbox = outbox
+        self.chunk_size = chunk_size or IMPORT_CONFIG["chunk_size"]
+        self.progress_every = progress_every or IMPORT_CONFIG["progress_every"]
+        self.counts = {"rows": 0, "imported": 0, "duplicates": 0, "invalid": 0, "queued": 0, "requeued": 0}
+        self.started = None
+        self._reported_rows = None
+
+    def import_file(self, path: str, encoding: str = "utf-8-sig", delimiter: str = ",") -> Dict[str, float]:
+        """Import a CSV file and return the final counts."""
+        with open(path, newline="", encoding=encoding) as f:
+            reader = csv.DictReader(f, delimiter=delimiter)
+            mapping = map_columns(reader.fieldnames or [])
+            if "phone" not in mapping and "cell" not in mapping:
+                raise ValueError(f"No phone column found in {path}; headers: {reader.fieldnames}")
+            return self.import_rows(reader, mapping)
+
+    def import_rows(self, rows: Iterator[Dict], mapping: Dict[str, str]) -> Dict[str, float]:
+        """Import rows from any iterator of CSV-style dicts."""
+        self.started = time.perf_counter()
+        next_report = self.progress_every
+        for chunk in iter_chunks(iter(rows), self.chunk_size):
+            self._import_chunk(chunk, mapping)
+            if self.counts["rows"] >= next_report:
+                self.report()
+                next_report += self.progress_every
+        return self.summary()
+
+    def _import_chunk(self, chunk: List[Dict], mapping: Dict[str, str]):
+        leads = []
+        numbers = set()
+        for row in chunk:
+            lead = normalize_row(row, mapping)
+            if lead is None:
+                self.counts["invalid"] += 1
+            elif numbers & _phones_of(lead):
+                self.counts["duplicates"] += 1
+            else:
+                leads.append(lead)
+                numbers |= _phones_of(lead)
+        self.counts["rows"] += len(chunk)
+
+        existing = self.replica.existing_phones(numbers)
+        new_leads = [lead for lead in leads if not existing & _phones_of(lead)]
+        self.counts["duplicates"] += len(leads) - len(new_leads)
+        if self.outbox is not None and existing:
+            self._requeue_unqueued(existing)
+        if not new_leads:
+            return
+
+        self.replica.upsert_many(
+            dict(lead, id=f"{LOCAL_ID_PREFIX}{lead['phone']}") for lead in new_leads
+        )
+        self.counts["imported"] += len(new_leads)
+        if self.outbox is not None:
+            self.outbox.enqueue_many([("create_lead", lead, None, None) for lead in new_leads])
+            self.counts["queued"] += len(new_leads)
+
+    def _requeue_unqueued(self, phones: set):
+        """Queue creates for placeholders stored by an import interrupted before queueing them."""
+        placeholders = self.replica.placeholders(phones)
+        if not placeholders:
+            return
+        known = self.outbox.known_phones(lead["phone"] for lead in placeholders)
+        missing = [
+            {field: value for field, value in lead.items() if field != "id"}
+            for lead in placeholders
+            if lead["phone"] not in known
+        ]
+        if missing:
+            self.outbox.enqueue_many([("create_lead", lead, None, None) for lead in missing])
+            self.counts["requeued"] += len(missing)
+
+    def summary(self) -> Dict[str, float]:
+        """Return the counts so far plus elapsed time and throughput."""
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        return dict(
+            self.counts,
+            elapsed_s=round(elapsed, 2),
+            rows_per_s=round(self.counts["rows"] / elapsed, 1) if elapsed else 0.0
+        )
+
+    def report(self):
+        """Print a progress line, unless nothing changed since the last one."""
+        summary = self.summary()
+        if summary["rows"] == self._reported_rows:
+            return
+        self._reported_rows = summary["rows"]
+        print(
+            f"{summary['rows']} rows  {summary['imported']} imported  "
+            f"{summary['duplicates']} duplicates  {summary['invalid']} invalid  "
+            f"{summary['rows_per_s']} rows/s",
+            flush=True
+        )
+
+
+def main():
+    """Run the importer from the command line."""
+    parser = argparse.ArgumentParser(description="Import a CSV lead file into Storm911")
+    parser.add_argument("csv_file", help="lead file with a header row")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CONFIG["chunk_size"])
+    parser.add_argument("--progress-every", type=int, default=IMPORT_CONFIG["progress_every"])
+    parser.add_argument("--local-only", action="store_true", help="don't queue ReadyMode creates")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    parser.add_argument("--delimiter", default=",")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if not os.path.exists(args.csv_file):
+        parser.error(f"File not found: {args.csv_file}")
+
+    importer = LeadImporter(
+        get_replica(),
+        None if args.local_only else get_outbox(),
+        chunk_size=args.chunk_size,
+        progress_every=args.progress_every
+    )
+    try:
+        importer.import_file(args.csv_file, encoding=args.encoding, delimiter=args.delimiter)
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"Import failed: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        importer.report()
+    if not args.local_only:
+        print("Remote creates are queued; the Storm911 app delivers them once logged in.")
+
+
+if __name__ == "__main__":
+    main()
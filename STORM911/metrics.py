@@ -0,0 +1,316 @@
+"""
+Metrics module for Storm911.
+Latency histograms, byte counts and error/retry counters for the API
+layer, readable as an in-process snapshot and dumped periodically to
+LOGS_DIR.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from config import LOGS_DIR, METRICS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Path segments that identify a specific record rather than a route
+_ID_SEGMENT = re.compile(r"\d")
+
+def endpoint_label(endpoint: str) -> str:
+    """
+    Collapse an endpoint or URL to its route, e.g. /search/Lead/5551234567
+    becomes /search/Lead/{id}, so histograms aggregate per route.
+    """
+    path = urlsplit(endpoint).path if "://" in endpoint else endpoint.split("?", 1)[0]
+    segments = [
+        "{id}" if _ID_SEGMENT.search(segment) else segment
+        for segment in path.split("/")
+    ]
+    return "/".join(segments) or "/"
+
+
+class LatencyHistogram:
+    """
+    Fixed log-scale latency histogram.
+
+    Buckets grow by ``growth`` from ``min_ms`` so percentiles are accurate
+    to within one bucket width (about 10% with the default growth) while
+    using constant memory.
+    """
+
+    def __init__(self, min_ms: float = 0.5, max_ms: float = 120000.0, growth: float = 1.1):
+        self.min_ms = min_ms
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        size = int(math.ceil(math.log(max_ms / min_ms) / self._log_growth)) + 1
+        self.counts: List[int] = [0] * (size + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def _bucket(self, value_ms: float) -> int:
+        if value_ms <= self.min_ms:
+            return 0
+        index = int(math.log(value_ms / self.min_ms) / self._log_growth) + 1
+        return min(index, len(self.counts) - 1)
+
+    def _upper_bound(self, index: int) -> float:
+        return self.min_ms * (self.growth ** index)
+
+    def record(self, seconds: float):
+        """Add one observation, in seconds."""
+        value_ms = seconds * 1000.0
+        self.counts[self._bucket(value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Return the q-th percentile latency in milliseconds.
+
+        Args:
+            q: Percentile between 0 and 100
+
+        Returns:
+            Optional[float]: Upper bound of the bucket holding the percentile,
+            or None if nothing has been recorded
+        """
+        if self.count == 0:
+            return None
+        rank = max(1, int(math.ceil(self.count * q / 100.0)))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(self._upper_bound(index), self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Return count, mean and p50/p95/p99/max in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": self._rounded(self.percentile(50)),
+            "p95_ms": self._rounded(self.percentile(95)),
+            "p99_ms": self._rounded(self.percentile(99)),
+            "max_ms": round(self.max_ms, 3) if self.count else None
+        }
+
+    @staticmethod
+    def _rounded(value: Optional[float]) -> Optional[float]:
+        return round(value, 3) if value is not None else None
+
+
+class MetricsRegistry:
+    """Thread-safe store of per-endpoint latency, byte, error and retry metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (client, method, route, status) -> histogram
+        self._latency: Dict[tuple, LatencyHistogram] = {}
+        # (client, method, route) -> [bytes_sent, bytes_received]
+        self._bytes: Dict[tuple, List[int]] = {}
+        # (client, method, route, kind) -> count
+        self._errors: Dict[tuple, int] = {}
+        # (client, method, route) -> count
+        self._retries: Dict[tuple, int] = {}
+        # (client, name) -> count, for anything else worth counting
+        self._counters: Dict[tuple, int] = {}
+        # name -> histogram, for non-HTTP timings
+        self._timers: Dict[str, LatencyHistogram] = {}
+        self.started_at = time.time()
+
+    def record_request(
+        self,
+        client: str,
+        method: str,
+        endpoint: str,
+        status: object,
+        seconds: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0
+    ):
+        """
+        Record one completed HTTP exchange.
+
+        Args:
+            client: Client name, e.g. "readymode" or "calendly"
+            method: HTTP method
+            endpoint: Endpoint path or URL; ids are collapsed by endpoint_label
+            status: HTTP status code, or an error name if no response arrived
+            seconds: Wall-clock latency
+            bytes_sent: Request body size
+            bytes_received: Response body size
+        """
+        route = endpoint_label(endpoint)
+        with self._lock:
+            key = (client, method.upper(), route, str(status))
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = LatencyHistogram()
+            histogram.record(seconds)
+            totals = self._bytes.setdefault((client, method.upper(), route), [0, 0])
+            totals[0] += bytes_sent
+            totals[1] += bytes_received
+
+    def record_error(self, client: str, method: str, endpoint: str, kind: str):
+        """Count a failed request by error kind."""
+        key = (client, method.upper(), endpoint_label(endpoint), kind)
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def record_retry(self, client: str, method: str, endpoint: str):
+        """Count a retried request."""
+        key = (client, method.upper(), endpoint_label(endpoint))
+        with self._lock:
+            self._retries[key] = self._retries.get(key, 0) + 1
+
+    def increment(self, client: str, name: str, amount: int = 1):
+        """Add to a named counter."""
+        with self._lock:
+            self._counters[(client, name)] = self._counters.get((client, name), 0) + amount
+
+    def observe(self, name: str, seconds: float):
+        """Record a non-HTTP timing, such as a UI update, under name."""
+        with self._lock:
+            histogram = self._timers.get(name)
+            if histogram is None:
+                histogram = self._timers[name] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def percentile(self, client: str, method: str, endpoint: str, q: float) -> Optional[float]:
+        """
+        Return the q-th percentile latency in milliseconds across successful
+        (2xx) responses for a route, or None without data.
+        """
+        merged = self._successful(client, method, endpoint)
+        return merged.percentile(q) if merged is not None else None
+
+    def sample_count(self, client: str, method: str, endpoint: str) -> int:
+        """Return how many successful (2xx) responses were recorded for a route."""
+        merged = self._successful(client, method, endpoint)
+        return merged.count if merged is not None else 0
+
+    def _successful(self, client: str, method: str, endpoint: str) -> Optional[LatencyHistogram]:
+        """Merge the 2xx histograms of a route into one."""
+        route = endpoint_label(endpoint)
+        merged = None
+        with self._lock:
+            for (c, m, r, status), histogram in self._latency.items():
+                if c != client or m != method.upper() or r != route or not status.startswith("2"):
+                    continue
+                if merged is None:
+                    merged = LatencyHistogram()
+                for index, bucket_count in enumerate(histogram.counts):
+                    merged.counts[index] += bucket_count
+                merged.count += histogram.count
+                merged.total_ms += histogram.total_ms
+                merged.max_ms = max(merged.max_ms, histogram.max_ms)
+        return merged
+
+    def snapshot(self) -> Dict:
+        """Return a JSON-serializable view of every metric."""
+        with self._lock:
+            requests = {}
+            for (client, method, route, status), histogram in sorted(self._latency.items()):
+                requests[f"{client} {method} {route} {status}"] = histogram.summary()
+            transfer = {
+                f"{client} {method} {route}": {"bytes_sent": sent, "bytes_received": received}
+                for (client, method, route), (sent, received) in sorted(self._bytes.items())
+            }
+            errors = {
+                f"{client} {method} {route} {kind}": count
+                for (client, method, route, kind), count in sorted(self._errors.items())
+            }
+            retries = {
+                f"{client} {method} {route}": count
+                for (client, method, route), count in sorted(self._retries.items())
+            }
+            counters = {
+                f"{client} {name}": count
+                for (client, name), count in sorted(self._counters.items())
+            }
+            timers = {name: histogram.summary() for name, histogram in sorted(self._timers.items())}
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "requests": requests,
+            "transfer": transfer,
+            "errors": errors,
+            "retries": retries,
+            "counters": counters,
+            "timers": timers
+        }
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """
+        Write the snapshot as JSON.
+
+        Args:
+            path: Destination file (defaults to METRICS_CONFIG dump_file in LOGS_DIR)
+
+        Returns:
+            str: Path written
+        """
+        path = path or os.path.join(LOGS_DIR, METRICS_CONFIG["dump_file"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+
+class MetricsDumper(threading.Thread):
+    """Daemon thread that writes the registry snapshot every interval seconds."""
+
+    def __init__(self, registry: MetricsRegistry, interval: float, path: Optional[str] = None):
+        super().__init__(name="storm911-metrics", daemon=True)
+        self.registry = registry
+        self.interval = interval
+        self.path = path
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self._dump()
+
+    def stop(self):
+        """Stop the thread and write a final snapshot."""
+        self._stop_event.set()
+        self._dump()
+
+    def _dump(self):
+        try:
+            self.registry.dump(self.path)
+        except OSError as e:
+            logger.error(f"Error writing metrics snapshot: {str(e)}")
+
+
+# Create singleton instances
+_registry = MetricsRegistry()
+_dumper: Optional[MetricsDumper] = None
+
+def get_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return _registry
+
+def start_periodic_dump() -> Optional[MetricsDumper]:
+    """Start dumping the registry to LOGS_DIR if enabled in METRICS_CONFIG."""
+    global _dumper
+
+    if _dumper is None and METRICS_CONFIG["enable_dump"]:
+        _dumper = MetricsDumper(_registry, METRICS_CONFIG["dump_interval"])
+        _dumper.start()
+        atexit.register(_dumper.stop)
+    return _dumper
@@ -0,0 +1,188 @@
+"""
+Data models for Storm911.
+Compact records for the lead being worked and the call around it, shared
+by the caller data panel, PDF export and email.
+"""
+
+import json
+from typing import Dict, Optional, Union
+
+# Form fields of the caller data panel, in display order; the app binds
+# each one to its "<field>_var" Tk variable
+FORM_FIELDS = (
+    "customer_name", "address", "city", "state", "zip", "phone", "cell", "email",
+    "roof_stories", "roof_age", "roof_type", "has_insurance", "insurance_company",
+    "is_homeowner", "has_contractor", "appointment_date", "appointment_time"
+)
+
+
+class _PayloadField:
+    """Read-only attribute served from the lead payload, trying each key in turn."""
+
+    __slots__ = ("name", "keys")
+
+    def __init__(self, *keys: str):
+        self.keys = keys
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, record, owner=None):
+        if record is None:
+            return self
+        return record._field(self.name, self.keys)
+
+
+class LeadRecord:
+    """
+    A ReadyMode lead, decoded on demand.
+
+    The payload may be a dict or raw JSON; it is only parsed when a field
+    is first read. First and last name are split from a combined name at
+    most once and cached.
+    """
+
+    __slots__ = ("_raw", "_payload", "_defaults", "_first_name", "_last_name")
+
+    lead_id = _PayloadField("id", "lead_id", "leadId")
+    address = _PayloadField("address")
+    city = _PayloadField("city")
+    state = _PayloadField("state")
+    zip = _PayloadField("zip")
+    phone = _PayloadField("phone")
+    cell = _PayloadField("cell")
+    email = _PayloadField("email")
+
+    def __init__(self, payload: Union[Dict, str, bytes, None] = None, defaults: Optional[Dict[str, str]] = None):
+        """
+        Initialize the record.
+
+        Args:
+            payload: Lead dict as returned by the API, or its JSON text
+            defaults: Values for fields missing from the payload, by attribute name
+        """
+        self._raw = payload
+        self._payload = None
+        self._defaults = defaults
+        self._first_name = None
+        self._last_name = None
+
+    @property
+    def payload(self) -> Dict:
+        """The decoded lead payload."""
+        if self._payload is None:
+            raw = self._raw
+            if isinstance(raw, (str, bytes)):
+                raw = json.loads(raw) if raw else {}
+            self._payload = raw or {}
+            self._raw = None
+        return self._payload
+
+    def _field(self, name: str, keys: tuple) -> str:
+        payload = self.payload
+        for key in keys:
+            value = payload.get(key)
+            if value not in (None, ""):
+                return str(value)
+        if self._defaults:
+            return self._defaults.get(name, "")
+        return ""
+
+    def _split_name(self):
+        first = self._field("first_name", ("firstName", "first_name"))
+        last = self._field("last_name", ("lastName", "last_name"))
+        name = self.payload.get("name")
+        if name and not (self.payload.get("firstName") or self.payload.get("lastName")):
+            parts = str(name).split(" ", 1)
+            first = parts[0]
+            last = parts[1] if len(parts) > 1 else ""
+        self._first_name = first
+        self._last_name = last
+
+    @property
+    def first_name(self) -> str:
+        if self._first_name is None:
+            self._split_name()
+        return self._first_name
+
+    @property
+    def last_name(self) -> str:
+        if self._last_name is None:
+            self._split_name()
+        return self._last_name
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}".strip()
+
+    def __repr__(self) -> str:
+        return f"LeadRecord(id={self.lead_id!r}, name={self.full_name!r})"
+
+
+class CallRecord:
+    """The lead on the line plus everything the agent captured during the call."""
+
+    __slots__ = (
+        "lead", "roof_stories", "roof_age", "roof_type", "has_insurance", "insurance_company",
+        "is_homeowner", "has_contractor", "appointment_date", "appointment_time", "notes"
+    )
+
+    def __init__(self, lead: Optional[LeadRecord] = None, **fields: str):
+        """
+        Initialize the record.
+
+        Args:
+            lead: Lead being called
+            **fields: Call fields such as roof_age or appointment_time
+        """
+        self.lead = lead or LeadRecord()
+        for name in self.__slots__[1:]:
+            setattr(self, name, fields.pop(name, ""))
+        if fields:
+            raise TypeError(f"Unknown call fields: {', '.join(sorted(fields))}")
+
+    @classmethod
+    def from_form(cls, values: Dict[str, str]) -> "CallRecord":
+        """Build a record from caller data panel values keyed by FORM_FIELDS."""
+        lead = LeadRecord({
+            "name": values.get("customer_name", "").strip(),
+            "address": values.get("address", ""),
+            "city": values.get("city", ""),
+            "state": values.get("state", ""),
+            "zip": values.get("zip", ""),
+            "phone": values.get("phone", ""),
+            "cell": values.get("cell", ""),
+            "email": values.get("email", "")
+        })
+        return cls(lead, **{
+            name: values.get(name, "")
+            for name in cls.__slots__[1:]
+            if name in values
+        })
+
+    def form_values(self) -> Dict[str, str]:
+        """Return the caller data panel values keyed by FORM_FIELDS."""
+        lead = self.lead
+        return {
+            "customer_name": lead.full_name,
+            "address": lead.address,
+            "city": lead.city,
+            "state": lead.state,
+            "zip": lead.zip,
+            "phone": lead.phone,
+            "cell": lead.cell,
+            "email": lead.email,
+            "roof_stories": self.roof_stories,
+            "roof_age": self.roof_age,
+            "roof_type": self.roof_type,
+            "has_insurance": self.has_insurance,
+            "insurance_company": self.insurance_company,
+            "is_homeowner": self.is_homeowner,
+            "has_contractor": self.has_contractor,
+            "appointment_date": self.appointment_date,
+            "appointment_time": self.appointment_time
+        }
+
+    def __repr__(self) -> str:
+        return f"CallRecord(lead={self.lead!r}, appointment={self.appointment_date!r} {self.appointment_time!r})"
@@ -0,0 +1,478 @@
+"""
+Outbox module for Storm911.
+Durable write-behind queue for ReadyMode lead and appointment mutations.
+Writes are recorded in a local SQLite database immediately and applied to
+the API by a background worker, surviving network drops and restarts.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from config import OUTBOX_CONFIG
+from api import APIError, AuthenticationError
+from resilience import RetryPolicy
+from ratelimit import background_priority
+from replica import LOCAL_ID_PREFIX
+from phone import national_number
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+FAILED = "failed"
+
+# Mutations the worker knows how to apply, mapped to ReadyModeAPI methods
+OPERATIONS = ("create_lead", "update_lead", "create_appointment", "update_appointment")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    operation TEXT NOT NULL,
+    target_id TEXT,
+    lead_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status, next_attempt_at, id);
+CREATE INDEX IF NOT EXISTS idx_outbox_lead ON outbox (lead_key, id);
+CREATE TABLE IF NOT EXISTS lead_ids (
+    lead_key TEXT PRIMARY KEY,
+    lead_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lead_ids_id ON lead_ids (lead_id);
+"""
+
+
+class Outbox:
+    """
+    SQLite-backed queue of pending API mutations.
+
+    Entries sharing a lead key are applied strictly in the order they were
+    queued: an entry is only handed out once every earlier entry for the
+    same lead has been applied. Applied entries are deleted.
+
+    A lead is keyed by its phone number for as long as that is known, so a
+    create and later updates of the same lead share a key whether the
+    update names the lead by phone, by its local placeholder id or by the
+    id ReadyMode assigned when the create was applied.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or OUTBOX_CONFIG["db_path"]
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._changed = threading.Event()
+        self._recover()
+
+    def _recover(self):
+        """Return entries left in flight by a previous run to the queue."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = ?, updated_at = ? WHERE status = ?",
+                (PENDING, time.time(), IN_FLIGHT)
+            )
+        if cursor.rowcount:
+            logger.info(f"Recovered {cursor.rowcount} outbox entries from previous run")
+
+    # ------------------------------------------------------------------
+    # Queueing
+    # ------------------------------------------------------------------
+    def enqueue(
+        self,
+        operation: str,
+        payload: Dict,
+        target_id: Optional[str] = None,
+        lead_key: Optional[str] = None
+    ) -> int:
+        """
+        Queue a mutation for background delivery.
+
+        Args:
+            operation: One of OPERATIONS
+            payload: Request body passed to the API method
+            target_id: Lead or appointment id for update operations
+            lead_key: Ordering group; defaults to the lead id or phone
+
+        Returns:
+            int: Outbox entry id
+        """
+        return self.enqueue_many([(operation, payload, target_id, lead_key)])[0]
+
+    def enqueue_many(self, entries: List[tuple]) -> List[int]:
+        """
+        Queue several mutations in one transaction.
+
+        Args:
+            entries: (operation, payload, target_id, lead_key) tuples
+
+        Returns:
+            List[int]: Outbox entry ids in input order
+        """
+        for operation, payload, target_id, lead_key in entries:
+            if operation not in OPERATIONS:
+                raise ValueError(f"Unknown outbox operation: {operation}")
+
+        now = time.time()
+        ids = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for operation, payload, target_id, lead_key in entries:
+                    cursor = self._conn.execute(
+                        "INSERT INTO outbox (operation, target_id, lead_key, payload, "
+                        "idempotency_key, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            operation,
+                            target_id,
+                            lead_key or self._lead_key(operation, payload, target_id),
+                            json.dumps(payload),
+                            uuid.uuid4().hex,
+                            now,
+                            now
+                        )
+                    )
+                    ids.append(cursor.lastrowid)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._changed.set()
+        return ids
+
+    def create_lead(self, lead_data: Dict) -> int:
+        """Queue ReadyModeAPI.create_lead."""
+        return self.enqueue("create_lead", lead_data)
+
+    def update_lead(self, lead_id: str, lead_data: Dict) -> int:
+        """Queue ReadyModeAPI.update_lead."""
+        return self.enqueue("update_lead", lead_data, target_id=str(lead_id))
+
+    def create_appointment(self, appointment_data: Dict) -> int:
+        """Queue ReadyModeAPI.create_appointment."""
+        return self.enqueue("create_appointment", appointment_data)
+
+    def update_appointment(self, appointment_id: str, appointment_data: Dict) -> int:
+        """Queue ReadyModeAPI.update_appointment."""
+        return self.enqueue("update_appointment", appointment_data, target_id=str(appointment_id))
+
+    def _lead_key(self, operation: str, payload: Dict, target_id: Optional[str]) -> str:
+        """
+        Group mutations by the lead they affect so they apply in order.
+
+        Called with the lock held. A lead id is translated back to the phone
+        key its create was queued under: local placeholder ids carry the
+        phone, and ids ReadyMode assigned are looked up in lead_ids.
+        """
+        lead_id = target_id if operation == "update_lead" else None
+        for field in ("lead_id", "leadId"):
+            if lead_id is None and payload.get(field):
+                lead_id = str(payload[field])
+        if lead_id is not None:
+            if lead_id.startswith(LOCAL_ID_PREFIX):
+                return _phone_key(lead_id[len(LOCAL_ID_PREFIX):])
+            row = self._conn.execute(
+                "SELECT lead_key FROM lead_ids WHERE lead_id = ?", (lead_id,)
+            ).fetchone()
+            return row["lead_key"] if row else f"lead:{lead_id}"
+        for field in ("phone", "cell"):
+            if payload.get(field):
+                return _phone_key(payload[field])
+        if target_id:
+            return f"{operation}:{target_id}"
+        # Unrelated to any known lead; order only against itself
+        return f"entry:{uuid.uuid4().hex}"
+
+    def remember_lead_id(self, lead_key: str, lead_id: str):
+        """Record the id ReadyMode assigned to the lead created under lead_key."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lead_ids (lead_key, lead_id) VALUES (?, ?)",
+                (lead_key, str(lead_id))
+            )
+
+    def known_phones(self, phones: Iterable[str]) -> set:
+        """Return which phone numbers have an entry queued or a create already applied."""
+        keys = {_phone_key(phone): phone for phone in phones}
+        lead_keys = list(keys)
+        found = set()
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(lead_keys), 500):
+                chunk = lead_keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(
+                    row[0] for row in self._conn.execute(
+                        f"SELECT lead_key FROM outbox WHERE lead_key IN ({placeholders}) "
+                        f"UNION SELECT lead_key FROM lead_ids WHERE lead_key IN ({placeholders})",
+                        chunk + chunk
+                    )
+                )
+        return {keys[key] for key in found}
+
+    def resolve_lead_id(self, lead_id: str, lead_key: str) -> Optional[str]:
+        """Return the ReadyMode id for lead_id, translating local placeholder ids."""
+        if not lead_id.startswith(LOCAL_ID_PREFIX):
+            return lead_id
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lead_id FROM lead_ids WHERE lead_key = ?", (lead_key,)
+            ).fetchone()
+        return row["lead_id"] if row else None
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+    def claim_batch(self, limit: int) -> List[sqlite3.Row]:
+        """
+        Mark up to limit deliverable entries in flight and return them.
+
+        An entry is deliverable when it is pending, its backoff has elapsed
+        and no earlier entry for the same lead is still outstanding.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT * FROM outbox AS o WHERE o.status = ? AND o.next_attempt_at <= ? "
+                    "AND NOT EXISTS (SELECT 1 FROM outbox AS p WHERE p.lead_key = o.lead_key AND p.id < o.id) "
+                    "ORDER BY o.id LIMIT ?",
+                    (PENDING, now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE outbox SET status = ?, updated_at = ? WHERE id = ?",
+                    [(IN_FLIGHT, now, row["id"]) for row in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def mark_done(self, entry_id: int):
+        """Remove an entry that was applied successfully."""
+        with self._lock:
+            self._conn.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+        self._changed.set()
+
+    def mark_retry(self, entry_id: int, error: str, delay: float):
+        """Return an entry to the queue to be retried after delay seconds."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, next_attempt_at = ?, "
+                "last_error = ?, updated_at = ? WHERE id = ?",
+                (PENDING, now + delay, error, now, entry_id)
+            )
+
+    def release(self, entry_id: int):
+        """Return a claimed entry to the queue untried, without counting an attempt."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (PENDING, time.time(), entry_id, IN_FLIGHT)
+            )
+
+    def mark_failed(self, entry_id: int, error: str):
+        """Park an entry that cannot be applied; later entries for its lead wait."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, last_error = ?, "
+                "updated_at = ? WHERE id = ?",
+                (FAILED, error, time.time(), entry_id)
+            )
+
+    def retry_failed(self) -> int:
+        """
+        Requeue every failed entry.
+
+        Returns:
+            int: Number of entries requeued
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = 0, next_attempt_at = 0, updated_at = ? "
+                "WHERE status = ?",
+                (PENDING, time.time(), FAILED)
+            )
+        self._changed.set()
+        return cursor.rowcount
+
+    def discard(self, entry_id: int):
+        """Drop an entry without applying it, unblocking later entries for its lead."""
+        self.mark_done(entry_id)
+
+    # ------------------------------------------------------------------
+    # Inspection
+    # ------------------------------------------------------------------
+    def counts(self) -> Dict[str, int]:
+        """Return the number of pending, in-flight and failed entries."""
+        counts = {PENDING: 0, IN_FLIGHT: 0, FAILED: 0}
+        with self._lock:
+            for status, count in self._conn.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ):
+                counts[status] = count
+        return counts
+
+    def failed_entries(self) -> List[Dict]:
+        """Return failed entries with their last error, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, operation, target_id, lead_key, attempts, last_error, created_at "
+                "FROM outbox WHERE status = ? ORDER BY id",
+                (FAILED,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def wait_for_work(self, timeout: float) -> bool:
+        """Block until something is enqueued or timeout elapses."""
+        woke = self._changed.wait(timeout)
+        self._changed.clear()
+        return woke
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class OutboxWorker(threading.Thread):
+    """Daemon thread that applies outbox entries to the ReadyMode API in batches."""
+
+    def __init__(self, outbox: Outbox, api_client, config: Optional[Dict] = None):
+        super().__init__(name="storm911-outbox", daemon=True)
+        config = config or OUTBOX_CONFIG
+        self.outbox = outbox
+        self.api_client = api_client
+        self.batch_size = config["batch_size"]
+        self.poll_interval = config["poll_interval"]
+        self.max_attempts = config["max_attempts"]
+        self.backoff = RetryPolicy()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        with background_priority():
+            self._run()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                applied = self.flush_once()
+            except Exception as e:
+                logger.error(f"Outbox flush failed: {str(e)}")
+                applied = 0
+            if not applied:
+                self.outbox.wait_for_work(self.poll_interval)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker after the current batch."""
+        self._stop_event.set()
+        self.outbox._changed.set()
+        self.join(timeout)
+
+    def flush_once(self) -> int:
+        """
+        Apply one batch of deliverable entries.
+
+        Returns:
+            int: Number of entries applied successfully
+        """
+        applied = 0
+        for row in self.outbox.claim_batch(self.batch_size):
+            if self._stop_event.is_set():
+                # Leave the rest for the next start; they were never tried
+                self.outbox.release(row["id"])
+                continue
+            if self._apply(row):
+                applied += 1
+        return applied
+
+    def _apply(self, row: sqlite3.Row) -> bool:
+        """Send one entry to the API and record the outcome."""
+        operation = row["operation"]
+        payload = json.loads(row["payload"])
+        try:
+            if operation == "create_lead":
+                response = self.api_client.create_lead(payload, idempotency_key=row["idempotency_key"])
+                lead_id = self.api_client._lead_id_of((response or {}).get("lead"))
+                if lead_id:
+                    self.outbox.remember_lead_id(row["lead_key"], lead_id)
+            elif operation == "update_lead":
+                lead_id = self.outbox.resolve_lead_id(row["target_id"], row["lead_key"])
+                if lead_id is None:
+                    raise ValueError(f"No ReadyMode id recorded for {row['target_id']}")
+                self.api_client.update_lead(lead_id, payload)
+            elif operation == "create_appointment":
+                self.api_client.create_appointment(payload, idempotency_key=row["idempotency_key"])
+            elif operation == "update_appointment":
+                self.api_client.update_appointment(row["target_id"], payload)
+        except APIError as e:
+            attempts = row["attempts"] + 1
+            # Bad credentials are fixed by logging in again, not by giving up
+            transient = e.retryable or isinstance(e, AuthenticationError)
+            if transient and attempts < self.max_attempts:
+                delay = self.backoff.next_delay(self.backoff.base_delay * (2 ** attempts))
+                self.outbox.mark_retry(row["id"], str(e), delay)
+            else:
+                logger.error(f"Outbox entry {row['id']} ({operation}) failed: {str(e)}")
+                self.outbox.mark_failed(row["id"], str(e))
+            return False
+        except Exception as e:
+            logger.error(f"Outbox entry {row['id']} ({operation}) failed: {str(e)}")
+            self.outbox.mark_failed(row["id"], str(e))
+            return False
+
+        self.outbox.mark_done(row["id"])
+        return True
+
+
+def _phone_key(phone) -> str:
+    """Ordering key of a lead known by phone, normalized as the replica and importer do."""
+    return f"phone:{national_number(str(phone))}"
+
+
+# Create singleton instances
+_outbox: Optional[Outbox] = None
+_worker: Optional[OutboxWorker] = None
+
+def get_outbox() -> Outbox:
+    """Get or create the outbox singleton."""
+    global _outbox
+
+    if _outbox is None:
+        _outbox = Outbox()
+    return _outbox
+
+def start_outbox_worker(api_client) -> OutboxWorker:
+    """Start the background worker that flushes the outbox, if not already running."""
+    global _worker
+
+    if _worker is None or not _worker.is_alive():
+        _worker = OutboxWorker(get_outbox(), api_client)
+        _worker.start()
+    return _worker
+
+def stop_outbox_worker(timeout: Optional[float] = 5.0):
+    """Stop the background worker if it is running."""
+    global _worker
+
+    if _worker is not None:
+        _worker.stop(timeout)
+        _worker = None
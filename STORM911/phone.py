@@ -0,0 +1,309 @@
+"""
+Phone number module for Storm911.
+Canonicalizes phone numbers typed or stored in any format and keeps a
+compact digit trie of known numbers for search-as-you-type.
+"""
+
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Trailing extension, e.g. "x12", "ext. 12", "#12"
+_EXTENSION = re.compile(r"\s*(?:ext\.?|extension|x|#)\s*\d+\s*$", re.IGNORECASE)
+_NON_DIGITS = re.compile(r"\D")
+
+# North American Numbering Plan: area codes never start with 0 or 1
+_NANP = re.compile(r"^[2-9]\d{9}$")
+NANP_COUNTRY_CODE = "1"
+
+
+def digits_of(text: str) -> str:
+    """Return the digits of a phone number with any extension removed."""
+    return _NON_DIGITS.sub("", _EXTENSION.sub("", text or ""))
+
+
+def national_number(phone: str) -> str:
+    """
+    Reduce a phone number to its national significant digits.
+
+    "(555) 123-4567", "+1 555 123 4567" and "1-555-123-4567 x12" all become
+    "5551234567". Partial input is reduced the same way, so the result is
+    also usable as a search prefix.
+    """
+    text = (phone or "").strip()
+    digits = digits_of(text)
+    if text.startswith("00"):
+        digits = digits[2:]
+    if digits.startswith(NANP_COUNTRY_CODE) and len(digits) <= 11:
+        # A leading 1 is the country code: NANP area codes can't start with 1
+        digits = digits[1:]
+    return digits
+
+
+def to_e164(phone: str) -> Optional[str]:
+    """
+    Return the E.164 form of a phone number, e.g. "+15551234567".
+
+    Numbers without a country code are assumed to be North American.
+
+    Returns:
+        Optional[str]: Canonical number, or None if it isn't a valid number
+    """
+    text = (phone or "").strip()
+    digits = digits_of(text)
+    international = text.startswith(("+", "00"))
+    if text.startswith("00"):
+        digits = digits[2:]
+
+    if not international or digits.startswith(NANP_COUNTRY_CODE):
+        national = national_number(text)
+        if _NANP.match(national):
+            return f"+{NANP_COUNTRY_CODE}{national}"
+        return None
+    if 8 <= len(digits) <= 15:
+        return f"+{digits}"
+    return None
+
+
+def is_valid(phone: str) -> bool:
+    """Whether phone is a complete, dialable number."""
+    return to_e164(phone) is not None
+
+
+def format_display(phone: str) -> str:
+    """Format a number for display, e.g. "(555) 123-4567"; invalid input is returned unchanged."""
+    canonical = to_e164(phone)
+    if canonical is None:
+        return phone
+    if canonical.startswith(f"+{NANP_COUNTRY_CODE}") and len(canonical) == 12:
+        national = canonical[2:]
+        return f"({national[:3]}) {national[3:6]}-{national[6:]}"
+    return canonical
+
+
+class _TrieNode:
+    """Radix trie node; each edge carries a run of digits."""
+
+    __slots__ = ("edges", "value", "has_value")
+
+    def __init__(self):
+        # first digit of the edge label -> (label, child)
+        self.edges: Dict[str, Tuple[str, "_TrieNode"]] = {}
+        self.value: Any = None
+        self.has_value = False
+
+
+class PhoneTrie:
+    """
+    Path-compressed digit trie mapping phone numbers to values.
+
+    Runs of digits without branches share one edge, so a large book of
+    numbers with common area codes costs little more than the numbers
+    themselves. Thread-safe.
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._lock = threading.Lock()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, number: str, value: Any = None):
+        """Add or replace number; number must be digits only."""
+        if not number or not number.isdigit():
+            raise ValueError(f"Trie keys must be digits: {number!r}")
+        with self._lock:
+            node = self._root
+            rest = number
+            while rest:
+                edge = node.edges.get(rest[0])
+                if edge is None:
+                    child = _TrieNode()
+                    node.edges[rest[0]] = (rest, child)
+                    node = child
+                    rest = ""
+                    break
+                label, child = edge
+                common = self._common_length(label, rest)
+                if common < len(label):
+                    # Split the edge where the new number diverges
+                    middle = _TrieNode()
+                    middle.edges[label[common]] = (label[common:], child)
+                    node.edges[rest[0]] = (label[:common], middle)
+                    child = middle
+                node = child
+                rest = rest[common:]
+            if not node.has_value:
+                self._size += 1
+            node.value = value
+            node.has_value = True
+
+    def remove(self, number: str) -> bool:
+        """
+        Remove number, merging edges left without a branch.
+
+        Returns:
+            bool: Whether number was present
+        """
+        with self._lock:
+            path = []  # (parent, first digit of the edge taken)
+            node = self._root
+            rest = number
+            while rest:
+                edge = node.edges.get(rest[0])
+                if edge is None or not rest.startswith(edge[0]):
+                    return False
+                path.append((node, rest[0]))
+                rest = rest[len(edge[0]):]
+                node = edge[1]
+            if not path or not node.has_value:
+                return False
+            node.value = None
+            node.has_value = False
+            self._size -= 1
+
+            parent, first = path.pop()
+            if not node.edges:
+                del parent.edges[first]
+                node = parent
+                if not path:
+                    return True
+                parent, first = path.pop()
+            self._merge(parent, first, node)
+            return True
+
+    @staticmethod
+    def _merge(parent: _TrieNode, first: str, node: _TrieNode):
+        """Fold node into its parent edge if it holds no value and has a single child."""
+        if node.has_value or len(node.edges) != 1:
+            return
+        label, _ = parent.edges[first]
+        (child_label, child), = node.edges.values()
+        parent.edges[first] = (label + child_label, child)
+
+    def get(self, number: str, default: Any = None) -> Any:
+        """Return the value stored for an exact number."""
+        with self._lock:
+            node, remainder = self._descend(number)
+            if node is None or remainder or not node.has_value:
+                return default
+            return node.value
+
+    def search(self, prefix: str, limit: int = 10) -> List[Tuple[str, Any]]:
+        """
+        Return up to limit (number, value) pairs starting with prefix, in numeric order.
+
+        Args:
+            prefix: Leading digits
+            limit: Maximum number of matches
+
+        Returns:
+            List[Tuple[str, Any]]: Matching numbers and their values
+        """
+        results: List[Tuple[str, Any]] = []
+        with self._lock:
+            node, remainder = self._descend(prefix)
+            if node is None:
+                return results
+            # remainder is the part of the final edge label beyond the prefix
+            stack = [(prefix + remainder, node)]
+            while stack and len(results) < limit:
+                number, current = stack.pop()
+                if current.has_value:
+                    results.append((number, current.value))
+                for first in sorted(current.edges, reverse=True):
+                    label, child = current.edges[first]
+                    stack.append((number + label, child))
+        return results
+
+    def _descend(self, prefix: str):
+        """
+        Walk down the trie along prefix.
+
+        Returns (node, remainder), where remainder is the unconsumed tail of
+        the last edge if prefix ends inside it, or (None, "") without a match.
+        """
+        node = self._root
+        rest = prefix
+        while rest:
+            edge = node.edges.get(rest[0])
+            if edge is None:
+                return None, ""
+            label, child = edge
+            if rest.startswith(label):
+                rest = rest[len(label):]
+                node = child
+            elif label.startswith(rest):
+                return child, label[len(rest):]
+            else:
+                return None, ""
+        return node, ""
+
+    @staticmethod
+    def _common_length(a: str, b: str) -> int:
+        length = min(len(a), len(b))
+        for index in range(length):
+            if a[index] != b[index]:
+                return index
+        return length
+
+
+class PhoneIndex:
+    """
+    Search-as-you-type index over known leads and recently called numbers.
+
+    Numbers are keyed by their national digits; called numbers are ranked
+    ahead of other leads with the same prefix.
+    """
+
+    def __init__(self):
+        self._leads = PhoneTrie()
+        self._history = PhoneTrie()
+
+    def add_lead(self, phone: str, label: str = ""):
+        """Index a lead's phone number with a display label such as the customer name."""
+        number = national_number(phone)
+        if number:
+            self._leads.insert(number, label)
+
+    def add_leads(self, leads: Iterable[Dict]):
+        """Index lead payloads by their phone and cell numbers."""
+        for lead in leads:
+            label = f"{lead.get('firstName', '')} {lead.get('lastName', '')}".strip()
+            for field in ("phone", "cell"):
+                if lead.get(field):
+                    self.add_lead(str(lead[field]), label)
+
+    def add_call(self, phone: str, label: str = ""):
+        """Record a number from call history."""
+        number = national_number(phone)
+        if number:
+            self._history.insert(number, label or self._leads.get(number, ""))
+
+    def suggest(self, text: str, limit: int = 8) -> List[Tuple[str, str]]:
+        """
+        Return up to limit (number, label) matches for partially typed input.
+
+        Args:
+            text: What the agent has typed so far, in any format
+            limit: Maximum number of suggestions
+
+        Returns:
+            List[Tuple[str, str]]: National numbers and labels, call history first
+        """
+        prefix = national_number(text)
+        if not prefix:
+            return []
+        matches = self._history.search(prefix, limit)
+        seen = {number for number, _ in matches}
+        for number, label in self._leads.search(prefix, limit + len(seen)):
+            if len(matches) >= limit:
+                break
+            if number not in seen:
+                matches.append((number, label))
+        return matches
+
+    def __len__(self) -> int:
+        return len(self._leads) + len(self._history)
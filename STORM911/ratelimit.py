@@ -0,0 +1,278 @@
+"""
+Rate limiting module for Storm911.
+Client-side token buckets with two priority classes so interactive GUI
+lookups never queue behind bulk or outbox traffic.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from config import RATE_LIMIT_CONFIG
+from metrics import LatencyHistogram, get_registry
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+# Bucket for creates, which the server meters against a quota of their own
+CREATE = "create"
+
+_context = threading.local()
+
+def current_priority() -> str:
+    """Priority class of API calls made from the current thread."""
+    return getattr(_context, "priority", INTERACTIVE)
+
+@contextmanager
+def priority(value: str):
+    """
+    Run the enclosed API calls under the given priority class.
+
+    Example:
+        with priority(BACKGROUND):
+            api.search_lead(phone)
+    """
+    if value not in PRIORITIES:
+        raise ValueError(f"Unknown priority class: {value}")
+    previous = current_priority()
+    _context.priority = value
+    try:
+        yield
+    finally:
+        _context.priority = previous
+
+def background_priority():
+    """Shorthand for priority(BACKGROUND)."""
+    return priority(BACKGROUND)
+
+def is_exempt() -> bool:
+    """Whether API calls from the current thread skip the rate limiter."""
+    return getattr(_context, "exempt", False)
+
+@contextmanager
+def exempt(value: bool = True):
+    """
+    Run the enclosed API calls without client-side rate limiting (or, with
+    value False, with it as usual).
+
+    For callers that know the server allows more, e.g. an account with a
+    raised quota or the fake server; the limiter's quota no longer
+    protects them from being throttled by ReadyMode.
+    """
+    previous = is_exempt()
+    _context.exempt = value
+    try:
+        yield
+    finally:
+        _context.exempt = previous
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a token could not be obtained within the requested timeout."""
+    pass
+
+
+class TokenBucket:
+    """Classic token bucket; not thread-safe on its own."""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self, now: float) -> bool:
+        """Take one token if available."""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until_token(self, now: float) -> float:
+        """Seconds until one token will be available."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class PriorityRateLimiter:
+    """
+    Two-class rate limiter in front of API requests.
+
+    Each class draws from its own token bucket. Background callers also
+    stand aside whenever an interactive caller is waiting, so interactive
+    work always goes first. If the config has a "create" bucket, creates of
+    either class draw from it instead, since they count against a separate
+    server quota.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or RATE_LIMIT_CONFIG
+        self.enabled = config["enabled"]
+        self._buckets = {
+            name: TokenBucket(config[name]["rate"], config[name]["burst"])
+            for name in PRIORITIES + (CREATE,)
+            if name in config
+        }
+        self._cond = threading.Condition()
+        self._waiting = {name: 0 for name in PRIORITIES}
+        self._max_waiting = {name: 0 for name in PRIORITIES}
+        self._acquired = {name: 0 for name in PRIORITIES}
+        self._wait_times = {name: LatencyHistogram() for name in PRIORITIES}
+        self.metrics = get_registry()
+
+    def _bucket(self, priority_class: str, create: bool) -> TokenBucket:
+        if create and CREATE in self._buckets:
+            return self._buckets[CREATE]
+        return self._buckets[priority_class]
+
+    def acquire(
+        self,
+        priority_class: Optional[str] = None,
+        timeout: Optional[float] = None,
+        create: bool = False
+    ) -> float:
+        """
+        Block until a request of the given class may be sent.
+
+        Args:
+            priority_class: INTERACTIVE or BACKGROUND; defaults to the thread's priority
+            timeout: Give up after this many seconds
+            create: The request creates a record; draws from the create bucket
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        priority_class = priority_class or current_priority()
+        if not self.enabled or is_exempt():
+            return 0.0
+
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        bucket = self._bucket(priority_class, create)
+
+        with self._cond:
+            self._waiting[priority_class] += 1
+            self._max_waiting[priority_class] = max(
+                self._max_waiting[priority_class], self._waiting[priority_class]
+            )
+            try:
+                while True:
+                    now = time.monotonic()
+                    yielding = priority_class == BACKGROUND and self._waiting[INTERACTIVE] > 0
+                    if not yielding and bucket.try_take(now):
+                        break
+                    wait = bucket.time_until_token(now) if not yielding else None
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            raise RateLimitTimeout(f"No {priority_class} API capacity within {timeout}s")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[priority_class] -= 1
+                # Background waiters may have been yielding to this caller
+                self._cond.notify_all()
+
+            waited = time.monotonic() - started
+            self._acquired[priority_class] += 1
+            self._wait_times[priority_class].record(waited)
+
+        self.metrics.observe(f"ratelimit.{priority_class}.wait", waited)
+        return waited
+
+    async def acquire_async(
+        self,
+        priority_class: str = BACKGROUND,
+        poll_interval: float = 0.05,
+        create: bool = False
+    ) -> float:
+        """
+        Wait on the event loop until a request of the given class may be sent.
+
+        The wait is an asyncio.sleep, so no thread is parked per waiting
+        request, and a token is only taken once the wait is over: a caller
+        cancelled while waiting consumes nothing.
+
+        Args:
+            priority_class: INTERACTIVE or BACKGROUND
+            poll_interval: Seconds between checks while yielding to interactive callers
+            create: The request creates a record; draws from the create bucket
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if not self.enabled:
+            return 0.0
+
+        started = time.monotonic()
+        bucket = self._bucket(priority_class, create)
+        with self._cond:
+            self._waiting[priority_class] += 1
+            self._max_waiting[priority_class] = max(
+                self._max_waiting[priority_class], self._waiting[priority_class]
+            )
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    yielding = priority_class == BACKGROUND and self._waiting[INTERACTIVE] > 0
+                    if not yielding and bucket.try_take(now):
+                        break
+                    wait = poll_interval if yielding else bucket.time_until_token(now)
+                await asyncio.sleep(wait)
+        finally:
+            with self._cond:
+                self._waiting[priority_class] -= 1
+                self._cond.notify_all()
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._acquired[priority_class] += 1
+            self._wait_times[priority_class].record(waited)
+        self.metrics.observe(f"ratelimit.{priority_class}.wait", waited)
+        return waited
+
+    def stats(self) -> Dict[str, Dict]:
+        """Return queue depth, acquisitions and wait-time percentiles per class."""
+        with self._cond:
+            return {
+                name: {
+                    "queue_depth": self._waiting[name],
+                    "max_queue_depth": self._max_waiting[name],
+                    "acquired": self._acquired[name],
+                    "wait": self._wait_times[name].summary()
+                }
+                for name in PRIORITIES
+            }
+
+
+_limiter: Optional[PriorityRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> PriorityRateLimiter:
+    """Get or create the rate limiter shared by all API clients."""
+    global _limiter
+
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = PriorityRateLimiter()
+        return _limiter
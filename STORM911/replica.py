@@ -0,0 +1,434 @@
+"""
+Lead replica module for Storm911.
+Local SQLite copy of ReadyMode leads, indexed by phone, id and zip, kept
+current by a background delta sync so lead searches rarely leave the
+machine.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from config import REPLICA_CONFIG
+from api import _LEAD_PHONE_FIELDS, ReadyModeAPI, normalize_phone
+from ratelimit import background_priority
+
+logger = logging.getLogger(__name__)
+
+# Lead payload field carrying the server-side change counter
+_UPDATED_FIELD = "updated_at"
+# Id prefix of leads stored locally before ReadyMode has assigned an id
+LOCAL_ID_PREFIX = "local:"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id TEXT PRIMARY KEY,
+    phone TEXT,
+    zip TEXT,
+    updated_at INTEGER NOT NULL DEFAULT 0,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leads_phone ON leads (phone);
+CREATE INDEX IF NOT EXISTS idx_leads_zip ON leads (zip);
+CREATE TABLE IF NOT EXISTS lead_phones (
+    phone TEXT NOT NULL,
+    lead_id TEXT NOT NULL,
+    PRIMARY KEY (phone, lead_id)
+);
+CREATE INDEX IF NOT EXISTS idx_lead_phones_id ON lead_phones (lead_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class LeadReplica:
+    """
+    SQLite-backed local copy of ReadyMode leads.
+
+    Lookups only answer while the last completed sync is younger than
+    max_staleness seconds; a stale replica reports a miss so callers fall
+    back to the API. Every phone field of a lead is indexed, and local
+    placeholders (imported leads ReadyMode has not assigned an id yet)
+    are never returned by lookups.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_staleness: Optional[float] = None):
+        self.db_path = db_path or REPLICA_CONFIG["db_path"]
+        self.max_staleness = REPLICA_CONFIG["max_staleness"] if max_staleness is None else max_staleness
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._index_phones()
+
+        # Sync cursor: (updated_at, id) of the last lead pulled
+        self.watermark = int(self._get_state("watermark") or 0)
+        self.watermark_id = self._get_state("watermark_id") or ""
+        self.last_sync_at = float(self._get_state("last_sync_at") or 0)
+        self.hits = 0
+        self.misses = 0
+        self.stale_reads = 0
+
+    def _index_phones(self):
+        """Fill lead_phones for databases created before it existed."""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM lead_phones LIMIT 1").fetchone() is None:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO lead_phones (phone, lead_id) "
+                    "SELECT phone, id FROM leads WHERE phone IS NOT NULL"
+                )
+
+    def _get_state(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def age(self) -> Optional[float]:
+        """Seconds since the last completed sync, or None if never synced."""
+        return time.time() - self.last_sync_at if self.last_sync_at else None
+
+    def is_fresh(self) -> bool:
+        """Whether the replica is recent enough to answer lookups."""
+        age = self.age()
+        return age is not None and age <= self.max_staleness
+
+    def find_by_phone(self, phone: str) -> Optional[Dict]:
+        """
+        Return the lead with this phone number.
+
+        Args:
+            phone: Phone number in any format
+
+        Returns:
+            Optional[Dict]: Lead payload, or None if absent or the replica is stale
+        """
+        key = normalize_phone(phone)
+        if not key:
+            return None
+        return self._lookup(
+            "SELECT l.payload FROM lead_phones AS p JOIN leads AS l ON l.id = p.lead_id "
+            "WHERE p.phone = ? AND l.id NOT LIKE ? ORDER BY l.updated_at DESC LIMIT 1",
+            key
+        )
+
+    def get(self, lead_id: str) -> Optional[Dict]:
+        """Return the lead with this id, or None if absent or the replica is stale."""
+        return self._lookup("SELECT payload FROM leads WHERE id = ? AND id NOT LIKE ?", str(lead_id))
+
+    def _lookup(self, query: str, value: str) -> Optional[Dict]:
+        fresh = self.is_fresh()
+        with self._lock:
+            if not fresh:
+                self.stale_reads += 1
+                return None
+            row = self._conn.execute(query, (value, f"{LOCAL_ID_PREFIX}%")).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def existing_phones(self, phones: Iterable[str]) -> set:
+        """Return which of the given normalized phone numbers are already stored."""
+        phones = list(phones)
+        found = set()
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(phones), 500):
+                chunk = phones[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(
+                    row[0] for row in self._conn.execute(
+                        f"SELECT phone FROM lead_phones WHERE phone IN ({placeholders})", chunk
+                    )
+                )
+        return found
+
+    def placeholders(self, phones: Iterable[str]) -> List[Dict]:
+        """Return the local placeholder leads stored for the given normalized phone numbers."""
+        ids = [f"{LOCAL_ID_PREFIX}{phone}" for phone in phones]
+        leads = []
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                leads.extend(
+                    json.loads(row[0]) for row in self._conn.execute(
+                        f"SELECT payload FROM leads WHERE id IN ({placeholders})", chunk
+                    )
+                )
+        return leads
+
+    def find_by_zip(self, zip_code: str, limit: int = 500) -> List[Dict]:
+        """Return leads in a zip code, most recently changed first (ignores staleness)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM leads WHERE zip = ? ORDER BY updated_at DESC LIMIT ?",
+                (str(zip_code).strip()[:5], limit)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_leads(self, batch_size: int = 1000) -> Iterator[Dict]:
+        """Yield every stored lead, reading batch_size rows at a time (ignores staleness)."""
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, payload FROM leads WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            for _, payload in rows:
+                yield json.loads(payload)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def upsert_many(self, leads: Iterable[Dict]) -> int:
+        """
+        Insert or replace leads in one transaction.
+
+        Args:
+            leads: Lead payloads; entries without an id are skipped
+
+        Returns:
+            int: Number of leads written
+        """
+        rows = []
+        phones = []
+        for lead in leads:
+            lead_id = ReadyModeAPI._lead_id_of(lead)
+            if not lead_id:
+                continue
+            lead_phones = []
+            for field in _LEAD_PHONE_FIELDS:
+                phone = normalize_phone(str(lead[field])) if lead.get(field) else None
+                if phone and phone not in lead_phones:
+                    lead_phones.append(phone)
+            phones.append((lead_id, lead_phones, int(lead.get(_UPDATED_FIELD) or 0)))
+            rows.append((
+                lead_id,
+                lead_phones[0] if lead_phones else None,
+                str(lead.get("zip") or "").strip()[:5] or None,
+                int(lead.get(_UPDATED_FIELD) or 0),
+                json.dumps(lead)
+            ))
+        if not rows:
+            return 0
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Never let an older copy overwrite a newer one
+                self._conn.executemany(
+                    "INSERT INTO leads (id, phone, zip, updated_at, payload) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET phone = excluded.phone, zip = excluded.zip, "
+                    "updated_at = excluded.updated_at, payload = excluded.payload "
+                    "WHERE excluded.updated_at >= leads.updated_at",
+                    rows
+                )
+                # Re-index phones only for leads whose copy was just written
+                current = "EXISTS (SELECT 1 FROM leads WHERE id = ?1 AND updated_at = ?2)"
+                self._conn.executemany(
+                    f"DELETE FROM lead_phones WHERE lead_id = ?1 AND {current}",
+                    [(lead_id, updated_at) for lead_id, _, updated_at in phones]
+                )
+                self._conn.executemany(
+                    f"INSERT OR IGNORE INTO lead_phones (phone, lead_id) SELECT ?3, ?1 WHERE {current}",
+                    [
+                        (lead_id, updated_at, phone)
+                        for lead_id, lead_phones, updated_at in phones
+                        for phone in lead_phones
+                    ]
+                )
+                # A lead ReadyMode now knows replaces its local placeholder
+                placeholders = [
+                    (phone, f"{LOCAL_ID_PREFIX}%")
+                    for lead_id, lead_phones, _ in phones
+                    if not lead_id.startswith(LOCAL_ID_PREFIX)
+                    for phone in lead_phones
+                ]
+                self._conn.executemany(
+                    "DELETE FROM leads WHERE id LIKE ?2 AND id IN "
+                    "(SELECT lead_id FROM lead_phones WHERE phone = ?1)",
+                    placeholders
+                )
+                self._conn.executemany(
+                    "DELETE FROM lead_phones WHERE phone = ?1 AND lead_id LIKE ?2",
+                    placeholders
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def discard(self, lead_id: str):
+        """Drop a lead so the next lookup goes to the API."""
+        with self._lock:
+            self._conn.execute("DELETE FROM leads WHERE id = ?", (str(lead_id),))
+            self._conn.execute("DELETE FROM lead_phones WHERE lead_id = ?", (str(lead_id),))
+
+    def mark_synced(self, watermark: int, watermark_id: str = ""):
+        """Record a completed sync up to the (watermark, watermark_id) cursor."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                [("watermark", str(watermark)), ("watermark_id", watermark_id), ("last_sync_at", str(now))]
+            )
+        self.watermark = watermark
+        self.watermark_id = watermark_id
+        self.last_sync_at = now
+
+    def count(self) -> int:
+        """Return the number of leads held locally."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+    def stats(self) -> Dict:
+        """Return size, watermark, age and hit counters."""
+        age = self.age()
+        return {
+            "leads": self.count(),
+            "watermark": self.watermark,
+            "age_s": round(age, 1) if age is not None else None,
+            "fresh": self.is_fresh(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_reads": self.stale_reads
+        }
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class ReplicaSync(threading.Thread):
+    """Daemon thread that pulls lead changes into a LeadReplica."""
+
+    def __init__(self, replica: LeadReplica, api_client, config: Optional[Dict] = None):
+        super().__init__(name="storm911-replica", daemon=True)
+        config = config or REPLICA_CONFIG
+        self.replica = replica
+        self.api_client = api_client
+        self.interval = config["sync_interval"]
+        self.page_size = config["page_size"]
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._listeners: List[Callable[[List[Dict]], None]] = []
+
+    def run(self):
+        with background_priority():
+            self._run()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                logger.error(f"Lead replica sync failed: {str(e)}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def add_listener(self, callback: Callable[[List[Dict]], None]):
+        """Call callback with each page of changed leads; it runs on the sync thread."""
+        self._listeners.append(callback)
+
+    def sync_now(self):
+        """Run a sync as soon as possible instead of waiting for the interval."""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker after the current page."""
+        self._stop_event.set()
+        self._wake.set()
+        self.join(timeout)
+
+    def sync_once(self) -> int:
+        """
+        Pull every lead changed since the watermark.
+
+        Pages are requested by the (updated_at, id) of the last lead seen,
+        so leads sharing an updated_at across a page boundary are not
+        skipped. A full page that does not move the cursor ends the sync
+        unmarked, leaving the replica to go stale rather than loop.
+
+        Returns:
+            int: Number of leads written to the replica
+        """
+        cursor = (self.replica.watermark, self.replica.watermark_id)
+        written = 0
+        while not self._stop_event.is_set():
+            response = self.api_client.list_leads(
+                updated_since=cursor[0], limit=self.page_size, after_id=cursor[1]
+            )
+            leads = response.get("leads") or []
+            written += self.replica.upsert_many(leads)
+            for callback in self._listeners:
+                try:
+                    callback(leads)
+                except Exception as e:
+                    logger.error(f"Lead replica listener failed: {str(e)}")
+            next_cursor = max([cursor] + [
+                (int(lead.get(_UPDATED_FIELD) or 0), ReadyModeAPI._lead_id_of(lead) or "")
+                for lead in leads
+            ])
+            if len(leads) < self.page_size:
+                self.replica.mark_synced(*next_cursor)
+                cursor = next_cursor
+                break
+            if next_cursor <= cursor:
+                logger.warning(f"Lead replica sync made no progress past {cursor}; stopping")
+                break
+            cursor = next_cursor
+        if written:
+            logger.info(f"Lead replica synced {written} changes (watermark {cursor[0]})")
+        return written
+
+
+# Create singleton instances
+_replica: Optional[LeadReplica] = None
+_sync: Optional[ReplicaSync] = None
+
+def get_replica() -> LeadReplica:
+    """Get or create the lead replica singleton."""
+    global _replica
+
+    if _replica is None:
+        _replica = LeadReplica()
+    return _replica
+
+def start_replica_sync(api_client) -> Optional[ReplicaSync]:
+    """Attach the replica to api_client and start syncing it, if enabled in REPLICA_CONFIG."""
+    global _sync
+
+    if not REPLICA_CONFIG["enabled"]:
+        return None
+    api_client.replica = get_replica()
+    if _sync is None or not _sync.is_alive():
+        _sync = ReplicaSync(get_replica(), api_client)
+        _sync.start()
+    return _sync
+
+def stop_replica_sync(timeout: Optional[float] = 5.0):
+    """Stop the background sync if it is running."""
+    global _sync
+
+    if _sync is not None:
+        _sync.stop(timeout)
+        _sync = None
@@ -0,0 +1,163 @@
+"""
+Resilience module for Storm911.
+Retry policy with decorrelated-jitter backoff and a circuit breaker for
+the API clients.
+"""
+
+import time
+import random
+import logging
+import threading
+from typing import Dict, Optional
+
+from config import RETRY_CONFIG, CIRCUIT_BREAKER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# HTTP methods that are safe to repeat without an idempotency key
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class RetryPolicy:
+    """
+    Decides how many attempts a request gets and how long to wait between them.
+
+    Attempt budgets are looked up per endpoint by longest matching prefix.
+    Non-idempotent methods (POST, PATCH) only get retries when the caller
+    supplies an idempotency key.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or RETRY_CONFIG
+        self.max_attempts = config["max_attempts"]
+        self.base_delay = config["base_delay"]
+        self.max_delay = config["max_delay"]
+        self.retry_statuses = frozenset(config["retry_statuses"])
+        # Longest prefixes first so the most specific budget wins
+        self.endpoint_budgets = sorted(
+            config.get("endpoint_budgets", {}).items(),
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
+
+    def attempts_for(self, method: str, endpoint: str, idempotency_key: Optional[str] = None) -> int:
+        """
+        Return the total number of attempts allowed for a request.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            idempotency_key: Key that makes a non-idempotent request safe to repeat
+
+        Returns:
+            int: Attempt budget, at least 1
+        """
+        if method.upper() not in IDEMPOTENT_METHODS and not idempotency_key:
+            return 1
+        for prefix, budget in self.endpoint_budgets:
+            if endpoint.startswith(prefix):
+                return max(1, budget)
+        return max(1, self.max_attempts)
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        """Whether a response status is worth retrying."""
+        return status_code in self.retry_statuses
+
+    def next_delay(self, previous_delay: Optional[float]) -> float:
+        """
+        Compute the next backoff using decorrelated jitter.
+
+        Each delay is drawn uniformly between the base delay and three times
+        the previous delay, capped at max_delay.
+
+        Args:
+            previous_delay: The delay used before the last attempt, if any
+
+        Returns:
+            float: Seconds to sleep before the next attempt
+        """
+        upper = max(self.base_delay, (previous_delay or self.base_delay) * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+
+class CircuitBreaker:
+    """
+    Three-state circuit breaker.
+
+    CLOSED: calls flow normally; consecutive failures are counted.
+    OPEN: calls fail immediately until recovery_timeout has elapsed.
+    HALF_OPEN: a limited number of probe calls are let through; a success
+    closes the circuit and a failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, config: Optional[Dict] = None):
+        config = config or CIRCUIT_BREAKER_CONFIG
+        self.name = name
+        self.failure_threshold = config["failure_threshold"]
+        self.recovery_timeout = config["recovery_timeout"]
+        self.half_open_max_calls = config["half_open_max_calls"]
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, promoting OPEN to HALF_OPEN once the timeout has passed."""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Ask permission to send a request.
+
+        Returns:
+            bool: False if the circuit is open and the call should fail fast
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit will let a probe through."""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+
+    def record_success(self):
+        """Record a successful call."""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit {self.name} closed; service recovered")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def record_failure(self):
+        """Record a failed call, opening the circuit if the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit {self.name} opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probes = 0
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
@@ -9,6 +9,7 @@ import sys
 import logging
 from app import run_app
 from config import LOGGING_CONFIG, LOGS_DIR
+from metrics import start_periodic_dump
 
 def setup_logging():
     """Configure logging for the application."""
@@ -28,6 +29,9 @@ def main():
         # Setup logging
         setup_logging()
         
+        # Periodically dump API metrics to the logs directory
+        start_periodic_dump()
+        
         # Run the application
         run_app()
         
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Call script compiler for Storm911.
+Converts the HTML-flavoured script and objection content to display text
+once, so turning a script page is a tuple lookup plus one textbox insert.
+
+Usage:
+    python script_compiler.py --bench 10000
+"""
+
+import re
+import time
+import argparse
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+# Applied in order; list items become dashed lines, any other tag is dropped
+_REPLACEMENTS = (("<br>", "\n"), ("<li>", " - "), ("</li>", "\n"))
+_TAG = re.compile(r"<[^>]+>")
+
+
+def html_to_text(html: str) -> str:
+    """Convert script HTML to the plain text shown in the textboxes."""
+    for old, new in _REPLACEMENTS:
+        html = html.replace(old, new)
+    return _TAG.sub("", html)
+
+
+def compile_page(page: Dict) -> str:
+    """Return the complete textbox contents for a script page: title, blank line, body."""
+    text = html_to_text(page["content_html"])
+    if page.get("title"):
+        return f"{page['title']}\n\n{text}"
+    return text
+
+
+def compile_pages(pages: Iterable[Dict]) -> Tuple[str, ...]:
+    """Compile every page, keeping the script's page order."""
+    return tuple(compile_page(page) for page in pages)
+
+
+# Create singleton instances
+_script: Optional[Tuple[str, ...]] = None
+_script_lock = threading.Lock()
+
+def get_compiled_script() -> Tuple[str, ...]:
+    """Get FULL_SCRIPT_PAGES compiled to display text, compiling on first use."""
+    global _script
+
+    with _script_lock:
+        if _script is None:
+            from transcript_pages import FULL_SCRIPT_PAGES
+            _script = compile_pages(FULL_SCRIPT_PAGES)
+        return _script
+
+
+def _render_legacy(page: Dict) -> str:
+    """The per-flip conversion display_script_page used to run, for comparison."""
+    text = page["title"] + "\n\n" if page["title"] else ""
+    content_txt = page["content_html"].replace("<br>", "\n").replace("<li>", " - ").replace("</li>", "\n")
+    return text + re.sub(r"<[^>]+>", "", content_txt)
+
+
+def run_benchmark(flips: int, textbox=None) -> Dict[str, Dict[str, float]]:
+    """
+    Time page flips through the whole script with and without precompiling.
+
+    Args:
+        flips: Number of page flips per variant
+        textbox: Optional Tk text widget to render into, to include the insert
+
+    Returns:
+        Dict[str, Dict[str, float]]: Mean and total microseconds per variant
+    """
+    from transcript_pages import FULL_SCRIPT_PAGES
+    from metrics import LatencyHistogram
+
+    started = time.perf_counter()
+    compiled = compile_pages(FULL_SCRIPT_PAGES)
+    compile_us = (time.perf_counter() - started) * 1e6
+
+    def show(text: str):
+        if textbox is not None:
+            textbox.delete("1.0", "end")
+            textbox.insert("end", text)
+            textbox.update_idletasks()
+
+    variants = {
+        "legacy": lambda index: show(_render_legacy(FULL_SCRIPT_PAGES[index])),
+        "compiled": lambda index: show(compiled[index])
+    }
+    results = {}
+    for name, flip in variants.items():
+        histogram = LatencyHistogram(min_ms=0.0005)
+        pages = len(FULL_SCRIPT_PAGES)
+        for count in range(flips):
+            flip_started = time.perf_counter()
+            flip(count % pages)
+            histogram.record(time.perf_counter() - flip_started)
+        results[name] = {
+            "mean_us": round(histogram.total_ms / histogram.count * 1000, 2),
+            "p99_us": round(histogram.percentile(99) * 1000, 2)
+        }
+    results["compile"] = {"total_us": round(compile_us, 1), "pages": len(compiled)}
+    return results
+
+
+def main():
+    """Verify the compiled script matches the legacy rendering and benchmark page flips."""
+    parser = argparse.ArgumentParser(description="Compile the Storm911 call script and time page flips")
+    parser.add_argument("--bench", type=int, default=10000, help="page flips per variant")
+    parser.add_argument("--tk", action="store_true", help="also insert into a Tk text widget (needs a display)")
+    args = parser.parse_args()
+
+    from transcript_pages import FULL_SCRIPT_PAGES
+    mismatches = [
+        index for index, page in enumerate(FULL_SCRIPT_PAGES)
+        if compile_page(page) != _render_legacy(page)
+    ]
+    if mismatches:
+        raise SystemExit(f"Compiled pages differ from the legacy rendering: {mismatches}")
+
+    textbox = None
+    if args.tk:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        textbox = tk.Text(root, wrap="word")
+
+    for name, stats in run_benchmark(args.bench, textbox).items():
+        print(f"{name:<9} " + "  ".join(f"{key} {value}" for key, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Request coalescing module for Storm911.
+Collapses concurrent identical calls into a single execution.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    In-flight deduplication of identical calls.
+
+    The first caller for a key runs the function; callers that arrive with
+    the same key while it is still running block on the same future and
+    receive the same result (or exception). Results are shared objects, so
+    callers must not mutate them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.executed = 0
+        self.saved = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) unless an identical call is already running.
+
+        Args:
+            key: Hashable identity of the call
+            fn: Callable to execute if no call with this key is in flight
+
+        Returns:
+            Any: The result of the (possibly shared) call
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.executed += 1
+            else:
+                self.saved += 1
+
+        if not leader:
+            logger.debug(f"Coalesced duplicate request: {key[:2] if isinstance(key, tuple) else key}")
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many calls ran and how many were saved by coalescing."""
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "saved": self.saved,
+                "in_flight": len(self._calls)
+            }
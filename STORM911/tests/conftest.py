@@ -0,0 +1,61 @@
+"""Shared fixtures for the Storm911 tests."""
+
+import os
+import sys
+
+import pytest
+
+# The modules live flat in STORM911/ and import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import ReadyModeAPI
+from cache import ResponseCache
+from config import RATE_LIMIT_CONFIG
+from ratelimit import PriorityRateLimiter
+from fake_readymode import FakeReadyModeServer
+
+
+@pytest.fixture
+def fake_server():
+    """A fake ReadyMode server with a small dataset."""
+    with FakeReadyModeServer(leads=20, seed=1) as server:
+        yield server
+
+
+@pytest.fixture
+def api_client(fake_server, tmp_path):
+    """A ReadyModeAPI client pointed at the fake server, with a private cache and no quotas."""
+    client = ReadyModeAPI(
+        "demo",
+        "demo",
+        base_url=fake_server.base_url,
+        lead_cache=ResponseCache("lead_search", cache_dir=str(tmp_path / "cache"))
+    )
+    client.rate_limiter = PriorityRateLimiter(dict(RATE_LIMIT_CONFIG, enabled=False))
+    return client
+
+
+class FakeCalendly:
+    """Serves busy times and organization members from in-memory data."""
+
+    def __init__(self, busy=None, fail_users=(), members=()):
+        self.busy = busy or {}
+        self.fail_users = set(fail_users)
+        self.members = list(members)
+        self.calls = []
+
+    def iter_organization_memberships(self, params=None):
+        for uri in self.members:
+            yield {"user": {"uri": uri, "name": uri.rsplit("/", 1)[-1]}}
+
+    def get_user_busy_times(self, user_uri, start_time, end_time):
+        self.calls.append((user_uri, start_time, end_time))
+        if user_uri in self.fail_users:
+            raise ConnectionError(f"busy times unavailable for {user_uri}")
+        return list(self.busy.get(user_uri, []))
+
+
+@pytest.fixture
+def fake_calendly():
+    """An in-memory stand-in for CalendlyAPI busy-time lookups."""
+    return FakeCalendly()
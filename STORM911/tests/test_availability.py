@@ -0,0 +1,100 @@
+"""Tests for busy-time indexing and team availability."""
+
+from datetime import date
+
+from availability import BusyIndex, TeamAvailability
+
+ALICE = "https://api.calendly.com/users/ALICE"
+BOB = "https://api.calendly.com/users/BOB"
+_TEAM_CONFIG = {
+    "workdays": [0, 1, 2, 3, 4],
+    "rate_limit": {
+        "enabled": False,
+        "interactive": {"rate": 1.0, "burst": 1},
+        "background": {"rate": 1.0, "burst": 1}
+    }
+}
+MONDAY = date(2026, 3, 2)
+SUNDAY = date(2026, 3, 8)
+
+
+def test_busy_index_merges_overlapping_and_touching_intervals():
+    index = BusyIndex([(10, 20), (30, 40), (18, 25), (40, 45)])
+    assert index.intervals() == [(10, 25), (30, 45)]
+    index.add(0, 100)
+    assert index.intervals() == [(0, 100)]
+
+
+def test_busy_index_ignores_empty_intervals():
+    index = BusyIndex([(10, 10), (20, 15)])
+    assert len(index) == 0
+
+
+def test_busy_index_is_free_uses_half_open_intervals():
+    index = BusyIndex([(10, 20)])
+    assert index.is_free(0, 10)
+    assert index.is_free(20, 30)
+    assert not index.is_free(5, 11)
+    assert not index.is_free(19, 25)
+    assert not index.is_free(12, 15)
+
+
+def test_busy_index_clear_range_trims_straddling_intervals():
+    index = BusyIndex([(0, 10), (20, 30), (40, 50)])
+    index.clear_range(5, 45)
+    assert index.intervals() == [(0, 5), (45, 50)]
+    index.clear_range(100, 200)
+    assert index.intervals() == [(0, 5), (45, 50)]
+
+
+def _team(calendly, **config) -> TeamAvailability:
+    return TeamAvailability(calendly, "org", dict(_TEAM_CONFIG, **config))
+
+
+def test_non_workday_is_cached_empty(fake_calendly):
+    fake_calendly.members = [ALICE]
+    team = _team(fake_calendly)
+
+    assert team.capacity_for_day(SUNDAY) == []
+    assert team.cached_capacity(SUNDAY) == []
+    team.close()
+
+
+def test_full_day_is_cached(fake_calendly):
+    fake_calendly.members = [ALICE, BOB]
+    team = _team(fake_calendly)
+
+    capacity = team.capacity_for_day(MONDAY)
+    assert all(len(free) == 2 for _, free in capacity)
+    calls = len(fake_calendly.calls)
+    assert team.capacity_for_day(MONDAY) is capacity
+    assert len(fake_calendly.calls) == calls
+    team.close()
+
+
+def test_partial_failure_is_cached_briefly(fake_calendly):
+    fake_calendly.members = [ALICE, BOB]
+    fake_calendly.fail_users = {BOB}
+    team = _team(fake_calendly, failure_ttl=60)
+
+    capacity = team.capacity_for_day(MONDAY)
+    assert all(free == [ALICE] for _, free in capacity)
+    # The view is cached, so a redraw after the fetch doesn't fetch again
+    assert team.cached_capacity(MONDAY) is capacity
+    calls = len(fake_calendly.calls)
+    team.capacity_for_day(MONDAY)
+    assert len(fake_calendly.calls) == calls
+    team.close()
+
+
+def test_partial_failure_is_retried_after_failure_ttl(fake_calendly):
+    fake_calendly.members = [ALICE, BOB]
+    fake_calendly.fail_users = {BOB}
+    team = _team(fake_calendly, failure_ttl=0)
+
+    team.capacity_for_day(MONDAY)
+    assert team.cached_capacity(MONDAY) is None
+    fake_calendly.fail_users = set()
+    assert all(len(free) == 2 for _, free in team.capacity_for_day(MONDAY))
+    assert team.cached_capacity(MONDAY) is not None
+    team.close()
@@ -0,0 +1,103 @@
+"""Tests for ReadyModeAPI.search_leads_bulk against the fake server."""
+
+import itertools
+import threading
+import time
+
+from config import RETRY_CONFIG
+from fake_readymode import fake_phone
+from resilience import RetryPolicy
+
+
+def _slow_first(client, seconds=0.2):
+    """Delay the lookup of fake_phone(0) so it finishes after the others."""
+    search_lead = client.search_lead
+
+    def slow_search(phone, **kwargs):
+        if phone == fake_phone(0):
+            time.sleep(seconds)
+        return search_lead(phone, **kwargs)
+
+    client.search_lead = slow_search
+
+
+def test_ordered_results_follow_input(api_client):
+    _slow_first(api_client)
+    phones = [fake_phone(i) for i in range(10)]
+    results = list(api_client.search_leads_bulk(phones, max_concurrency=4))
+
+    assert [r.index for r in results] == list(range(10))
+    assert [r.phone for r in results] == phones
+    assert all(r.ok and r.response["status"] == "success" for r in results)
+    assert [r.response["lead"]["phone"] for r in results] == phones
+
+
+def test_unordered_results_stream_as_they_finish(api_client):
+    _slow_first(api_client)
+    phones = [fake_phone(i) for i in range(10)]
+    results = list(api_client.search_leads_bulk(phones, max_concurrency=4, ordered=False))
+
+    assert sorted(r.index for r in results) == list(range(10))
+    assert results[0].index != 0
+    assert results[-1].index == 0
+    assert all(r.ok for r in results)
+
+
+def test_failed_lookups_are_reported_per_phone(api_client):
+    phones = [fake_phone(0), "n/a", fake_phone(1), "9995550000", "", fake_phone(2)]
+    results = list(api_client.search_leads_bulk(phones, max_concurrency=2))
+
+    assert [r.index for r in results] == list(range(len(phones)))
+    assert [r.ok for r in results] == [True, False, True, True, False, True]
+    assert isinstance(results[1].error, ValueError)
+    assert results[3].response == {"status": "not_found"}
+    assert results[2].response["lead"]["phone"] == fake_phone(1)
+
+
+def test_server_errors_do_not_abort_the_batch(fake_server, api_client):
+    fake_server.state.error_rate = 1.0
+    api_client.retry_policy = RetryPolicy(dict(RETRY_CONFIG, base_delay=0.01))
+    phones = [fake_phone(i) for i in range(6)]
+    results = list(api_client.search_leads_bulk(phones, max_concurrency=3, use_cache=False))
+
+    assert sorted(r.index for r in results) == list(range(6))
+    assert all(not r.ok and r.response is None for r in results)
+
+    fake_server.state.error_rate = 0.0
+    api_client.circuit_breaker.record_success()
+    result, = api_client.search_leads_bulk([fake_phone(0)], use_cache=False)
+    assert result.ok
+
+
+def test_input_is_consumed_within_the_window(api_client):
+    max_concurrency = 3
+    drawn = []
+    in_flight = [0, 0]  # current, peak
+    lock = threading.Lock()
+    search_lead = api_client.search_lead
+
+    def counting_search(phone, **kwargs):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        try:
+            time.sleep(0.01)
+            return search_lead(phone, **kwargs)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+
+    def endless_phones():
+        for i in itertools.count():
+            drawn.append(i)
+            yield fake_phone(i % 20)
+
+    api_client.search_lead = counting_search
+    results = api_client.search_leads_bulk(endless_phones(), max_concurrency=max_concurrency)
+    for result in itertools.islice(results, 25):
+        assert result.ok
+        # Beyond what was yielded, at most one window of lookups is drawn
+        assert len(drawn) <= result.index + 1 + 2 * max_concurrency
+    results.close()
+
+    assert in_flight[1] <= max_concurrency
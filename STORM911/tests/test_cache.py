@@ -0,0 +1,73 @@
+"""Tests for the two-layer response cache."""
+
+import time
+
+from cache import ResponseCache
+
+
+def _cache(tmp_path, **kwargs) -> ResponseCache:
+    return ResponseCache("test", cache_dir=str(tmp_path), enabled=True, **kwargs)
+
+
+def test_round_trip_and_hit_counters(tmp_path):
+    cache = _cache(tmp_path)
+    assert cache.get("a") is None
+    cache.set("a", {"status": "success"})
+    assert cache.get("a") == {"status": "success"}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("cache.time.time", lambda: clock[0])
+    cache = _cache(tmp_path, ttl=10)
+    cache.set("a", [1])
+
+    clock[0] += 10
+    assert cache.get("a") == [1]
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    # Each value serializes to 7 bytes; the memory layer holds two
+    cache = _cache(tmp_path, max_size=15)
+    cache.set("a", "aaaaa")
+    cache.set("b", "bbbbb")
+    cache.get("a")
+    cache.set("c", "ccccc")
+
+    assert list(cache._memory) == ["a", "c"]
+    assert cache.stats()["memory_bytes"] == 14
+
+
+def test_disk_layer_survives_restart(tmp_path):
+    _cache(tmp_path).set("a", {"lead": {"id": "1"}})
+    reopened = _cache(tmp_path)
+    assert reopened.get("a") == {"lead": {"id": "1"}}
+    assert reopened.stats()["memory_entries"] == 1
+
+
+def test_invalidate_removes_both_layers(tmp_path):
+    cache = _cache(tmp_path)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert _cache(tmp_path).get("a") is None
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = ResponseCache("test", cache_dir=str(tmp_path), enabled=False)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert not (tmp_path / "test").exists()
+
+
+def test_client_search_is_served_from_cache(api_client, fake_server):
+    phone = fake_server.state.leads["1"]["phone"]
+    first = api_client.search_lead(phone)
+    requests = fake_server.state.request_count
+    assert api_client.search_lead(phone) == first
+    assert fake_server.state.request_count == requests
+    assert api_client.lead_cache.stats()["hits"] >= 1
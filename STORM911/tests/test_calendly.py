@@ -0,0 +1,94 @@
+"""Tests for CalendlyAPI pagination against a local stub server."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from calendly import CalendlyAPI
+
+
+class _PagedHandler(BaseHTTPRequestHandler):
+    """Serves /event_types as pages of `count` items linked by next_page."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        split = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(split.query).items()}
+        server.requests.append((split.path, query))
+        page = int(query.get("page_token", 0))
+        if page in server.fail_pages:
+            self._send(500, {"title": "Internal Server Error"})
+            return
+        count = int(query["count"])
+        items = [{"uri": f"item-{i}"} for i in range(page * count, min((page + 1) * count, server.total))]
+        next_page = None
+        if (page + 1) * count < server.total:
+            next_page = f"{server.base_url}{split.path}?count={count}&page_token={page + 1}"
+        self._send(200, {"collection": items, "pagination": {"next_page": next_page}})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def paged_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PagedHandler)
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.total = 7
+    server.fail_pages = set()
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def calendly(paged_server):
+    api = CalendlyAPI()
+    api.base_url = paged_server.base_url
+    api.set_auth_token("token")
+    return api
+
+
+def test_paginate_follows_next_page_to_exhaustion(paged_server, calendly):
+    items = list(calendly.iter_event_types(params={"user": "u"}, page_size=3))
+
+    assert [item["uri"] for item in items] == [f"item-{i}" for i in range(7)]
+    assert [query.get("page_token", "0") for _, query in paged_server.requests] == ["0", "1", "2"]
+    # Only the first request carries the caller's params; next_page has its own
+    assert paged_server.requests[0][1] == {"user": "u", "count": "3"}
+
+
+def test_paginate_fetches_pages_lazily(paged_server, calendly):
+    items = calendly.iter_event_types(page_size=3)
+    assert [next(items)["uri"] for _ in range(3)] == ["item-0", "item-1", "item-2"]
+    assert len(paged_server.requests) == 1
+
+    stopped = list(calendly.iter_event_types(page_size=3, stop_when=lambda item: item["uri"] == "item-2"))
+    assert [item["uri"] for item in stopped] == ["item-0", "item-1"]
+    assert len(paged_server.requests) == 2
+
+
+def test_paginate_surfaces_a_failed_page(paged_server, calendly):
+    paged_server.fail_pages = {1}
+    items = calendly.iter_event_types(page_size=3)
+
+    assert [next(items)["uri"] for _ in range(3)] == ["item-0", "item-1", "item-2"]
+    with pytest.raises(requests.exceptions.HTTPError) as excinfo:
+        next(items)
+    assert excinfo.value.response.status_code == 500
+    assert len(paged_server.requests) == 2
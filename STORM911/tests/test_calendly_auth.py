@@ -0,0 +1,76 @@
+import threading
+import time
+
+from calendly_auth import TokenManager, TokenStore
+
+
+class FakeCalendlyAPI:
+    def __init__(self, access_token="old", refresh_token="r0", delay=0.0):
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.delay = delay
+        self.refresh_calls = 0
+
+    def set_auth_token(self, access_token, refresh_token=None):
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+
+    def refresh_access_token(self, client_id, client_secret, refresh_token):
+        self.refresh_calls += 1
+        time.sleep(self.delay)
+        n = self.refresh_calls
+        return {"access_token": f"new{n}", "refresh_token": f"r{n}", "expires_in": 7200}
+
+
+def _manager(tmp_path, api):
+    store = TokenStore(str(tmp_path / "tokens.json"))
+    manager = TokenManager(api, client_id="id", client_secret="secret", store=store)
+    manager.load(fallback={"access_token": api.access_token, "refresh_token": api.refresh_token})
+    return manager
+
+
+def test_stale_token_already_replaced_skips_refresh(tmp_path):
+    api = FakeCalendlyAPI()
+    manager = _manager(tmp_path, api)
+
+    assert manager.refresh(stale_token="old")
+    assert api.refresh_calls == 1
+    assert manager.refresh(stale_token="old")  # a second 401 on the old token
+    assert api.refresh_calls == 1
+    assert api.access_token == "new1"
+
+
+def test_concurrent_refreshes_are_serialized(tmp_path):
+    api = FakeCalendlyAPI(delay=0.05)
+    manager = _manager(tmp_path, api)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.refresh(stale_token="old")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [True] * 8
+    assert api.refresh_calls == 1
+    assert manager.refresh_count == 1
+
+
+def test_refreshed_tokens_are_persisted(tmp_path):
+    api = FakeCalendlyAPI()
+    manager = _manager(tmp_path, api)
+    manager.refresh(stale_token="old")
+
+    stored = TokenStore(str(tmp_path / "tokens.json")).load()
+    assert stored["access_token"] == "new1"
+    assert stored["refresh_token"] == "r1"
+    assert stored["expires_at"] > time.time()
+
+
+def test_legacy_token_file_is_moved(tmp_path):
+    legacy = TokenStore(str(tmp_path / "assets" / "calendly_tokens.json"))
+    legacy.save({"access_token": "a", "refresh_token": "r"})
+    store = TokenStore(str(tmp_path / "temp" / "calendly_tokens.json"), legacy_path=legacy.path)
+
+    assert store.load() == {"access_token": "a", "refresh_token": "r"}
+    assert legacy.load() is None
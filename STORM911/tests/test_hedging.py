@@ -0,0 +1,61 @@
+"""Tests for request hedging."""
+
+import threading
+import time
+
+from hedging import Hedger
+
+_CONFIG = {
+    "enabled": True,
+    "endpoints": ["/search/Lead"],
+    "percentile": 95,
+    "min_samples": 20,
+    "default_delay_ms": 500,
+    "min_delay_ms": 20,
+    "budget_ratio": 1.0,
+    "max_workers": 4
+}
+
+
+def _slow_then_fast():
+    calls = []
+    lock = threading.Lock()
+
+    def fn():
+        with lock:
+            calls.append(None)
+            first = len(calls) == 1
+        time.sleep(0.3 if first else 0.0)
+        return "slow" if first else "fast"
+
+    return fn, calls
+
+
+def test_slow_call_is_hedged_and_hedge_wins():
+    hedger = Hedger("test-win", _CONFIG)
+    fn, calls = _slow_then_fast()
+    assert hedger.call(fn, delay=0.02) == "fast"
+    assert len(calls) == 2
+    assert hedger.stats()["hedges_sent"] == 1
+    assert hedger.stats()["hedge_wins"] == 1
+
+
+def test_refused_hedge_does_not_spend_budget():
+    hedger = Hedger("test-refused", _CONFIG)
+    fn, calls = _slow_then_fast()
+    assert hedger.call(fn, delay=0.02, may_hedge=lambda: False) == "slow"
+    assert len(calls) == 1
+    assert hedger.stats()["hedges_sent"] == 0
+    assert "test-refused hedges_sent" not in hedger.metrics.snapshot()["counters"]
+
+    # The budget is still there for the next slow call
+    fn, calls = _slow_then_fast()
+    assert hedger.call(fn, delay=0.02) == "fast"
+    assert hedger.stats()["hedges_sent"] == 1
+
+
+def test_budget_caps_hedges():
+    hedger = Hedger("test-budget", dict(_CONFIG, budget_ratio=0.0))
+    fn, calls = _slow_then_fast()
+    assert hedger.call(fn, delay=0.02) == "slow"
+    assert hedger.stats()["budget_denied"] == 1
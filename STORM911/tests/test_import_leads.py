@@ -0,0 +1,70 @@
+"""Tests for the CSV lead importer."""
+
+from import_leads import LeadImporter, map_columns
+from outbox import Outbox
+from replica import LOCAL_ID_PREFIX, LeadReplica
+
+_HEADER = ["First Name", "Phone", "Cell"]
+_MAPPING = map_columns(_HEADER)
+
+
+def _rows(*numbers):
+    return [{"First Name": f"Lead {index}", "Phone": phone, "Cell": cell} for index, (phone, cell) in enumerate(numbers)]
+
+
+def _stores(tmp_path):
+    return LeadReplica(str(tmp_path / "replica.db")), Outbox(str(tmp_path / "outbox.db"))
+
+
+def test_rows_sharing_a_phone_or_cell_are_duplicates(tmp_path):
+    replica, outbox = _stores(tmp_path)
+    importer = LeadImporter(replica, outbox)
+    summary = importer.import_rows(_rows(
+        ("555-000-0001", "555-000-0002"),
+        ("555-000-0002", ""),
+        ("555-000-0003", "555-000-0001"),
+        ("555-000-0004", "")
+    ), _MAPPING)
+
+    assert (summary["imported"], summary["duplicates"], summary["queued"]) == (2, 2, 2)
+    assert replica.count() == 2
+
+
+def test_replica_duplicates_match_on_cell(tmp_path):
+    replica, outbox = _stores(tmp_path)
+    LeadImporter(replica, outbox).import_rows(_rows(("555-000-0001", "555-000-0002")), _MAPPING)
+
+    summary = LeadImporter(replica, outbox).import_rows(_rows(("555-000-0002", "")), _MAPPING)
+    assert (summary["imported"], summary["duplicates"], summary["requeued"]) == (0, 1, 0)
+    assert outbox.counts()["pending"] == 1
+
+
+def test_rerun_requeues_placeholders_that_were_never_queued(tmp_path):
+    replica, outbox = _stores(tmp_path)
+    # An import interrupted after the replica commit but before the outbox one
+    replica.upsert_many([{"id": f"{LOCAL_ID_PREFIX}5550000001", "phone": "5550000001", "firstName": "Ann"}])
+
+    summary = LeadImporter(replica, outbox).import_rows(_rows(("555-000-0001", ""), ("555-000-0002", "")), _MAPPING)
+    assert (summary["imported"], summary["requeued"]) == (1, 1)
+    payloads = sorted(row["payload"] for row in outbox.claim_batch(10))
+    assert '{"phone": "5550000001", "firstName": "Ann"}' in payloads
+
+    # Already queued now, so another re-run queues nothing
+    summary = LeadImporter(replica, outbox).import_rows(_rows(("555-000-0001", "")), _MAPPING)
+    assert summary["requeued"] == 0
+
+
+def test_local_only_import_queues_nothing(tmp_path):
+    replica, _ = _stores(tmp_path)
+    summary = LeadImporter(replica).import_rows(_rows(("555-000-0001", "")), _MAPPING)
+    assert (summary["imported"], summary["queued"]) == (1, 0)
+
+
+def test_rerun_skips_placeholders_already_created(tmp_path):
+    replica, outbox = _stores(tmp_path)
+    replica.upsert_many([{"id": f"{LOCAL_ID_PREFIX}5550000001", "phone": "5550000001"}])
+    outbox.remember_lead_id("phone:5550000001", "7")
+
+    summary = LeadImporter(replica, outbox).import_rows(_rows(("555-000-0001", "")), _MAPPING)
+    assert summary["requeued"] == 0
+    assert outbox.counts()["pending"] == 0
@@ -0,0 +1,75 @@
+"""Tests for the outbox queue and worker."""
+
+from outbox import IN_FLIGHT, PENDING, Outbox, OutboxWorker
+from replica import LOCAL_ID_PREFIX
+
+_CONFIG = {"batch_size": 20, "poll_interval": 1, "max_attempts": 3}
+
+
+def _outbox(tmp_path) -> Outbox:
+    return Outbox(str(tmp_path / "outbox.db"))
+
+
+def test_entries_for_one_lead_are_claimed_in_order(tmp_path):
+    outbox = _outbox(tmp_path)
+    first = outbox.create_lead({"phone": "(555) 000-1234", "firstName": "Ann"})
+    second = outbox.update_lead(f"{LOCAL_ID_PREFIX}5550001234", {"firstName": "Anne"})
+
+    assert [row["id"] for row in outbox.claim_batch(10)] == [first]
+    outbox.mark_done(first)
+    assert [row["id"] for row in outbox.claim_batch(10)] == [second]
+
+
+def test_update_by_assigned_id_shares_the_create_key(tmp_path, api_client, fake_server):
+    outbox = _outbox(tmp_path)
+    worker = OutboxWorker(outbox, api_client, _CONFIG)
+    outbox.create_lead({"phone": "5550001234", "firstName": "Ann"})
+    outbox.update_lead(f"{LOCAL_ID_PREFIX}5550001234", {"firstName": "Anne"})
+    assert worker.flush_once() == 1
+
+    lead_id = fake_server.state.leads_by_phone["5550001234"]
+    outbox.update_lead(lead_id, {"lastName": "Smith"})
+    rows = outbox.claim_batch(10)
+    assert [row["lead_key"] for row in rows] == ["phone:5550001234"]
+    assert rows[0]["target_id"] == f"{LOCAL_ID_PREFIX}5550001234"
+    outbox.release(rows[0]["id"])
+
+    assert worker.flush_once() == 1
+    assert worker.flush_once() == 1
+    assert outbox.counts()[PENDING] == 0
+    lead = fake_server.state.leads[lead_id]
+    assert (lead["firstName"], lead["lastName"]) == ("Anne", "Smith")
+
+
+def test_release_on_stop_does_not_count_an_attempt(tmp_path, api_client):
+    outbox = _outbox(tmp_path)
+    worker = OutboxWorker(outbox, api_client, _CONFIG)
+    outbox.create_lead({"phone": "5550001234"})
+    worker._stop_event.set()
+
+    assert worker.flush_once() == 0
+    rows = outbox.claim_batch(10)
+    assert len(rows) == 1
+    assert rows[0]["attempts"] == 0
+    assert outbox.counts()[IN_FLIGHT] == 1
+
+
+def test_in_flight_entries_are_recovered_on_restart(tmp_path):
+    outbox = _outbox(tmp_path)
+    outbox.create_lead({"phone": "5550001234"})
+    outbox.claim_batch(10)
+    outbox.close()
+
+    reopened = _outbox(tmp_path)
+    assert reopened.counts()[PENDING] == 1
+
+
+def test_phone_formats_share_one_key(tmp_path):
+    outbox = _outbox(tmp_path)
+    first = outbox.create_lead({"phone": "555-000-1234 x12"})
+    outbox.update_lead(f"{LOCAL_ID_PREFIX}5550001234", {"firstName": "Anne"})
+    outbox.create_appointment({"phone": "+1 (555) 000-1234"})
+
+    assert [row["id"] for row in outbox.claim_batch(10)] == [first]
+    keys = {row["lead_key"] for row in outbox._conn.execute("SELECT lead_key FROM outbox")}
+    assert keys == {"phone:5550001234"}
@@ -0,0 +1,108 @@
+import pytest
+
+from phone import PhoneIndex, PhoneTrie, national_number, to_e164
+
+
+def _labels(node):
+    return sorted(label for label, _ in node.edges.values())
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("(555) 123-4567", "5551234567"),
+    ("+1 555 123 4567", "5551234567"),
+    ("1-555-123-4567", "5551234567"),
+    ("001 555 123 4567", "5551234567"),
+    ("555-123-4567 x12", "5551234567"),
+    ("555.123.4567 ext. 9", "5551234567"),
+    ("555 123 4567 #3", "5551234567"),
+    ("1555", "555"),
+    ("55", "55"),
+    ("", ""),
+    (None, ""),
+    ("+44 20 7946 0958", "442079460958"),
+])
+def test_national_number(raw, expected):
+    assert national_number(raw) == expected
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("(555) 123-4567", "+15551234567"),
+    ("1 555 123 4567", "+15551234567"),
+    ("+1 (555) 123-4567 x7", "+15551234567"),
+    ("+44 20 7946 0958", "+442079460958"),
+    ("0044 20 7946 0958", "+442079460958"),
+    ("155 123 4567", None),  # area codes can't start with 1
+    ("123-4567", None),
+    ("+44 12", None),
+    ("", None),
+])
+def test_to_e164(raw, expected):
+    assert to_e164(raw) == expected
+
+
+def test_trie_splits_edges_where_numbers_diverge():
+    trie = PhoneTrie()
+    trie.insert("5551234567", "a")
+    assert _labels(trie._root) == ["5551234567"]
+
+    trie.insert("5551239999", "b")
+    (label, middle), = trie._root.edges.values()
+    assert label == "555123"
+    assert _labels(middle) == ["4567", "9999"]
+
+    trie.insert("555", "prefix")  # ends inside an edge
+    (label, node), = trie._root.edges.values()
+    assert label == "555" and node.has_value
+    assert len(trie) == 3
+    assert trie.get("5551234567") == "a"
+    assert trie.get("555") == "prefix"
+    assert trie.get("555123") is None
+
+
+def test_trie_remove_merges_edges():
+    trie = PhoneTrie()
+    for number in ("5551234567", "5551239999", "555"):
+        trie.insert(number, number)
+
+    assert trie.remove("5551239999")
+    (label, node), = trie._root.edges.values()
+    assert label == "555"
+    assert _labels(node) == ["1234567"]
+
+    assert trie.remove("555")
+    assert _labels(trie._root) == ["5551234567"]
+    assert not trie.remove("555")
+    assert not trie.remove("5551234")
+    assert len(trie) == 1
+    assert trie.search("5551") == [("5551234567", "5551234567")]
+
+
+def test_trie_prefix_search():
+    trie = PhoneTrie()
+    for number in ("5551230000", "5551234567", "5559990000", "4441234567"):
+        trie.insert(number, number[-4:])
+
+    assert trie.search("555123") == [("5551230000", "0000"), ("5551234567", "4567")]
+    assert trie.search("55512345") == [("5551234567", "4567")]  # prefix ends mid-edge
+    assert [n for n, _ in trie.search("5")] == ["5551230000", "5551234567", "5559990000"]
+    assert len(trie.search("", limit=2)) == 2
+    assert trie.search("556") == []
+    assert trie.search("5551234567999") == []
+
+
+def test_trie_rejects_non_digits():
+    with pytest.raises(ValueError):
+        PhoneTrie().insert("555-1234")
+
+
+def test_index_suggests_history_first():
+    index = PhoneIndex()
+    index.add_leads([
+        {"firstName": "Ann", "lastName": "Lee", "phone": "(555) 123-0000"},
+        {"firstName": "Bob", "lastName": "Ray", "phone": "555-123-4567", "cell": "+1 444 123 4567"},
+    ])
+    index.add_call("1 555 123 4567")
+
+    assert index.suggest("(555) 123") == [("5551234567", "Bob Ray"), ("5551230000", "Ann Lee")]
+    assert index.suggest("+1 444") == [("4441234567", "Bob Ray")]
+    assert index.suggest("") == []
@@ -0,0 +1,132 @@
+"""Tests for the priority rate limiter."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from config import RATE_LIMIT_CONFIG
+from ratelimit import (
+    BACKGROUND, CREATE, INTERACTIVE, PriorityRateLimiter, RateLimitTimeout, TokenBucket, exempt
+)
+
+
+def _limiter(rate: float = 10.0, burst: int = 1) -> PriorityRateLimiter:
+    return PriorityRateLimiter({
+        "enabled": True,
+        INTERACTIVE: {"rate": rate, "burst": burst},
+        BACKGROUND: {"rate": rate, "burst": burst}
+    })
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2.0, capacity=1)
+    now = time.monotonic()
+    assert bucket.try_take(now)
+    assert not bucket.try_take(now)
+    assert bucket.time_until_token(now) == pytest.approx(0.5, abs=0.01)
+    assert bucket.try_take(now + 0.5)
+
+
+def test_acquire_times_out_without_capacity():
+    limiter = _limiter(rate=0.1)
+    limiter.acquire(INTERACTIVE)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(INTERACTIVE, timeout=0)
+
+
+def test_background_yields_to_waiting_interactive_caller():
+    limiter = _limiter(rate=20.0)
+    limiter.acquire(INTERACTIVE)
+    limiter.acquire(BACKGROUND)
+    order = []
+
+    def take():
+        limiter.acquire(BACKGROUND)
+        order.append(BACKGROUND)
+
+    background = threading.Thread(target=take)
+    with limiter._cond:
+        limiter._waiting[INTERACTIVE] += 1
+    background.start()
+    time.sleep(0.15)
+    assert order == []
+    with limiter._cond:
+        limiter._waiting[INTERACTIVE] -= 1
+        limiter._cond.notify_all()
+    background.join(1)
+    assert order == [BACKGROUND]
+
+
+def test_exempt_skips_the_limiter():
+    limiter = _limiter(rate=0.1)
+    limiter.acquire(BACKGROUND)
+    with exempt():
+        assert limiter.acquire(BACKGROUND, timeout=0) == 0.0
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(BACKGROUND, timeout=0)
+
+
+def test_acquire_async_waits_without_threads():
+    limiter = _limiter(rate=10.0)
+    threads = threading.active_count()
+
+    async def run():
+        return await asyncio.gather(*(limiter.acquire_async(BACKGROUND) for _ in range(3)))
+
+    started = time.monotonic()
+    asyncio.run(run())
+    assert time.monotonic() - started >= 0.18
+    assert threading.active_count() == threads
+    assert limiter.stats()[BACKGROUND]["acquired"] == 3
+
+
+def test_cancelled_async_waiter_consumes_no_token():
+    limiter = _limiter(rate=5.0)
+    limiter.acquire(BACKGROUND)
+
+    async def run():
+        waiter = asyncio.ensure_future(limiter.acquire_async(BACKGROUND))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(run())
+    assert limiter.stats()[BACKGROUND]["queue_depth"] == 0
+    time.sleep(0.2)
+    assert limiter.acquire(BACKGROUND, timeout=0) >= 0
+
+
+def _hourly_ceiling(bucket) -> float:
+    return bucket["rate"] * 3600 + bucket["burst"]
+
+
+def test_default_buckets_fit_the_readymode_quotas():
+    searches = _hourly_ceiling(RATE_LIMIT_CONFIG[INTERACTIVE]) + _hourly_ceiling(RATE_LIMIT_CONFIG[BACKGROUND])
+    assert searches <= 2000
+    assert _hourly_ceiling(RATE_LIMIT_CONFIG[CREATE]) <= 10000
+
+
+def test_creates_draw_from_their_own_bucket():
+    limiter = PriorityRateLimiter({
+        "enabled": True,
+        INTERACTIVE: {"rate": 0.1, "burst": 1},
+        BACKGROUND: {"rate": 0.1, "burst": 1},
+        CREATE: {"rate": 0.1, "burst": 2}
+    })
+    limiter.acquire(BACKGROUND)
+    limiter.acquire(BACKGROUND, timeout=0, create=True)
+    limiter.acquire(INTERACTIVE, timeout=0, create=True)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(BACKGROUND, timeout=0, create=True)
+    # Searches still have their own capacity
+    limiter.acquire(INTERACTIVE, timeout=0)
+
+
+def test_without_a_create_bucket_creates_use_the_class_bucket():
+    limiter = _limiter(rate=0.1)
+    limiter.acquire(BACKGROUND, timeout=0, create=True)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(BACKGROUND, timeout=0)
@@ -0,0 +1,112 @@
+"""Tests for the lead replica and its delta sync."""
+
+from replica import LOCAL_ID_PREFIX, LeadReplica, ReplicaSync
+
+_CONFIG = {"sync_interval": 60, "page_size": 5}
+
+
+class _ListingClient:
+    """Serves list_leads from a fixed list with keyset semantics."""
+
+    def __init__(self, leads):
+        self.leads = leads
+        self.calls = 0
+
+    def list_leads(self, updated_since=0, limit=500, after_id=""):
+        self.calls += 1
+        cursor = (updated_since, after_id)
+        page = sorted(
+            (lead for lead in self.leads if (lead.get("updated_at", 0), lead["id"]) > cursor),
+            key=lambda lead: (lead.get("updated_at", 0), lead["id"])
+        )
+        return {"status": "success", "leads": page[:limit]}
+
+
+class _StuckClient:
+    """Returns the same full page forever, like a server ignoring the cursor."""
+
+    def __init__(self, page):
+        self.page = page
+        self.calls = 0
+
+    def list_leads(self, updated_since=0, limit=500, after_id=""):
+        self.calls += 1
+        return {"status": "success", "leads": list(self.page)}
+
+
+def _replica(tmp_path) -> LeadReplica:
+    return LeadReplica(str(tmp_path / "replica.db"), max_staleness=300)
+
+
+def test_leads_sharing_updated_at_across_pages_are_not_skipped(tmp_path):
+    replica = _replica(tmp_path)
+    leads = [{"id": f"{index:02d}", "phone": f"555000{index:04d}", "updated_at": 7} for index in range(12)]
+    sync = ReplicaSync(replica, _ListingClient(leads), _CONFIG)
+
+    assert sync.sync_once() == 12
+    assert replica.count() == 12
+    assert (replica.watermark, replica.watermark_id) == (7, "11")
+
+
+def test_sync_resumes_from_cursor(tmp_path, fake_server, api_client):
+    replica = _replica(tmp_path)
+    sync = ReplicaSync(replica, api_client, _CONFIG)
+    assert sync.sync_once() == 20
+
+    with fake_server.state.lock:
+        fake_server.state._store_lead(dict(fake_server.state.leads["3"], firstName="Changed"))
+    assert sync.sync_once() == 1
+    assert replica.get("3")["firstName"] == "Changed"
+
+
+def test_full_page_without_progress_stops(tmp_path):
+    replica = _replica(tmp_path)
+    client = _StuckClient([{"id": "1", "phone": "5550000001"}] * 5)
+    sync = ReplicaSync(replica, client, _CONFIG)
+
+    sync.sync_once()
+    assert client.calls == 2
+    assert not replica.is_fresh()
+
+
+def test_pages_without_updated_at_advance_by_id(tmp_path):
+    replica = _replica(tmp_path)
+    leads = [{"id": f"{index:02d}", "phone": f"555000{index:04d}"} for index in range(8)]
+    sync = ReplicaSync(replica, _ListingClient(leads), _CONFIG)
+
+    assert sync.sync_once() == 8
+    assert replica.is_fresh()
+
+
+def test_find_by_phone_matches_cell(tmp_path):
+    replica = _replica(tmp_path)
+    replica.upsert_many([{"id": "1", "phone": "5550000001", "cell": "(555) 000-0002", "updated_at": 1}])
+    replica.mark_synced(1, "1")
+
+    assert replica.find_by_phone("5550000001")["id"] == "1"
+    assert replica.find_by_phone("555-000-0002")["id"] == "1"
+    assert replica.existing_phones(["5550000002"]) == {"5550000002"}
+
+
+def test_local_placeholders_are_not_returned(tmp_path):
+    replica = _replica(tmp_path)
+    replica.upsert_many([{"id": f"{LOCAL_ID_PREFIX}5550000001", "phone": "5550000001"}])
+    replica.mark_synced(0)
+
+    assert replica.find_by_phone("5550000001") is None
+    assert replica.get(f"{LOCAL_ID_PREFIX}5550000001") is None
+    assert replica.existing_phones(["5550000001"]) == {"5550000001"}
+
+    replica.upsert_many([{"id": "42", "phone": "5550000001", "updated_at": 3}])
+    assert replica.find_by_phone("5550000001")["id"] == "42"
+    assert replica.count() == 1
+
+
+def test_older_copy_does_not_reindex_phones(tmp_path):
+    replica = _replica(tmp_path)
+    replica.upsert_many([{"id": "1", "phone": "5550000009", "updated_at": 5}])
+    replica.upsert_many([{"id": "1", "phone": "5550000001", "updated_at": 2}])
+    replica.mark_synced(5, "1")
+
+    assert replica.find_by_phone("5550000009")["id"] == "1"
+    assert replica.find_by_phone("5550000001") is None
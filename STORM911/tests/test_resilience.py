@@ -0,0 +1,67 @@
+"""Tests for retries and the circuit breaker."""
+
+import pytest
+
+from api import ReadyModeAPI
+from fake_readymode import fake_phone
+from resilience import CircuitBreaker, RetryPolicy
+
+_RETRY = {
+    "max_attempts": 3,
+    "base_delay": 0.01,
+    "max_delay": 0.05,
+    "retry_statuses": [502, 503],
+    "endpoint_budgets": {"/search/Lead": 4, "/test": 1}
+}
+_BREAKER = {"failure_threshold": 2, "recovery_timeout": 1, "half_open_max_calls": 1}
+
+
+def test_attempt_budgets():
+    policy = RetryPolicy(_RETRY)
+    assert policy.attempts_for("GET", "/search/Lead/5550000000") == 4
+    assert policy.attempts_for("GET", "/test") == 1
+    assert policy.attempts_for("GET", "/status/Lead/1") == 3
+    assert policy.attempts_for("POST", "/create/Lead") == 1
+    assert policy.attempts_for("POST", "/create/Lead", idempotency_key="abc") == 3
+
+
+def test_delays_stay_within_bounds():
+    policy = RetryPolicy(_RETRY)
+    delay = None
+    for _ in range(50):
+        delay = policy.next_delay(delay)
+        assert _RETRY["base_delay"] <= delay <= _RETRY["max_delay"]
+
+
+def test_breaker_opens_half_opens_and_closes(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("resilience.time.monotonic", lambda: clock[0])
+    breaker = CircuitBreaker("test", _BREAKER)
+
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    clock[0] += 1
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock[0] += 1
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_retries_injected_server_errors(fake_server, api_client):
+    fake_server.state.error_rate = 0.5
+    api_client.retry_policy = RetryPolicy(dict(_RETRY, endpoint_budgets={"/search/Lead": 10}))
+    api_client.circuit_breaker = CircuitBreaker("test-client", dict(_BREAKER, failure_threshold=100))
+
+    for index in range(5):
+        response = api_client.search_lead(fake_phone(index), use_cache=False)
+        assert response["lead"]["phone"] == fake_phone(index)
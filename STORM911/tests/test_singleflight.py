@@ -0,0 +1,52 @@
+"""Tests for in-flight request coalescing."""
+
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(None)
+        release.wait(1)
+        return {"status": "success"}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["saved"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(1)
+
+    assert len(calls) == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+    assert flight.stats() == {"executed": 1, "saved": 4, "in_flight": 0}
+
+
+def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+
+    def fail():
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: "up") == "up"
+    assert flight.in_flight() == 0
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()["executed"] == 2
@@ -0,0 +1,151 @@
+"""Tests for the Calendly webhook processor and receiver."""
+
+import http.client
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+import webhooks
+from availability import AvailabilityEngine, AvailabilityRefresher, TeamAvailability, parse_timestamp
+from webhooks import SIGNATURE_HEADER, WebhookProcessor, WebhookReceiver, sign_payload
+
+ME = "https://api.calendly.com/users/ME"
+KEY = "test-signing-key"
+_RECORDING = os.path.join(os.path.dirname(__file__), "data", "calendly_webhooks.jsonl")
+
+
+def _deliveries():
+    with open(_RECORDING, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+@pytest.fixture
+def engine(fake_calendly):
+    engine = AvailabilityEngine(fake_calendly, ME)
+    engine.load(datetime(2026, 3, 2))
+    return engine
+
+
+@pytest.fixture
+def processor(engine):
+    return WebhookProcessor(KEY, availability=engine, refresher=AvailabilityRefresher(engine))
+
+
+def _utc(value: str) -> float:
+    return parse_timestamp(value)
+
+
+def test_replay_applies_recorded_deliveries(processor, engine):
+    created, duplicate, other, canceled, _, unrelated = _deliveries()
+
+    assert processor.replay([created, duplicate, other]) == {"200": 3}
+    assert len(processor.schedule) == 2
+    # Only the engine user's booking is marked busy
+    assert not engine.index.is_free(_utc("2026-03-03T15:00:00Z"), _utc("2026-03-03T15:30:00Z"))
+    assert engine.index.is_free(_utc("2026-03-03T16:00:00Z"), _utc("2026-03-03T16:30:00Z"))
+
+    assert processor.replay([canceled, unrelated]) == {"200": 2}
+    assert len(processor.schedule) == 1
+
+
+def test_cancel_of_unseen_event_queues_refresh(processor):
+    unseen = _deliveries()[4]
+    assert processor.apply(unseen) is False
+
+    start = datetime.fromtimestamp(_utc("2026-03-04T17:00:00Z"))
+    end = datetime.fromtimestamp(_utc("2026-03-04T17:30:00Z"))
+    assert processor.refresher._pending == [(start, end)]
+
+
+def test_duplicate_delivery_queues_no_refresh(processor):
+    created = _deliveries()[0]
+    processor.apply(created)
+    processor.refresher._pending.clear()
+    assert processor.apply(created) is False
+    assert processor.refresher._pending == []
+
+
+def test_bookings_invalidate_team_capacity_for_their_day(fake_calendly, engine):
+    fake_calendly.members = ["https://api.calendly.com/users/ALICE"]
+    team = TeamAvailability(fake_calendly, "org", {"workdays": [0, 1, 2, 3, 4], "rate_limit": {"enabled": False}})
+    processor = WebhookProcessor(KEY, availability=engine, team=team)
+    created, duplicate, _, _, unseen, _ = _deliveries()
+    booked_day = datetime.fromtimestamp(_utc("2026-03-03T15:00:00Z")).date()
+    canceled_day = datetime.fromtimestamp(_utc("2026-03-04T17:00:00Z")).date()
+    for day in (booked_day, canceled_day):
+        team.capacity_for_day(day)
+
+    processor.apply(created)
+    assert team.cached_capacity(booked_day) is None
+    assert team.cached_capacity(canceled_day) is not None
+
+    team.capacity_for_day(booked_day)
+    processor.apply(duplicate)
+    assert team.cached_capacity(booked_day) is not None
+
+    processor.apply(unseen)
+    assert team.cached_capacity(canceled_day) is None
+    team.close()
+
+
+def test_missing_key_rejects_deliveries():
+    processor = WebhookProcessor("")
+    body = json.dumps(_deliveries()[0]).encode("utf-8")
+    status, _ = processor.handle(body, {SIGNATURE_HEADER: sign_payload(body, "anything")})
+    assert status == 401
+
+    assert WebhookProcessor("", unverified=True).handle(body, {})[0] == 200
+
+
+def test_bad_signature_is_rejected(processor):
+    body = json.dumps(_deliveries()[0]).encode("utf-8")
+    assert processor.handle(body, {SIGNATURE_HEADER: sign_payload(body, "wrong")})[0] == 401
+    assert processor.handle(body, {SIGNATURE_HEADER: sign_payload(body, KEY, timestamp=0)})[0] == 401
+    assert processor.handle(body, {SIGNATURE_HEADER: sign_payload(body, KEY)})[0] == 200
+
+
+def test_receiver_refuses_to_start_without_key(monkeypatch):
+    monkeypatch.setitem(webhooks.WEBHOOK_CONFIG, "enabled", True)
+    assert webhooks.start_webhook_receiver(WebhookProcessor("")) is None
+    assert webhooks.start_webhook_receiver(WebhookProcessor("", unverified=True)) is None
+
+
+@pytest.fixture
+def receiver(processor):
+    with WebhookReceiver(processor, "127.0.0.1", 0) as receiver:
+        yield receiver
+
+
+def _connection(receiver) -> http.client.HTTPConnection:
+    host, port = receiver.httpd.server_address[:2]
+    return http.client.HTTPConnection(host, port, timeout=5)
+
+
+def test_receiver_applies_signed_delivery(receiver):
+    body = json.dumps(_deliveries()[0]).encode("utf-8")
+    conn = _connection(receiver)
+    conn.request("POST", receiver.httpd.path, body, {SIGNATURE_HEADER: sign_payload(body, KEY)})
+    response = conn.getresponse()
+    assert response.status == 200
+    assert json.loads(response.read())["changed"] is True
+
+
+def test_early_errors_close_the_connection(receiver):
+    conn = _connection(receiver)
+    conn.request("POST", "/elsewhere", b"GET / HTTP/1.1\r\n\r\n")
+    response = conn.getresponse()
+    assert response.status == 404
+    assert response.getheader("Connection") == "close"
+    response.read()
+
+
+def test_bad_content_length_is_400(receiver):
+    conn = _connection(receiver)
+    conn.putrequest("POST", receiver.httpd.path)
+    conn.putheader("Content-Length", "lots")
+    conn.endheaders()
+    response = conn.getresponse()
+    assert response.status == 400
+    assert response.getheader("Connection") == "close"
@@ -904,4 +904,4 @@ FULL_SCRIPT_PAGES = [
             }
         ]
     }
-}
\ No newline at end of file
+]
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+HTTP transport module for Storm911.
+Shared connection pools and keep-alive settings for every API client.
+"""
+
+import socket
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from config import HTTP_POOL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with TCP keep-alive and connection pool statistics.
+
+    Mounting one instance on several sessions makes them share connection
+    pools, so a TLS handshake to a host is paid once per pooled connection
+    rather than once per client.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int,
+        pool_maxsize: int,
+        pool_block: bool = False,
+        tcp_keepalive: bool = True,
+        keepalive_idle: int = 60,
+        keepalive_interval: int = 15
+    ):
+        self.tcp_keepalive = tcp_keepalive
+        self.keepalive_idle = keepalive_idle
+        self.keepalive_interval = keepalive_interval
+        # Fixed for the adapter's lifetime; size HTTP_POOL_CONFIG for the busiest caller
+        self.pool_maxsize = pool_maxsize
+        # Retries are handled by the clients' own retry policy
+        super().__init__(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=0
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault("socket_options", self._socket_options())
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def _socket_options(self) -> List[tuple]:
+        """Socket options applied to every new pooled connection."""
+        options = list(HTTPConnection.default_socket_options)
+        if not self.tcp_keepalive:
+            return options
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        # Platform-specific tuning; not every OS exposes these
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keepalive_idle))
+        if hasattr(socket, "TCP_KEEPINTVL"):
+            options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, self.keepalive_interval))
+        return options
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Return connection statistics per host.
+
+        Returns:
+            Dict: host -> created, requests, reused and idle connection counts
+        """
+        stats = {}
+        pools = self.poolmanager.pools
+        with pools.lock:
+            pool_list = [pools[key] for key in pools.keys()]
+        for pool in pool_list:
+            host = f"{pool.scheme}://{pool.host}:{pool.port or ''}".rstrip(":")
+            idle = 0
+            if pool.pool is not None:
+                idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+            entry = stats.setdefault(host, {"created": 0, "requests": 0, "reused": 0, "idle": 0})
+            entry["created"] += pool.num_connections
+            entry["requests"] += pool.num_requests
+            entry["reused"] += max(0, pool.num_requests - pool.num_connections)
+            entry["idle"] += idle
+        return stats
+
+
+_adapter: Optional[PooledAdapter] = None
+_adapter_lock = threading.Lock()
+
+def get_adapter() -> PooledAdapter:
+    """Get or create the adapter shared by all API client sessions."""
+    global _adapter
+
+    with _adapter_lock:
+        if _adapter is None:
+            _adapter = PooledAdapter(
+                pool_connections=HTTP_POOL_CONFIG["pool_connections"],
+                pool_maxsize=HTTP_POOL_CONFIG["pool_maxsize"],
+                pool_block=HTTP_POOL_CONFIG["pool_block"],
+                tcp_keepalive=HTTP_POOL_CONFIG["tcp_keepalive"],
+                keepalive_idle=HTTP_POOL_CONFIG["keepalive_idle"],
+                keepalive_interval=HTTP_POOL_CONFIG["keepalive_interval"]
+            )
+        return _adapter
+
+def create_session() -> requests.Session:
+    """Create a requests.Session backed by the shared connection pools."""
+    session = requests.Session()
+    adapter = get_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """Return connection statistics for the shared pools."""
+    return get_adapter().pool_stats()
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Calendly webhook receiver for Storm911.
+Accepts signed invitee.created / invitee.canceled deliveries and applies
+each one to the local schedule and the availability index, so bookings
+show up without polling get_scheduled_events.
+
+Usage:
+    python webhooks.py --signing-key KEY
+    python webhooks.py --replay recorded.jsonl
+"""
+
+import hmac
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from config import WEBHOOK_CONFIG
+from availability import parse_timestamp
+from metrics import get_registry
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "Calendly-Webhook-Signature"
+INVITEE_CREATED = "invitee.created"
+INVITEE_CANCELED = "invitee.canceled"
+
+
+class SignatureError(Exception):
+    """Raised when a delivery's signature is missing, wrong or too old."""
+    pass
+
+
+def sign_payload(body: bytes, signing_key: str, timestamp: Optional[int] = None) -> str:
+    """
+    Build a Calendly-Webhook-Signature header value for body.
+
+    Used to drive the receiver with recorded payloads.
+    """
+    timestamp = int(time.time()) if timestamp is None else int(timestamp)
+    digest = hmac.new(
+        signing_key.encode("utf-8"),
+        f"{timestamp}.".encode("utf-8") + body,
+        hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def verify_signature(
+    body: bytes,
+    header: Optional[str],
+    signing_key: str,
+    tolerance: float,
+    now: Optional[float] = None
+):
+    """
+    Check a delivery's signature header against body.
+
+    Args:
+        body: Raw request body
+        header: Calendly-Webhook-Signature value, "t=<unix time>,v1=<hex hmac>"
+        signing_key: Webhook subscription signing key
+        tolerance: Seconds the signed timestamp may lag behind now
+        now: Current time, for replaying recordings
+
+    Raises:
+        SignatureError: If no key is set, or the header is missing, malformed, stale or wrong
+    """
+    if not signing_key:
+        raise SignatureError("No webhook signing key configured")
+    if not header:
+        raise SignatureError(f"Missing {SIGNATURE_HEADER} header")
+    parts = dict(part.split("=", 1) for part in header.split(",") if "=" in part)
+    if "t" not in parts or "v1" not in parts:
+        raise SignatureError(f"Malformed {SIGNATURE_HEADER} header")
+    try:
+        timestamp = int(parts["t"])
+    except ValueError:
+        raise SignatureError(f"Bad signature timestamp: {parts['t']!r}")
+    now = time.time() if now is None else now
+    if abs(now - timestamp) > tolerance:
+        raise SignatureError(f"Signature timestamp outside tolerance ({int(now - timestamp)}s)")
+    expected = sign_payload(body, signing_key, timestamp).split("v1=", 1)[1]
+    if not hmac.compare_digest(expected, parts["v1"]):
+        raise SignatureError("Signature mismatch")
+
+
+class LocalSchedule:
+    """
+    Scheduled events known from webhook deliveries, keyed by event URI.
+
+    Each event keeps its active invitees; an event with none left counts
+    as canceled. Applying the same delivery twice changes nothing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # event uri -> {"start": epoch, "end": epoch, "users": [...], "invitees": set()}
+        self._events: Dict[str, Dict] = {}
+
+    def add_invitee(self, event_uri: str, invitee_uri: str, start: float, end: float, users: List[str]) -> bool:
+        """Record a booking; returns False if it was already known."""
+        with self._lock:
+            event = self._events.setdefault(
+                event_uri,
+                {"start": start, "end": end, "users": users, "invitees": set()}
+            )
+            event.update(start=start, end=end, users=users)
+            if invitee_uri in event["invitees"]:
+                return False
+            event["invitees"].add(invitee_uri)
+            return True
+
+    def remove_invitee(self, event_uri: str, invitee_uri: str) -> Optional[Dict]:
+        """
+        Record a cancellation.
+
+        Returns:
+            Optional[Dict]: The event if this emptied it, otherwise None
+        """
+        with self._lock:
+            event = self._events.get(event_uri)
+            if event is None or invitee_uri not in event["invitees"]:
+                return None
+            event["invitees"].discard(invitee_uri)
+            if event["invitees"]:
+                return None
+            return self._events.pop(event_uri)
+
+    def upcoming(self, after: Optional[float] = None) -> List[Tuple[str, float, float]]:
+        """Return (event uri, start, end) for booked events ending after a moment, soonest first."""
+        after = time.time() if after is None else after
+        with self._lock:
+            events = [
+                (uri, event["start"], event["end"])
+                for uri, event in self._events.items()
+                if event["end"] > after
+            ]
+        return sorted(events, key=lambda item: item[1])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+
+class WebhookProcessor:
+    """
+    Verifies Calendly deliveries and applies them locally.
+
+    A booking is marked busy in the availability index at once; either
+    kind of change also asks the refresher to re-fetch that range, which
+    reconciles overlapping events and anything the webhook missed, and
+    drops the team capacity cached for the days it touches.
+    """
+
+    def __init__(
+        self,
+        signing_key: str,
+        schedule: Optional[LocalSchedule] = None,
+        availability=None,
+        refresher=None,
+        team=None,
+        tolerance: Optional[float] = None,
+        unverified: bool = False
+    ):
+        """
+        Initialize the processor.
+
+        Args:
+            signing_key: Webhook subscription signing key; without one every
+                delivery is rejected unless unverified is set
+            schedule: Local schedule to update (default: a new one)
+            availability: AvailabilityEngine to update, if loaded
+            refresher: AvailabilityRefresher to nudge, if running
+            team: TeamAvailability whose per-day capacity to invalidate, if loaded
+            tolerance: Signature timestamp tolerance in seconds
+            unverified: Skip signature checks; only for replaying recordings
+        """
+        self.signing_key = signing_key
+        self.schedule = schedule if schedule is not None else LocalSchedule()
+        self.availability = availability
+        self.refresher = refresher
+        self.team = team
+        self.tolerance = WEBHOOK_CONFIG["tolerance"] if tolerance is None else tolerance
+        self.unverified = unverified
+        self.metrics = get_registry()
+        if unverified:
+            logger.warning("Webhook signature checks disabled; deliveries are accepted unverified")
+
+    def handle(self, body: bytes, headers: Mapping[str, str], now: Optional[float] = None) -> Tuple[int, Dict]:
+        """
+        Verify and apply one delivery.
+
+        Args:
+            body: Raw request body
+            headers: Request headers
+            now: Current time for signature checks, for replaying recordings
+
+        Returns:
+            Tuple[int, Dict]: HTTP status and response body
+        """
+        if not self.unverified:
+            try:
+                verify_signature(body, headers.get(SIGNATURE_HEADER), self.signing_key, self.tolerance, now)
+            except SignatureError as e:
+                self.metrics.increment("calendly_webhooks", "rejected")
+                logger.warning(f"Rejected webhook delivery: {str(e)}")
+                return 401, {"status": "error", "message": str(e)}
+        try:
+            delivery = json.loads(body)
+            changed = self.apply(delivery)
+        except (ValueError, KeyError, TypeError) as e:
+            self.metrics.increment("calendly_webhooks", "invalid")
+            logger.error(f"Invalid webhook payload: {str(e)}")
+            return 400, {"status": "error", "message": "Invalid payload"}
+        self.metrics.increment("calendly_webhooks", "applied" if changed else "ignored")
+        return 200, {"status": "ok", "changed": changed}
+
+    def apply(self, delivery: Dict) -> bool:
+        """
+        Apply a decoded delivery to the schedule and availability.
+
+        Returns:
+            bool: Whether anything changed; duplicates and other events don't
+        """
+        kind = delivery.get("event")
+        if kind not in (INVITEE_CREATED, INVITEE_CANCELED):
+            return False
+        invitee = delivery["payload"]
+        event = invitee["scheduled_event"]
+        event_uri = event.get("uri") or invitee["event"]
+        start = parse_timestamp(event["start_time"])
+        end = parse_timestamp(event["end_time"])
+        users = [member.get("user") for member in event.get("event_memberships") or []]
+
+        if kind == INVITEE_CREATED:
+            changed = self.schedule.add_invitee(event_uri, invitee["uri"], start, end, users)
+            if changed and self._concerns_availability(users):
+                self.availability.mark_busy(start, end)
+            refresh = changed
+        else:
+            changed = self.schedule.remove_invitee(event_uri, invitee["uri"]) is not None
+            # The booking may predate this process; its busy time still has to go
+            refresh = changed or self._concerns_availability(users)
+        if refresh and self.refresher is not None:
+            self.refresher.refresh_soon(*self._local_range(start, end))
+        if self.team is not None and (changed or kind == INVITEE_CANCELED):
+            for day in self._local_days(start, end):
+                self.team.invalidate(day)
+        return changed
+
+    def _concerns_availability(self, users: List[str]) -> bool:
+        if self.availability is None:
+            return False
+        # Events without membership info are assumed to be ours
+        return not users or self.availability.user_uri in users
+
+    @staticmethod
+    def _local_range(start: float, end: float) -> Tuple[datetime, datetime]:
+        return datetime.fromtimestamp(start), datetime.fromtimestamp(end)
+
+    @staticmethod
+    def _local_days(start: float, end: float) -> List[date]:
+        """Local dates the event [start, end) falls on."""
+        day = datetime.fromtimestamp(start).date()
+        last = datetime.fromtimestamp(max(start, end - 1)).date()
+        days = []
+        while day <= last:
+            days.append(day)
+            day += timedelta(days=1)
+        return days
+
+    def replay(self, deliveries: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Push recorded deliveries through handle(), signing them when a key is set.
+
+        Args:
+            deliveries: Webhook bodies as decoded JSON
+
+        Returns:
+            Dict[str, int]: Count of responses per HTTP status
+        """
+        statuses: Dict[str, int] = {}
+        for delivery in deliveries:
+            body = json.dumps(delivery).encode("utf-8")
+            headers = {SIGNATURE_HEADER: sign_payload(body, self.signing_key)} if self.signing_key else {}
+            status, _ = self.handle(body, headers)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        return statuses
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Routes POSTs on the webhook path to the server's WebhookProcessor."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "Storm911Webhooks/1.0"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_POST(self):
+        # Early errors leave the body unread; close so it isn't parsed as the next request
+        if self.path.split("?", 1)[0] != self.server.path:
+            self.close_connection = True
+            self._send(404, {"status": "error", "message": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self._send(400, {"status": "error", "message": "Bad Content-Length"})
+            return
+        if length > self.server.max_body_bytes:
+            self.close_connection = True
+            self._send(413, {"status": "error", "message": "Payload too large"})
+            return
+        body = self.rfile.read(length) if length else b""
+        status, payload = self.server.processor.handle(body, self.headers)
+        self._send(status, payload)
+
+    def _send(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class WebhookReceiver:
+    """Threaded local HTTP server feeding Calendly deliveries to a WebhookProcessor."""
+
+    def __init__(self, processor: WebhookProcessor, host: Optional[str] = None, port: Optional[int] = None):
+        """
+        Initialize the receiver.
+
+        Args:
+            processor: Processor that verifies and applies deliveries
+            host: Interface to bind (default: WEBHOOK_CONFIG)
+            port: Port to bind; 0 picks a free port (default: WEBHOOK_CONFIG)
+        """
+        self.httpd = ThreadingHTTPServer(
+            (host or WEBHOOK_CONFIG["host"], WEBHOOK_CONFIG["port"] if port is None else port),
+            WebhookHandler
+        )
+        self.httpd.daemon_threads = True
+        self.httpd.processor = processor
+        self.httpd.path = WEBHOOK_CONFIG["path"]
+        self.httpd.max_body_bytes = WEBHOOK_CONFIG["max_body_bytes"]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def processor(self) -> WebhookProcessor:
+        return self.httpd.processor
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{self.httpd.path}"
+
+    def start(self) -> "WebhookReceiver":
+        """Serve deliveries on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="storm911-webhooks", daemon=True)
+        self._thread.start()
+        logger.info(f"Calendly webhook receiver listening on {self.url}")
+        return self
+
+    def stop(self):
+        """Shut the receiver down."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# Create singleton instances
+_receiver: Optional[WebhookReceiver] = None
+
+def start_webhook_receiver(processor: WebhookProcessor) -> Optional[WebhookReceiver]:
+    """Start the receiver for processor if enabled in WEBHOOK_CONFIG and a signing key is set."""
+    global _receiver
+
+    if not WEBHOOK_CONFIG["enabled"]:
+        return None
+    if not processor.signing_key or processor.unverified:
+        logger.error("Webhook receiver not started: a signing key is required to accept deliveries")
+        return None
+    if _receiver is None:
+        try:
+            _receiver = WebhookReceiver(processor).start()
+        except OSError as e:
+            logger.error(f"Could not start webhook receiver: {str(e)}")
+            return None
+    else:
+        _receiver.httpd.processor = processor
+    return _receiver
+
+def stop_webhook_receiver():
+    """Stop the receiver if it is running."""
+    global _receiver
+
+    if _receiver is not None:
+        _receiver.stop()
+        _receiver = None
+
+
+def main():
+    """Run the receiver in the foreground, or replay recorded deliveries."""
+    parser = argparse.ArgumentParser(description="Calendly webhook receiver")
+    parser.add_argument("--host", default=WEBHOOK_CONFIG["host"])
+    parser.add_argument("--port", type=int, default=WEBHOOK_CONFIG["port"])
+    parser.add_argument("--signing-key", default=WEBHOOK_CONFIG["signing_key"])
+    parser.add_argument("--replay", metavar="JSONL", help="apply recorded deliveries, one JSON body per line, and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not args.replay and not args.signing_key:
+        parser.error("--signing-key is required to receive deliveries")
+    # Recordings may be replayed without a key; they are then applied unverified
+    processor = WebhookProcessor(args.signing_key, unverified=not args.signing_key)
+    if args.replay:
+        with open(args.replay, encoding="utf-8") as f:
+            deliveries = [json.loads(line) for line in f if line.strip()]
+        started = time.perf_counter()
+        statuses = processor.replay(deliveries)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{len(deliveries)} deliveries in {elapsed * 1000:.1f} ms  "
+            f"({len(deliveries) / elapsed if elapsed else 0:.0f}/s)  statuses {statuses}  "
+            f"{len(processor.schedule)} events booked"
+        )
+        return
+
+    receiver = WebhookReceiver(processor, args.host, args.port).start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.stop()
+
+
+if __name__ == "__main__":
+    main()